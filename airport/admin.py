@@ -10,6 +10,7 @@ from .models import (
     Order,
     Ticket,
 )
+from .order_summary import invalidate_summary
 
 
 class TicketInline(admin.TabularInline):
@@ -21,6 +22,17 @@ class TicketInline(admin.TabularInline):
 class OrderAdmin(admin.ModelAdmin):
     inlines = (TicketInline,)
 
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        invalidate_summary(form.instance.user_id)
+
+
+@admin.register(Ticket)
+class TicketAdmin(admin.ModelAdmin):
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        invalidate_summary(obj.order.user_id)
+
 
 admin.site.register(AirplaneType)
 admin.site.register(Airplane)
@@ -28,4 +40,3 @@ admin.site.register(Airport)
 admin.site.register(Route)
 admin.site.register(Crew)
 admin.site.register(Flight)
-admin.site.register(Ticket)
@@ -0,0 +1,92 @@
+"""
+Archival of the orders and tickets of departed flights.
+
+Order and Ticket only grow, while availability checks and ticket counts
+care about flights still to come. archive_orders() moves every order
+whose tickets are all on flights that departed before a cutoff, with its
+tickets, to ArchivedOrder and ArchivedTicket, keeping their ids. It works
+in batches of orders, each in its own short transaction that locks only
+the rows it moves (skipping rows another archiver holds), so bookings
+and the API keep running alongside. `python manage.py
+archive_past_flights` runs it for flights older than ARCHIVE_AFTER_DAYS.
+
+The rows are deleted without the delete signals: archived tickets are
+still sold as far as the analytics rollups are concerned, and departed
+flights need no seat events or fare updates. The seat map and seat counts
+of an archived flight no longer include its tickets, which is why tickets
+can't be booked on departed flights (see TicketSerializer.validate). The
+order list reads the archive with ?archived=true.
+
+The order summaries of the owners are dropped once a batch commits. That
+reaches the web workers only through a shared cache (see CACHES); with a
+per-process cache they catch up within ORDER_SUMMARY_CACHE_TTL, and the
+command warns about it.
+"""
+from datetime import timedelta
+
+from django.db import router, transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from airport.models import ArchivedOrder, ArchivedTicket, Order, Ticket
+from airport.order_summary import invalidate_summaries
+
+ORDER_FIELDS = ("id", "created_at", "user_id")
+TICKET_FIELDS = ("id", "row", "seat", "flight_id", "order_id", "price")
+
+
+def cutoff_for(days: int):
+    return timezone.now() - timedelta(days=days)
+
+
+def archivable_orders(cutoff):
+    """Orders with tickets, all of them on flights departed before cutoff"""
+    tickets = Ticket.objects.filter(order=OuterRef("pk"))
+    return Order.objects.filter(
+        Exists(tickets),
+        ~Exists(tickets.filter(flight__departure_time__gte=cutoff)),
+    ).order_by("id")
+
+
+def archive_batch(cutoff, batch_size: int) -> tuple:
+    """Move one batch; returns (orders, tickets) moved"""
+    using = router.db_for_write(Order)
+    with transaction.atomic(using=using):
+        ids = list(
+            archivable_orders(cutoff)
+            .select_for_update(skip_locked=True, of=("self",))
+            .values_list("id", flat=True)[:batch_size]
+        )
+        if not ids:
+            return 0, 0
+
+        orders = Order.objects.filter(id__in=ids)
+        tickets = Ticket.objects.filter(order_id__in=ids)
+        user_ids = set()
+        archived_orders = []
+        for row in orders.values(*ORDER_FIELDS):
+            user_ids.add(row["user_id"])
+            archived_orders.append(ArchivedOrder(**row))
+        archived_tickets = [
+            ArchivedTicket(**row) for row in tickets.values(*TICKET_FIELDS)
+        ]
+        ArchivedOrder.objects.bulk_create(archived_orders)
+        ArchivedTicket.objects.bulk_create(archived_tickets)
+
+        # Skips the delete signals, see module docstring
+        tickets._raw_delete(using)
+        orders._raw_delete(using)
+
+        transaction.on_commit(
+            lambda: invalidate_summaries(user_ids), using=using
+        )
+    return len(archived_orders), len(archived_tickets)
+
+
+def archive_orders(cutoff, batch_size: int = 500):
+    """Archive everything before cutoff; yields (orders, tickets) per batch"""
+    while True:
+        moved = archive_batch(cutoff, batch_size)
+        if not moved[0]:
+            return
+        yield moved
@@ -0,0 +1,194 @@
+"""
+Async variants of the read-heavy endpoints, for the ASGI application.
+
+The views authenticate, check permissions and throttle exactly like the
+viewsets (the sync parts run through ``sync_to_async``), load their rows
+with the async ORM and reuse the viewsets' serializers on the loaded
+objects. Under ASGI a request only occupies a thread while it talks to the
+database; a slow client reading its response costs nothing but a
+coroutine.
+
+Every related object the serializers touch is loaded up front: an
+accidental lazy query raises SynchronousOnlyOperation instead of silently
+blocking the event loop.
+"""
+import asyncio
+import math
+
+from asgiref.sync import sync_to_async
+from django.db import connections
+from drf_spectacular.utils import extend_schema
+from rest_framework.exceptions import NotFound
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+from rest_framework.views import APIView
+
+from airport.models import Flight, Route
+from airport.permissions import IsAdminOrIfAuthenticatedReadOnly
+from airport.serializers import (
+    FlightDetailSerializer,
+    FlightListSerializer,
+    RouteListSerializer,
+)
+from airport.views import (
+    FLIGHT_FILTER_PARAMETERS,
+    OrderPagination,
+    filter_flights,
+    with_remaining_seats,
+)
+
+
+def release_connections():
+    """
+    Like close_old_connections, but never inside a transaction (atomic
+    requests, tests) where closing would abort it.
+    """
+    for connection in connections.all(initialized_only=True):
+        if not connection.in_atomic_block:
+            connection.close_if_unusable_or_obsolete()
+
+
+class AsyncAPIView(APIView):
+    """APIView whose handlers are coroutines (sync ones run in a thread)"""
+
+    renderer_classes = (JSONRenderer,)
+    permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+            handler = getattr(
+                self, request.method.lower(), self.http_method_not_allowed
+            )
+            if asyncio.iscoroutinefunction(handler):
+                response = await handler(request, *args, **kwargs)
+            else:
+                # Inherited handlers such as options() are sync
+                response = await sync_to_async(handler)(
+                    request, *args, **kwargs
+                )
+        except Exception as exc:
+            response = self.handle_exception(exc)
+        finally:
+            # The rows are loaded: give the connection back before the
+            # response is streamed to a possibly slow client
+            await sync_to_async(release_connections)()
+
+        self.response = self.finalize_response(
+            request, response, *args, **kwargs
+        )
+        return self.response
+
+
+class AsyncPagination(OrderPagination):
+    """Page number pagination counting and slicing with the async ORM"""
+
+    async def apaginate_queryset(self, queryset, request) -> list:
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.count = await queryset.acount()
+        self.num_pages = max(math.ceil(self.count / self.page_size), 1)
+        try:
+            self.number = int(
+                request.query_params.get(self.page_query_param, 1)
+            )
+        except ValueError:
+            self.number = 0
+        if not 1 <= self.number <= self.num_pages:
+            raise NotFound(
+                self.invalid_page_message.format(
+                    page_number=self.number, message="Invalid page."
+                )
+            )
+
+        offset = (self.number - 1) * self.page_size
+        return [
+            row async for row in queryset[offset : offset + self.page_size]
+        ]
+
+    def get_next_link(self):
+        if self.number >= self.num_pages:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.page_query_param, self.number + 1)
+
+    def get_previous_link(self):
+        if self.number <= 1:
+            return None
+        url = self.request.build_absolute_uri()
+        if self.number == 2:
+            return remove_query_param(url, self.page_query_param)
+        return replace_query_param(url, self.page_query_param, self.number - 1)
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "count": self.count,
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            }
+        )
+
+
+class FlightListView(AsyncAPIView):
+    """Flights with optional filters, as the flight list"""
+
+    queryset = Flight.objects.select_related(
+        "route__source", "route__destination", "airplane"
+    ).prefetch_related("crew")
+    pagination_class = AsyncPagination
+
+    @extend_schema(
+        operation_id="airport_async_flights_list",
+        parameters=FLIGHT_FILTER_PARAMETERS,
+        responses=FlightListSerializer(many=True),
+    )
+    async def get(self, request):
+        queryset = with_remaining_seats(
+            filter_flights(self.queryset, request.query_params)
+        )
+        paginator = self.pagination_class()
+        flights = await paginator.apaginate_queryset(queryset, request)
+        serializer = FlightListSerializer(flights, many=True)
+        return paginator.get_paginated_response(serializer.data)
+
+
+class FlightDetailView(AsyncAPIView):
+    """One flight with its crew and taken seats, as the flight detail"""
+
+    queryset = Flight.objects.select_related(
+        "route__source", "route__destination", "airplane__airplane_type"
+    ).prefetch_related("tickets", "crew")
+
+    @extend_schema(
+        operation_id="airport_async_flights_retrieve",
+        responses=FlightDetailSerializer,
+    )
+    async def get(self, request, pk):
+        try:
+            flight = await self.queryset.aget(pk=pk)
+        except Flight.DoesNotExist:
+            raise NotFound()
+        return Response(FlightDetailSerializer(flight).data)
+
+
+class RouteListView(AsyncAPIView):
+    """Every route, as the route list"""
+
+    queryset = Route.objects.select_related("source", "destination")
+
+    @extend_schema(
+        operation_id="airport_async_routes_list",
+        responses=RouteListSerializer(many=True),
+    )
+    async def get(self, request):
+        routes = [route async for route in self.queryset.all()]
+        return Response(RouteListSerializer(routes, many=True).data)
@@ -0,0 +1,177 @@
+"""
+Typeahead search for airports and crew.
+
+Each process keeps a sorted array of the words of every row (names are
+split into words, lowercased and stripped of accents). A query is answered
+by bisecting the array for the words starting with its longest token and
+keeping the rows whose words cover every token, which takes microseconds.
+Results are ranked: rows whose text starts with the query first, then by
+how early the matching word appears, then alphabetically.
+
+The array is rebuilt lazily after a change. Saves and deletes bump a
+version number in the cache once they commit, so every process sharing the
+cache notices; AUTOCOMPLETE_INDEX_TTL bounds the staleness otherwise.
+Tables larger than AUTOCOMPLETE_MAX_INDEXED_ROWS are not held in memory.
+
+Queries the prefix index finds nothing for (typos, infixes) and tables
+too large to index fall back to a trigram similarity search in PostgreSQL,
+backed by the GIN trigram indexes of migration 0008, or to icontains
+where pg_trgm is not installed.
+"""
+import threading
+import time
+import unicodedata
+from bisect import bisect_left
+from functools import lru_cache, reduce
+from operator import or_
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections, router
+from django.db.models import Q
+from django.db.models.functions import Greatest
+
+from airport.models import Airport, Crew
+
+
+def normalize(text: str) -> str:
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+
+@lru_cache(maxsize=None)
+def has_trigram_search(alias: str) -> bool:
+    if connections[alias].vendor != "postgresql":
+        return False
+    with connections[alias].cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+        return cursor.fetchone() is not None
+
+
+class PrefixIndex:
+    def __init__(self, rows, fields):
+        self.rows = {}
+        self.texts = {}
+        self.words = {}
+        terms = []
+        for row in rows:
+            text = normalize(" ".join(row[field] for field in fields))
+            words = text.split()
+            self.rows[row["id"]] = row
+            self.texts[row["id"]] = text
+            self.words[row["id"]] = words
+            terms += [
+                (word, position, row["id"])
+                for position, word in enumerate(words)
+            ]
+        terms.sort()
+        self.terms = terms
+        self.keys = [term[0] for term in terms]
+
+    def __len__(self):
+        return len(self.rows)
+
+    def search(self, query: str, limit: int) -> list:
+        query = " ".join(normalize(query).split())
+        tokens = query.split()
+        if not tokens:
+            return []
+
+        lead = max(tokens, key=len)
+        start = bisect_left(self.keys, lead)
+        end = bisect_left(self.keys, lead + "\U0010ffff", lo=start)
+        positions = {}
+        for _, position, row_id in self.terms[start:end]:
+            positions.setdefault(row_id, position)
+
+        ranked = sorted(
+            (
+                not self.texts[row_id].startswith(query),
+                position,
+                self.texts[row_id],
+                row_id,
+            )
+            for row_id, position in positions.items()
+            if all(
+                any(word.startswith(token) for word in self.words[row_id])
+                for token in tokens
+            )
+        )
+        return [self.rows[row_id] for *_, row_id in ranked[:limit]]
+
+
+class Autocomplete:
+    def __init__(self, model, fields):
+        self.model = model
+        self.fields = fields
+        self.version_key = f"airport:autocomplete:{model._meta.model_name}"
+        self._index = None
+        self._loaded = (None, 0.0)
+        self._lock = threading.Lock()
+
+    def _is_fresh(self, version) -> bool:
+        loaded_version, loaded_at = self._loaded
+        ttl = settings.AUTOCOMPLETE_INDEX_TTL
+        return version == loaded_version and time.monotonic() - loaded_at < ttl
+
+    def _build(self):
+        limit = settings.AUTOCOMPLETE_MAX_INDEXED_ROWS
+        # A row past the limit means the table is too large: find out
+        # without loading the rows
+        if self.model.objects.all()[limit : limit + 1].exists():
+            return None
+        rows = self.model.objects.values("id", *self.fields)
+        return PrefixIndex(rows, self.fields)
+
+    def _current_index(self):
+        version = cache.get(self.version_key, 0)
+        if not self._is_fresh(version):
+            with self._lock:
+                if not self._is_fresh(version):
+                    self._index = self._build()
+                    self._loaded = (version, time.monotonic())
+        return self._index
+
+    def search(self, query: str, limit: int) -> list:
+        index = self._current_index()
+        if index is not None:
+            results = index.search(query, limit)
+            if results or len(query.strip()) < 3:
+                return results
+        return self.search_database(query, limit)
+
+    def search_database(self, query: str, limit: int) -> list:
+        query = query.strip()
+        if not query:
+            return []
+        rows = self.model.objects.values("id", *self.fields)
+        if not has_trigram_search(router.db_for_read(self.model)):
+            condition = reduce(
+                or_,
+                (Q(**{f"{field}__icontains": query}) for field in self.fields),
+            )
+            return list(rows.filter(condition).order_by(*self.fields)[:limit])
+
+        from django.contrib.postgres.search import TrigramWordSimilarity
+
+        similarity = Greatest(
+            *(TrigramWordSimilarity(query, field) for field in self.fields)
+        )
+        return list(
+            rows.annotate(similarity=similarity)
+            .filter(similarity__gte=settings.AUTOCOMPLETE_MIN_SIMILARITY)
+            .order_by("-similarity", *self.fields)
+            .values("id", *self.fields)[:limit]
+        )
+
+    def invalidate(self) -> None:
+        """Make every process rebuild its index on the next search"""
+        try:
+            cache.incr(self.version_key)
+        except ValueError:
+            cache.set(self.version_key, 1, None)
+        self._loaded = (None, 0.0)
+
+
+airports = Autocomplete(Airport, ("name", "closest_big_city"))
+crew = Autocomplete(Crew, ("first_name", "last_name"))
@@ -0,0 +1,103 @@
+"""
+Cached catalog lists: airplane types, airplanes, airports, routes and crew.
+
+The catalog changes rarely and is read on every booking screen, so the
+rendered JSON of a list is cached together with its compressed bodies
+(see airport_api_service.compression.compress_all). A repeat request is
+answered with those bytes: no query, no serialization and no compression.
+
+Entries are keyed by the path, the query parameters the list honours
+(cache_query_params, sorted) and the host, which the absolute image URLs of
+airplanes are built from. Other parameters don't change the list, so they
+don't make entries of their own. Saving or deleting any
+catalog row bumps a version number in the cache once it commits, which
+moves every process sharing that cache to new keys. With a per-process
+cache such as the default LocMemCache (see CACHES) only the process that
+made the change does; the others serve their entries until
+CATALOG_CACHE_TTL, kept to minutes for that reason, expires them. The
+Vary header of the rendered response is stored with it and sent again on
+hits. Only JSON is cached, the browsable API is rendered per request.
+"""
+import hashlib
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import cc_delim_re, patch_vary_headers
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+from airport_api_service.compression import compress_all
+
+VERSION_KEY = "airport:catalog:version"
+CACHE_KEY = "airport:catalog:{}:{}"
+
+
+def cache_key(request, query_params=()) -> str:
+    version = cache.get(VERSION_KEY, 0)
+    query = urlencode(
+        sorted(
+            (name, value)
+            for name in query_params
+            for value in request.GET.getlist(name)
+        )
+    )
+    target = f"{request.get_host()}{request.path}?{query}"
+    return CACHE_KEY.format(
+        version, hashlib.sha256(target.encode()).hexdigest()
+    )
+
+
+def invalidate() -> None:
+    """Make every process render the catalog lists again"""
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, 1, None)
+
+
+class CachedListMixin:
+    """Answers the list action from the cache of rendered responses"""
+
+    # Query parameters the list action reads, e.g. filters or pagination
+    cache_query_params = ()
+
+    def list(self, request, *args, **kwargs):
+        if not isinstance(request.accepted_renderer, JSONRenderer):
+            return super().list(request, *args, **kwargs)
+
+        key = cache_key(request, self.cache_query_params)
+        entry = cache.get(key)
+        if entry is not None:
+            response = HttpResponse(
+                entry["content"], content_type=entry["content_type"]
+            )
+            response.precompressed = entry["precompressed"]
+            if entry["vary"]:
+                patch_vary_headers(response, cc_delim_re.split(entry["vary"]))
+            return response
+
+        self._catalog_cache_key = key
+        return super().list(request, *args, **kwargs)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(
+            request, response, *args, **kwargs
+        )
+        key = getattr(self, "_catalog_cache_key", None)
+        if (
+            key is not None
+            and isinstance(response, Response)
+            and response.status_code == 200
+        ):
+            response.render()
+            entry = {
+                "content": response.content,
+                "content_type": response["Content-Type"],
+                "precompressed": compress_all(response.content),
+                "vary": response.get("Vary", ""),
+            }
+            cache.set(key, entry, settings.CATALOG_CACHE_TTL)
+            response.precompressed = entry["precompressed"]
+        return response
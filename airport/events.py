@@ -0,0 +1,18 @@
+"""
+In-process signals of the booking flow, and helpers for their receivers.
+
+OrderSerializer.create inserts the tickets of an order in one statement
+and sends ``tickets_booked(sender=Order, order=order, tickets=tickets)``
+instead of a post_save per ticket, so receivers (seat streams, caches,
+analytics) handle a booking once. post_save and post_delete of Ticket
+still cover single tickets created or deleted elsewhere, e.g. in the admin.
+"""
+from django.db.models import QuerySet
+from django.dispatch import Signal
+
+tickets_booked = Signal()
+
+
+def deleted_through(origin) -> type:
+    """The model whose delete() removed an instance, see post_delete"""
+    return origin.model if isinstance(origin, QuerySet) else type(origin)
@@ -0,0 +1,60 @@
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management.base import BaseCommand
+
+from airport.archive import archive_orders, cutoff_for
+
+
+class Command(BaseCommand):
+    help = (
+        "Move the orders and tickets of flights departed more than --days "
+        "ago to the archive tables"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days", type=int, default=settings.ARCHIVE_AFTER_DAYS
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=settings.ARCHIVE_BATCH_SIZE,
+            help="Orders moved per transaction",
+        )
+        parser.add_argument(
+            "--pause",
+            type=float,
+            default=0.0,
+            help="Seconds to sleep between batches, to spare the database",
+        )
+
+    def handle(self, *args, **options):
+        cutoff = cutoff_for(options["days"])
+        orders = tickets = 0
+        for moved_orders, moved_tickets in archive_orders(
+            cutoff, options["batch_size"]
+        ):
+            orders += moved_orders
+            tickets += moved_tickets
+            if options["pause"]:
+                time.sleep(options["pause"])
+
+        self.stderr.write(
+            self.style.SUCCESS(
+                f"Archived {orders} orders and {tickets} tickets of flights "
+                f"departed before {cutoff:%Y-%m-%d %H:%M}"
+            )
+        )
+        if orders and isinstance(caches["default"], LocMemCache):
+            # The summaries dropped above live in this process only
+            self.stderr.write(
+                self.style.WARNING(
+                    "The cache is local to this process: order summaries "
+                    "cached by the web workers show the archived orders "
+                    f"for up to {settings.ORDER_SUMMARY_CACHE_TTL} seconds. "
+                    "Configure a shared cache, see CACHES."
+                )
+            )
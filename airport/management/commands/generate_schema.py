@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from airport_api_service import schema
+
+
+class Command(BaseCommand):
+    help = "Generate and store the OpenAPI schema served at /api/v1/schema/"
+
+    def handle(self, *args, **options):
+        paths = schema.store(schema.render())
+        schema.clear_loaded()
+        for path in paths:
+            self.stdout.write(str(path))
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Stored the schema of version {schema.code_version()}"
+            )
+        )
@@ -0,0 +1,47 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from airport.outbox import get_sink, relay_batch
+
+
+class Command(BaseCommand):
+    help = "Publish pending outbox events to the configured sink"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=1.0,
+            help="Seconds to sleep when the outbox is empty",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Drain the outbox and exit instead of polling forever",
+        )
+        parser.add_argument(
+            "--sink",
+            default=None,
+            help="Dotted path of a sink class, overrides OUTBOX_SINK",
+        )
+
+    def handle(self, *args, **options):
+        sink = get_sink(options["sink"])
+        published = 0
+        try:
+            while True:
+                count = relay_batch(sink, options["batch_size"])
+                published += count
+                if count:
+                    continue
+                if options["once"]:
+                    break
+                time.sleep(options["interval"])
+        finally:
+            sink.close()
+
+        self.stderr.write(
+            self.style.SUCCESS(f"Published {published} outbox events")
+        )
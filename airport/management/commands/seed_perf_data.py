@@ -0,0 +1,332 @@
+"""
+Fill the database with realistic volumes of airport data for performance
+work: airports, routes between them, airplane types and airplanes, crew,
+flights spread around today with 2-4 crew each, users, and orders of 1-4
+tickets on random flights. Everything is drawn from --seed, so the same
+options always produce the same data, and written with bulk inserts.
+
+Bulk inserts skip model signals: tickets are priced by the fare engine
+here, and the analytics rollups are rebuilt at the end.
+"""
+import random
+import time
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from airport import autocomplete
+from airport.models import (
+    Airplane,
+    AirplaneType,
+    Airport,
+    Crew,
+    Flight,
+    Order,
+    Route,
+    Ticket,
+)
+from airport.pricing import FareTable, band_fare
+from analytics.rollups import rebuild
+
+CITIES = (
+    "Amsterdam",
+    "Athens",
+    "Barcelona",
+    "Berlin",
+    "Budapest",
+    "Dublin",
+    "Istanbul",
+    "Kyiv",
+    "Lisbon",
+    "London",
+    "Lviv",
+    "Madrid",
+    "Milan",
+    "Munich",
+    "Oslo",
+    "Paris",
+    "Prague",
+    "Rome",
+    "Stockholm",
+    "Vienna",
+    "Warsaw",
+    "Zürich",
+)
+AIRPORT_KINDS = ("International", "Regional", "City", "Central", "Airfield")
+FIRST_NAMES = (
+    "Anna",
+    "Bohdan",
+    "Chloe",
+    "Daniel",
+    "Emma",
+    "Farid",
+    "Greta",
+    "Hugo",
+    "Iryna",
+    "Jonas",
+    "Kateryna",
+    "Lucas",
+    "Maria",
+    "Noah",
+    "Olena",
+    "Pierre",
+)
+LAST_NAMES = (
+    "Andersen",
+    "Bondarenko",
+    "Costa",
+    "Dubois",
+    "Fischer",
+    "García",
+    "Hansen",
+    "Kovalenko",
+    "Müller",
+    "Novak",
+    "Rossi",
+    "Shevchenko",
+    "Smith",
+    "Weber",
+)
+
+PASSWORD = "perf-password"
+
+
+class Command(BaseCommand):
+    help = "Generate realistic volumes of data for benchmarks"
+
+    def add_arguments(self, parser):
+        for name, default in (
+            ("airports", 100),
+            ("routes", 1000),
+            ("airplane-types", 10),
+            ("airplanes", 200),
+            ("crew", 500),
+            ("flights", 10_000),
+            ("users", 1000),
+            ("orders", 20_000),
+        ):
+            parser.add_argument(f"--{name}", type=int, default=default)
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=180,
+            help="Flights depart over this many days, a third in the past",
+        )
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument(
+            "--prefix",
+            default="Perf",
+            help="Marks the generated names, so a database can be seeded "
+            "more than once",
+        )
+
+    def handle(self, *args, **options):
+        if options["airports"] < 2 or any(
+            options[name] < 1
+            for name in ("routes", "airplane_types", "airplanes", "flights")
+        ):
+            raise CommandError(
+                "Need at least 2 airports and 1 route, airplane type, "
+                "airplane and flight."
+            )
+        prefix = options["prefix"]
+        if AirplaneType.objects.filter(name__startswith=f"{prefix} ").exists():
+            raise CommandError(
+                f'Data prefixed "{prefix}" exists, pick another --prefix.'
+            )
+
+        self.rng = random.Random(options["seed"])
+        self.batch_size = options["batch_size"]
+        self.now = timezone.now()
+        start = time.perf_counter()
+
+        with transaction.atomic():
+            airports = self.create_airports(prefix, options["airports"])
+            routes = self.create_routes(airports, options["routes"])
+            airplanes = self.create_airplanes(
+                prefix, options["airplane_types"], options["airplanes"]
+            )
+            crew = self.create_crew(options["crew"])
+            flights = self.create_flights(
+                routes, airplanes, crew, options["flights"], options["days"]
+            )
+            users = self.create_users(prefix, options["users"])
+            tickets = self.create_orders(users, flights, options["orders"])
+            rebuild()
+        autocomplete.airports.invalidate()
+        autocomplete.crew.invalidate()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Seeded {len(airports)} airports, {len(routes)} routes, "
+                f"{len(airplanes)} airplanes, {len(crew)} crew, "
+                f"{len(flights)} flights, {len(users)} users, "
+                f"{options['orders']} orders and {tickets} tickets "
+                f"in {time.perf_counter() - start:.1f}s"
+            )
+        )
+
+    def bulk_create(self, model, objects) -> list:
+        return model.objects.bulk_create(objects, batch_size=self.batch_size)
+
+    def create_airports(self, prefix, count) -> list:
+        airports = []
+        for i in range(count):
+            city = self.rng.choice(CITIES)
+            kind = self.rng.choice(AIRPORT_KINDS)
+            airports.append(
+                Airport(
+                    name=f"{city} {kind} {prefix}-{i}", closest_big_city=city
+                )
+            )
+        return self.bulk_create(Airport, airports)
+
+    def create_routes(self, airports, count) -> list:
+        routes = []
+        for _ in range(count):
+            source, destination = self.rng.sample(airports, 2)
+            routes.append(
+                Route(
+                    source=source,
+                    destination=destination,
+                    distance=self.rng.randint(150, 9000),
+                )
+            )
+        return self.bulk_create(Route, routes)
+
+    def create_airplanes(self, prefix, types, count) -> list:
+        airplane_types = self.bulk_create(
+            AirplaneType,
+            [AirplaneType(name=f"{prefix} Type {i}") for i in range(types)],
+        )
+        return self.bulk_create(
+            Airplane,
+            [
+                Airplane(
+                    name=f"{prefix} Airplane {i}",
+                    rows=self.rng.randint(10, 40),
+                    seats_in_row=self.rng.choice((4, 6, 8, 10)),
+                    airplane_type=self.rng.choice(airplane_types),
+                )
+                for i in range(count)
+            ],
+        )
+
+    def create_crew(self, count) -> list:
+        return self.bulk_create(
+            Crew,
+            [
+                Crew(
+                    first_name=self.rng.choice(FIRST_NAMES),
+                    last_name=self.rng.choice(LAST_NAMES),
+                )
+                for _ in range(count)
+            ],
+        )
+
+    def create_flights(self, routes, airplanes, crew, count, days) -> list:
+        first_departure = self.now - timedelta(days=days / 3)
+        flights = []
+        for _ in range(count):
+            route = self.rng.choice(routes)
+            departure = first_departure + timedelta(
+                minutes=self.rng.randrange(days * 24 * 60)
+            )
+            flights.append(
+                Flight(
+                    route=route,
+                    airplane=self.rng.choice(airplanes),
+                    departure_time=departure,
+                    arrival_time=departure
+                    + timedelta(hours=0.5 + route.distance / 800),
+                )
+            )
+        flights = self.bulk_create(Flight, flights)
+
+        if crew:
+            self.bulk_create(
+                Flight.crew.through,
+                [
+                    Flight.crew.through(flight_id=flight.id, crew_id=member.id)
+                    for flight in flights
+                    for member in self.rng.sample(
+                        crew, min(len(crew), self.rng.randint(2, 4))
+                    )
+                ],
+            )
+        return flights
+
+    def create_users(self, prefix, count) -> list:
+        password = make_password(PASSWORD)
+        User = get_user_model()
+        return self.bulk_create(
+            User,
+            [
+                User(
+                    email=f"{prefix.lower()}-{i}@example.com",
+                    password=password,
+                )
+                for i in range(count)
+            ],
+        )
+
+    def create_orders(self, users, flights, count) -> int:
+        if not users:
+            return 0
+        free_seats = {}
+        fares = {}
+        created = 0
+        for offset in range(0, count, self.batch_size):
+            orders = []
+            booked = []
+            for _ in range(min(self.batch_size, count - offset)):
+                orders.append(Order(user=self.rng.choice(users)))
+                booked.append(self.book(flights, free_seats, fares))
+            orders = self.bulk_create(Order, orders)
+
+            tickets = [
+                Ticket(order=order, **ticket)
+                for order, order_tickets in zip(orders, booked)
+                for ticket in order_tickets
+            ]
+            created += len(self.bulk_create(Ticket, tickets))
+        return created
+
+    def book(self, flights, free_seats, fares) -> list:
+        """Pick 1-4 free seats on a random flight that isn't full"""
+        for _ in range(10):
+            flight = self.rng.choice(flights)
+            airplane = flight.airplane
+            if flight.id not in free_seats:
+                seats = list(range(1, airplane.capacity + 1))
+                self.rng.shuffle(seats)
+                free_seats[flight.id] = seats
+                fares[flight.id] = FareTable(
+                    band_fare(flight.route.distance),
+                    airplane.capacity,
+                    flight.departure_time,
+                )
+            seats = free_seats[flight.id]
+            if seats:
+                break
+        else:
+            return []
+
+        tickets = []
+        for _ in range(min(len(seats), self.rng.randint(1, 4))):
+            seat = seats.pop()
+            sold = airplane.capacity - len(seats) - 1
+            tickets.append(
+                {
+                    "flight": flight,
+                    "row": (seat - 1) // airplane.seats_in_row + 1,
+                    "seat": seat,
+                    "price": fares[flight.id].price(sold, self.now),
+                }
+            )
+        return tickets
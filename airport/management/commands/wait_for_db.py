@@ -1,21 +1,72 @@
+"""
+Block until the database accepts queries, e.g. before `migrate` in a
+container entrypoint.
+
+Each attempt opens a real connection and runs SELECT 1 (see
+airport_api_service.health). Failed attempts are retried after a delay
+that doubles from --interval up to --max-interval; after --timeout
+seconds the command gives up with a non-zero exit status.
+"""
 import time
 
-from django.core.management.base import BaseCommand
-from django.db import connections, OperationalError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections
 
-"""Django's command-line utility for administrative tasks."""
+from airport_api_service.health import probe_database
 
 
 class Command(BaseCommand):
+    help = "Wait until the database accepts connections"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+        parser.add_argument(
+            "--timeout",
+            type=float,
+            default=60,
+            help="Seconds to wait before giving up",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=0.1,
+            help="Seconds before the first retry, doubled on every retry",
+        )
+        parser.add_argument(
+            "--max-interval",
+            type=float,
+            default=5,
+            help="Longest pause between attempts",
+        )
 
     def handle(self, *args, **options):
+        alias = options["database"]
+        deadline = time.monotonic() + options["timeout"]
+        delay = options["interval"]
+        attempt = 1
+
         self.stdout.write("Waiting for database...")
-        db = None
-        while not db:
+        while True:
             try:
-                db = connections["default"]
-            except OperationalError:
-                self.stdout.write("Database unavailable, waiting 1 second...")
-                time.sleep(1)
+                latency = probe_database(alias)
+                break
+            except OperationalError as error:
+                connections[alias].close()
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise CommandError(
+                        f"Database unavailable after {attempt} attempts: "
+                        f"{str(error).strip()}"
+                    )
+                delay = min(delay, options["max_interval"], remaining)
+                self.stdout.write(
+                    f"Database unavailable (attempt {attempt}), "
+                    f"retrying in {delay:.1f}s..."
+                )
+                time.sleep(delay)
+                delay *= 2
+                attempt += 1
 
-        self.stdout.write(self.style.SUCCESS("Database available!"))
+        self.stdout.write(
+            self.style.SUCCESS(f"Database available ({latency:.1f} ms)")
+        )
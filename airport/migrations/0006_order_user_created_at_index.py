@@ -0,0 +1,20 @@
+# Generated by Django 4.2.11 on 2026-10-19 10:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("airport", "0005_airplane_image"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(
+                fields=["user", "-created_at"],
+                name="airport_order_user_created_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,46 @@
+from django.db import migrations
+
+# GIN trigram indexes serve the autocomplete fallback (similarity search)
+# as well as the icontains filters, e.g. the crew filter of the flight list
+INDEXES = (
+    ("airport_airport_name_trgm", "airport_airport", "name"),
+    ("airport_airport_city_trgm", "airport_airport", "closest_big_city"),
+    ("airport_crew_first_name_trgm", "airport_crew", "first_name"),
+    ("airport_crew_last_name_trgm", "airport_crew", "last_name"),
+)
+
+
+def create_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'"
+        )
+        if cursor.fetchone() is None:
+            # Without the contrib package search falls back to icontains
+            return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for name, table, column in INDEXES:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS "{name}" ON "{table}" '
+            f'USING gin ("{column}" gin_trgm_ops)'
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for name, _, _ in INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS "{name}"')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("airport", "0007_outboxevent"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
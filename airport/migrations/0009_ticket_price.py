@@ -0,0 +1,20 @@
+# Generated by Django 4.2.11 on 2026-10-19 10:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("airport", "0008_trigram_search_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="ticket",
+            name="price",
+            field=models.DecimalField(
+                blank=True, decimal_places=2, max_digits=10, null=True
+            ),
+        ),
+    ]
@@ -1,5 +1,5 @@
+import hashlib
 import pathlib
-import uuid
 
 from django.db import models
 from django.conf import settings
@@ -14,9 +14,18 @@ class AirplaneType(models.Model):
         return self.name
 
 
+def content_hash(file, length: int = 16) -> str:
+    """Return a short sha256 hex digest of the file contents"""
+    digest = hashlib.sha256()
+    for chunk in file.chunks():
+        digest.update(chunk)
+    file.seek(0)
+    return digest.hexdigest()[:length]
+
+
 def create_custom_path(instance: "Airplane", filename: str) -> pathlib.Path:
     filename = (
-        f"{slugify(instance.name)}-{uuid.uuid4()}"
+        f"{slugify(instance.name)}-{content_hash(instance.image)}"
         + pathlib.Path(filename).suffix
     )
     return pathlib.Path("uploads/airplanes/") / pathlib.Path(filename)
@@ -92,6 +101,12 @@ class Order(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(
+                fields=["user", "-created_at"],
+                name="airport_order_user_created_idx",
+            ),
+        ]
 
 
 class Ticket(models.Model):
@@ -103,6 +118,10 @@ class Ticket(models.Model):
     order = models.ForeignKey(
         Order, on_delete=models.CASCADE, related_name="tickets"
     )
+    # Fare at booking time, see airport.pricing; empty for older tickets
+    price = models.DecimalField(
+        max_digits=10, decimal_places=2, null=True, blank=True
+    )
 
     class Meta:
         unique_together = ("seat", "flight")
@@ -143,3 +162,77 @@ class Ticket(models.Model):
             using=using,
             update_fields=update_fields,
         )
+
+
+class OutboxEvent(models.Model):
+    """
+    Domain event written in the same transaction as the change it
+    describes and published later by the relay_outbox command.
+    """
+
+    topic = models.CharField(max_length=64)
+    key = models.CharField(max_length=64)
+    payload = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ("id",)
+
+    def __str__(self):
+        return f"{self.topic} {self.key}"
+
+    def as_message(self) -> dict:
+        return {
+            "id": self.id,
+            "topic": self.topic,
+            "key": self.key,
+            "created_at": self.created_at.isoformat(),
+            "payload": self.payload,
+        }
+
+
+class ArchivedOrder(models.Model):
+    """
+    An order whose flights all departed long ago, moved out of Order by
+    the archive_past_flights command with its id and tickets kept.
+    """
+
+    id = models.BigIntegerField(primary_key=True)
+    created_at = models.DateTimeField()
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE
+    )
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.created_at.strftime("%Y-%m-%d %H:%M:%S")
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(
+                fields=["user", "-created_at"],
+                name="airport_arch_user_created_idx",
+            ),
+        ]
+
+
+class ArchivedTicket(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    row = models.IntegerField()
+    seat = models.IntegerField()
+    flight = models.ForeignKey(
+        Flight, on_delete=models.CASCADE, related_name="archived_tickets"
+    )
+    order = models.ForeignKey(
+        ArchivedOrder, on_delete=models.CASCADE, related_name="tickets"
+    )
+    price = models.DecimalField(
+        max_digits=10, decimal_places=2, null=True, blank=True
+    )
+
+    class Meta:
+        ordering = ("seat",)
+
+    def __str__(self):
+        return f"{self.flight} - {self.seat}"
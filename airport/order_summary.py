@@ -0,0 +1,95 @@
+"""
+Per-user order summary: counts, upcoming flights and the last N orders.
+
+The summary is built from the database once and cached for
+ORDER_SUMMARY_CACHE_TTL. A committed booking, deleting orders, tickets or
+flights, archiving orders or editing them in the admin drops the cached
+summary, and the next request builds it again. Dropping rather than
+updating the cached copy in place leaves nothing for two concurrent
+bookings to race on; the short TTL bounds how long a summary built
+alongside a change may live.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from airport.models import Flight, Order
+
+SUMMARY_CACHE_KEY = "airport:order-summary:{}"
+
+
+def _flight_entry(flight, tickets: int) -> dict:
+    return {
+        "id": flight.id,
+        "route": str(flight.route),
+        "departure_time": flight.departure_time.isoformat(),
+        "tickets": tickets,
+    }
+
+
+def _order_entry(order, tickets: int) -> dict:
+    return {
+        "id": order.id,
+        "created_at": order.created_at.isoformat(),
+        "tickets": tickets,
+    }
+
+
+def build_summary(user_id) -> dict:
+    orders = Order.objects.filter(user_id=user_id)
+    recent = orders.annotate(ticket_count=Count("tickets")).order_by(
+        "-created_at"
+    )[: settings.ORDER_SUMMARY_RECENT_ORDERS]
+    upcoming = (
+        Flight.objects.filter(
+            tickets__order__user_id=user_id,
+            departure_time__gt=timezone.now(),
+        )
+        .select_related("route__source", "route__destination")
+        .annotate(ticket_count=Count("tickets"))
+        .order_by("departure_time")
+    )
+
+    counts = orders.aggregate(
+        orders=Count("id", distinct=True), tickets=Count("tickets")
+    )
+
+    return {
+        "orders": counts["orders"],
+        "tickets": counts["tickets"],
+        "upcoming_flights": [
+            _flight_entry(flight, flight.ticket_count) for flight in upcoming
+        ],
+        "recent_orders": [
+            _order_entry(order, order.ticket_count) for order in recent
+        ],
+    }
+
+
+def get_summary(user_id) -> dict:
+    """Return the cached summary, building it on the first request"""
+    key = SUMMARY_CACHE_KEY.format(user_id)
+    summary = cache.get(key)
+    if summary is None:
+        summary = build_summary(user_id)
+        cache.set(key, summary, settings.ORDER_SUMMARY_CACHE_TTL)
+
+    now = timezone.now()
+    summary["upcoming_flights"] = [
+        flight
+        for flight in summary["upcoming_flights"]
+        if parse_datetime(flight["departure_time"]) > now
+    ]
+    return summary
+
+
+def invalidate_summary(user_id) -> None:
+    cache.delete(SUMMARY_CACHE_KEY.format(user_id))
+
+
+def invalidate_summaries(user_ids) -> None:
+    cache.delete_many(
+        [SUMMARY_CACHE_KEY.format(user_id) for user_id in user_ids]
+    )
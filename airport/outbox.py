@@ -0,0 +1,108 @@
+"""
+Transactional outbox for booking events.
+
+Writers call record_event() inside the transaction that changes the data,
+so an event exists exactly when the change is committed. The relay_outbox
+management command drains the table in batches, locking rows with
+SELECT ... FOR UPDATE SKIP LOCKED so several relays can run side by side,
+hands each batch to the configured sink and deletes it once published.
+Delivery is at least once: a batch whose sink fails is rolled back and
+retried.
+"""
+import json
+import sys
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+from airport.models import OutboxEvent
+
+BOOKING_CREATED = "booking.created"
+
+
+def record_event(topic: str, key, payload: dict) -> OutboxEvent:
+    return OutboxEvent.objects.create(
+        topic=topic, key=str(key), payload=payload
+    )
+
+
+def record_booking(order, tickets) -> OutboxEvent:
+    return record_event(
+        BOOKING_CREATED,
+        order.id,
+        {
+            "order": order.id,
+            "user": order.user_id,
+            "created_at": order.created_at.isoformat(),
+            "tickets": [
+                {
+                    "id": ticket.id,
+                    "flight": ticket.flight_id,
+                    "row": ticket.row,
+                    "seat": ticket.seat,
+                    "price": str(ticket.price),
+                }
+                for ticket in tickets
+            ],
+        },
+    )
+
+
+class BaseSink:
+    """Publishes a batch of events; raising makes the batch retry later"""
+
+    def publish(self, messages: list) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class StreamSink(BaseSink):
+    """Writes events as JSON lines to a stream, stdout by default"""
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+
+    def publish(self, messages):
+        for message in messages:
+            self.stream.write(json.dumps(message) + "\n")
+        self.stream.flush()
+
+
+class FileSink(StreamSink):
+    """Appends events as JSON lines to a file"""
+
+    def __init__(self, path):
+        super().__init__(open(path, "a", encoding="utf-8"))
+
+    def close(self):
+        self.stream.close()
+
+
+def get_sink(backend=None, **options) -> BaseSink:
+    config = settings.OUTBOX_SINK
+    if backend is None:
+        backend = config["BACKEND"]
+        options = {**config.get("OPTIONS", {}), **options}
+    return import_string(backend)(**options)
+
+
+def relay_batch(sink: BaseSink, batch_size: int) -> int:
+    """Publish and delete up to batch_size pending events"""
+    with transaction.atomic():
+        events = list(
+            OutboxEvent.objects.select_for_update(skip_locked=True).order_by(
+                "id"
+            )[:batch_size]
+        )
+        if not events:
+            return 0
+
+        sink.publish([event.as_message() for event in events])
+        OutboxEvent.objects.filter(
+            id__in=[event.id for event in events]
+        ).delete()
+
+    return len(events)
@@ -0,0 +1,156 @@
+"""
+Fare engine: ticket prices from distance, load factor and time to departure.
+
+    price = fare of the route's distance band
+            x load factor multiplier (sold tickets / capacity)
+            x time-to-departure multiplier
+
+The bands and multipliers are step tables in settings (FARE_DISTANCE_BANDS,
+FARE_LOAD_FACTORS, FARE_DEPARTURE_WINDOWS). For each flight the grid of
+prices per load tier and departure window is precomputed, so a price is
+two bisects and a lookup.
+
+Booked tickets are always priced from the number of tickets the database
+holds, counted in one query for the whole order. Only the quotes shown in
+flight lists are cached: quote_flights() keeps each flight's table with its
+sold count for FARE_TABLE_TTL, prices a whole page with a single cache
+round trip and builds missing entries from the rows at hand (the flight
+list already selects the route and airplane and annotates remaining_seats,
+so listing prices costs no extra queries). Bookings through the API and
+changes to a flight drop its entry; other changes, such as tickets edited
+in the admin or routes and airplanes, are picked up within FARE_TABLE_TTL.
+"""
+from bisect import bisect_right
+from collections import Counter
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count
+from django.utils import timezone
+
+from airport.models import Ticket
+
+QUOTE_CACHE_KEY = "airport:fares:{}"
+
+CENT = Decimal("0.01")
+
+
+def band_fare(distance: int) -> Decimal:
+    for upper, fare in settings.FARE_DISTANCE_BANDS:
+        if upper is None or distance <= upper:
+            return Decimal(fare)
+    raise ValueError(f"No fare band for {distance} km")
+
+
+class FareTable:
+    """Prices of one flight for every load tier and departure window"""
+
+    def __init__(self, fare: Decimal, capacity: int, departure_time):
+        self.capacity = capacity
+        self.departure_time = departure_time
+        self.load_factors = [
+            float(threshold) for threshold, _ in settings.FARE_LOAD_FACTORS
+        ]
+        self.windows = [
+            float(days) for days, _ in settings.FARE_DEPARTURE_WINDOWS
+        ]
+        self.prices = [
+            [
+                (fare * Decimal(load) * Decimal(window)).quantize(CENT)
+                for _, window in settings.FARE_DEPARTURE_WINDOWS
+            ]
+            for _, load in settings.FARE_LOAD_FACTORS
+        ]
+
+    @classmethod
+    def for_flight(cls, flight) -> "FareTable":
+        return cls(
+            band_fare(flight.route.distance),
+            flight.airplane.capacity,
+            flight.departure_time,
+        )
+
+    def price(self, sold: int, now=None) -> Decimal:
+        now = now or timezone.now()
+        load = sold / self.capacity if self.capacity else 1.0
+        days = (self.departure_time - now).total_seconds() / (24 * 60 * 60)
+        tier = max(bisect_right(self.load_factors, load) - 1, 0)
+        window = max(bisect_right(self.windows, days) - 1, 0)
+        return self.prices[tier][window]
+
+
+def sold_tickets(flight) -> int:
+    remaining = getattr(flight, "remaining_seats", None)
+    if remaining is not None:
+        return flight.airplane.capacity - remaining
+    return flight.tickets.count()
+
+
+def cached_quotes(flights) -> dict:
+    """Return {flight id: (table, sold tickets)}, building what's missing"""
+    keys = {flight.id: QUOTE_CACHE_KEY.format(flight.id) for flight in flights}
+    cached = cache.get_many(list(keys.values()))
+
+    quotes = {}
+    built = {}
+    for flight in flights:
+        if flight.id in quotes:
+            continue
+        quote = cached.get(keys[flight.id])
+        if quote is None:
+            quote = (FareTable.for_flight(flight), sold_tickets(flight))
+            built[keys[flight.id]] = quote
+        quotes[flight.id] = quote
+
+    if built:
+        cache.set_many(built, settings.FARE_TABLE_TTL)
+    return quotes
+
+
+def quote_flights(flights, now=None) -> dict:
+    """Return {flight id: current price} for the next seat of each flight"""
+    now = now or timezone.now()
+    return {
+        flight_id: table.price(sold, now)
+        for flight_id, (table, sold) in cached_quotes(flights).items()
+    }
+
+
+def price_tickets(flights, now=None) -> list:
+    """
+    Price one new ticket per entry of flights, in order; every ticket
+    raises the load factor seen by the next one on the same flight.
+    """
+    now = now or timezone.now()
+    cached = cache.get_many(
+        [QUOTE_CACHE_KEY.format(flight.id) for flight in flights]
+    )
+    tables = {}
+    for flight in flights:
+        if flight.id not in tables:
+            quote = cached.get(QUOTE_CACHE_KEY.format(flight.id))
+            tables[flight.id] = (
+                quote[0] if quote else FareTable.for_flight(flight)
+            )
+    # Counted here rather than taken from the cached quote, which may be
+    # up to FARE_TABLE_TTL old
+    booked = Counter(
+        dict(
+            Ticket.objects.filter(flight__in=tables)
+            .values_list("flight_id")
+            .annotate(Count("id"))
+            .order_by()
+        )
+    )
+    prices = []
+    for flight in flights:
+        prices.append(tables[flight.id].price(booked[flight.id], now))
+        booked[flight.id] += 1
+    return prices
+
+
+def invalidate_fares(*flight_ids) -> None:
+    cache.delete_many(
+        [QUOTE_CACHE_KEY.format(flight_id) for flight_id in flight_ids]
+    )
@@ -0,0 +1,130 @@
+"""
+Server-Sent Events stream of seat availability for one flight.
+
+Instead of polling the flight detail for ``taken_seats``, a seat map opens
+``/api/v1/airport/flights/<id>/seats/stream/`` and receives:
+
+* a ``snapshot`` event with every taken seat when it connects (and again
+  if it falls behind and misses deltas),
+* a ``seat`` event per ticket sold (``"taken"``) or removed
+  (``"released"``) once the change is committed.
+
+EventSource can't send an Authorization header, so besides the usual
+bearer token the stream accepts a short-lived stream token, issued by
+``POST /api/v1/user/token/stream/``, in the ``token`` query parameter:
+``.../seats/stream/?token=<token>``. The token is only checked when the
+stream opens; a client whose reconnect is refused fetches a new one.
+
+The view is async and meant to be served by the ASGI application, where an
+open stream costs a queue entry instead of a worker thread. Streams end
+after SEAT_STREAM_MAX_SECONDS and the browser reconnects on its own, which
+also bounds how long a stream outlives a client that went away.
+"""
+import asyncio
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction
+from django.http import StreamingHttpResponse
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import extend_schema
+from rest_framework.exceptions import NotFound
+
+from airport.async_views import AsyncAPIView, release_connections
+from airport.models import Flight, Ticket
+from airport_api_service import pubsub
+from user.authentication import (
+    CachedJWTAuthentication,
+    QueryTokenAuthentication,
+)
+
+TAKEN = "taken"
+RELEASED = "released"
+
+
+def seat_channel(flight_id) -> str:
+    return f"flight-seats:{flight_id}"
+
+
+def publish_seat_change(ticket, change: str) -> None:
+    """Publish a seat delta once the current transaction commits"""
+    message = {
+        "flight": ticket.flight_id,
+        "row": ticket.row,
+        "seat": ticket.seat,
+        "change": change,
+    }
+    transaction.on_commit(
+        lambda: pubsub.publish(seat_channel(ticket.flight_id), message)
+    )
+
+
+def format_event(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def taken_seats(flight_id) -> list:
+    return [
+        seat
+        async for seat in Ticket.objects.filter(flight_id=flight_id)
+        .order_by("row", "seat")
+        .values("row", "seat")
+    ]
+
+
+async def seat_events(flight_id):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + settings.SEAT_STREAM_MAX_SECONDS
+    # Subscribe once the response is actually streamed, so a response that
+    # is never iterated holds no subscription, and before the snapshot so
+    # no delta falls in between
+    with pubsub.subscribe(
+        seat_channel(flight_id), maxsize=settings.SEAT_STREAM_QUEUE_SIZE
+    ) as subscription:
+        yield f"retry: {settings.SEAT_STREAM_RETRY_MS}\n\n"
+        resync = True
+        while loop.time() < deadline:
+            if resync:
+                resync = False
+                taken = await taken_seats(flight_id)
+                await sync_to_async(release_connections)()
+                yield format_event(
+                    "snapshot", {"flight": flight_id, "taken": taken}
+                )
+            timeout = min(
+                settings.SEAT_STREAM_HEARTBEAT_SECONDS,
+                max(deadline - loop.time(), 0),
+            )
+            try:
+                message = await subscription.get(timeout=timeout)
+            except asyncio.TimeoutError:
+                # Comments keep proxies from closing an idle connection
+                yield ": heartbeat\n\n"
+                continue
+            if message is pubsub.RESYNC:
+                resync = True
+            else:
+                yield format_event("seat", message)
+
+
+class FlightSeatStreamView(AsyncAPIView):
+    """Seat availability of one flight as Server-Sent Events"""
+
+    # EventSource can't send an Authorization header
+    authentication_classes = (
+        QueryTokenAuthentication,
+        CachedJWTAuthentication,
+    )
+
+    @extend_schema(responses={(200, "text/event-stream"): OpenApiTypes.STR})
+    async def get(self, request, pk):
+        if not await Flight.objects.filter(pk=pk).aexists():
+            raise NotFound()
+
+        response = StreamingHttpResponse(
+            seat_events(pk), content_type="text/event-stream"
+        )
+        response["Cache-Control"] = "no-cache"
+        response["X-Accel-Buffering"] = "no"
+        return response
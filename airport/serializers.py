@@ -1,4 +1,7 @@
 from django.db import transaction
+from django.db.models.manager import BaseManager
+from django.utils import timezone
+from drf_spectacular.utils import extend_schema_field
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
 
@@ -11,7 +14,13 @@ from airport.models import (
     Flight,
     Ticket,
     Order,
+    ArchivedOrder,
+    ArchivedTicket,
 )
+from airport.events import tickets_booked
+from airport.outbox import record_booking
+from airport.pricing import price_tickets, quote_flights
+from airport.tasks import publish_booking_events
 
 
 class AirplaneTypeSerializer(serializers.ModelSerializer):
@@ -141,6 +150,15 @@ class FlightDetailSerializer(FlightSerializer):
         )
 
 
+class FlightPriceListSerializer(serializers.ListSerializer):
+    """Quotes every flight of the list at once, see airport.pricing"""
+
+    def to_representation(self, data):
+        flights = list(data.all() if isinstance(data, BaseManager) else data)
+        self.prices = quote_flights(flights)
+        return super().to_representation(flights)
+
+
 class FlightListSerializer(FlightSerializer):
     route = serializers.StringRelatedField()
     airplane_name = serializers.CharField(
@@ -151,6 +169,7 @@ class FlightListSerializer(FlightSerializer):
     )
     crew = serializers.StringRelatedField(many=True)
     remaining_seats = serializers.IntegerField(read_only=True)
+    price = serializers.SerializerMethodField()
 
     class Meta:
         model = Flight
@@ -163,7 +182,18 @@ class FlightListSerializer(FlightSerializer):
             "arrival_time",
             "crew",
             "remaining_seats",
+            "price",
         )
+        list_serializer_class = FlightPriceListSerializer
+
+    @extend_schema_field(
+        serializers.DecimalField(max_digits=10, decimal_places=2)
+    )
+    def get_price(self, flight):
+        prices = getattr(self.parent, "prices", None)
+        if prices is None:
+            prices = quote_flights([flight])
+        return str(prices[flight.id])
 
 
 class TicketSerializer(serializers.ModelSerializer):
@@ -174,10 +204,16 @@ class TicketSerializer(serializers.ModelSerializer):
             "flight",
             "row",
             "seat",
+            "price",
         )
+        read_only_fields = ("price",)
 
     def validate(self, attrs):
         data = super(TicketSerializer, self).validate(attrs=attrs)
+        # Tickets of departed flights get archived, and the seat checks
+        # only see live tickets, see airport.archive
+        if attrs["flight"].departure_time <= timezone.now():
+            raise ValidationError({"flight": "flight has already departed"})
         Ticket.validate_ticket(
             attrs["row"],
             attrs["seat"],
@@ -200,6 +236,7 @@ class TicketListSerializer(TicketSerializer):
             "route",
             "row",
             "seat",
+            "price",
             "order",
         )
 
@@ -219,10 +256,35 @@ class OrderSerializer(serializers.ModelSerializer):
         with transaction.atomic():
             tickets_data = validated_data.pop("tickets")
             order = Order.objects.create(**validated_data)
-            for ticket_data in tickets_data:
-                Ticket.objects.create(order=order, **ticket_data)
+            prices = price_tickets(
+                [ticket_data["flight"] for ticket_data in tickets_data]
+            )
+            tickets = [
+                Ticket(order=order, price=price, **ticket_data)
+                for ticket_data, price in zip(tickets_data, prices)
+            ]
+            for ticket in tickets:
+                ticket.full_clean()
+            # One INSERT and one tickets_booked instead of a post_save per
+            # ticket, see airport.events
+            tickets = Ticket.objects.bulk_create(tickets)
+            tickets_booked.send(sender=Order, order=order, tickets=tickets)
+            record_booking(order, tickets)
+            publish_booking_events.enqueue()
             return order
 
 
 class OrderListSerializer(OrderSerializer):
     tickets = TicketListSerializer(many=True, read_only=True)
+
+
+class ArchivedTicketListSerializer(TicketListSerializer):
+    class Meta(TicketListSerializer.Meta):
+        model = ArchivedTicket
+
+
+class ArchivedOrderListSerializer(OrderListSerializer):
+    tickets = ArchivedTicketListSerializer(many=True, read_only=True)
+
+    class Meta(OrderListSerializer.Meta):
+        model = ArchivedOrder
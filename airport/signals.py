@@ -0,0 +1,108 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from airport import autocomplete, catalog_cache, pricing
+from airport.events import deleted_through, tickets_booked
+from airport.models import (
+    Airplane,
+    AirplaneType,
+    Airport,
+    Crew,
+    Flight,
+    Order,
+    Route,
+    Ticket,
+)
+from airport.order_summary import invalidate_summaries, invalidate_summary
+from airport.seat_stream import RELEASED, TAKEN, publish_seat_change
+
+
+# Models whose delete() cascades through Flight to its tickets
+FLIGHT_CASCADES = (AirplaneType, Airplane, Airport, Route, Flight)
+
+
+@receiver(post_delete, sender=Order)
+def order_deleted(sender, instance, **kwargs):
+    invalidate_summary(instance.user_id)
+
+
+@receiver(pre_delete, sender=Flight)
+def flight_deleting(sender, instance, **kwargs):
+    # One query for everyone booked on the flight instead of one per ticket
+    user_ids = set(
+        Order.objects.filter(tickets__flight=instance).values_list(
+            "user_id", flat=True
+        )
+    )
+    transaction.on_commit(lambda: invalidate_summaries(user_ids))
+
+
+@receiver(post_delete, sender=Ticket)
+def ticket_deleted(sender, instance, origin=None, **kwargs):
+    through = deleted_through(origin)
+    if through in FLIGHT_CASCADES:
+        # flight_deleting has dropped the summaries, and nobody follows the
+        # seats of a flight that is gone
+        return
+    if through is Ticket:
+        if Ticket.order.is_cached(instance):
+            user_id = instance.order.user_id
+        else:
+            user_id = (
+                Order.objects.filter(pk=instance.order_id)
+                .values_list("user_id", flat=True)
+                .first()
+            )
+        if user_id is not None:
+            invalidate_summary(user_id)
+    # Otherwise the ticket went with its order and order_deleted drops the
+    # summary once for all of them
+    publish_seat_change(instance, RELEASED)
+
+
+@receiver(post_save, sender=Ticket)
+def ticket_saved(sender, instance, created, **kwargs):
+    if created:
+        publish_seat_change(instance, TAKEN)
+
+
+@receiver(tickets_booked)
+def order_booked(sender, order, tickets, **kwargs):
+    for ticket in tickets:
+        publish_seat_change(ticket, TAKEN)
+    flight_ids = {ticket.flight_id for ticket in tickets}
+    transaction.on_commit(lambda: invalidate_summary(order.user_id))
+    transaction.on_commit(lambda: pricing.invalidate_fares(*flight_ids))
+
+
+@receiver(post_save, sender=Flight)
+def flight_saved(sender, instance, created, **kwargs):
+    if not created:
+        transaction.on_commit(lambda: pricing.invalidate_fares(instance.id))
+
+
+@receiver(post_save, sender=Airport)
+@receiver(post_delete, sender=Airport)
+def airport_changed(sender, **kwargs):
+    transaction.on_commit(autocomplete.airports.invalidate)
+
+
+@receiver(post_save, sender=Crew)
+@receiver(post_delete, sender=Crew)
+def crew_changed(sender, **kwargs):
+    transaction.on_commit(autocomplete.crew.invalidate)
+
+
+@receiver(post_save, sender=AirplaneType)
+@receiver(post_delete, sender=AirplaneType)
+@receiver(post_save, sender=Airplane)
+@receiver(post_delete, sender=Airplane)
+@receiver(post_save, sender=Airport)
+@receiver(post_delete, sender=Airport)
+@receiver(post_save, sender=Route)
+@receiver(post_delete, sender=Route)
+@receiver(post_save, sender=Crew)
+@receiver(post_delete, sender=Crew)
+def catalog_changed(sender, **kwargs):
+    transaction.on_commit(catalog_cache.invalidate)
@@ -0,0 +1,26 @@
+from django.core.files.storage import default_storage
+
+from airport.models import Airplane
+from airport.outbox import get_sink, relay_batch
+from taskqueue.registry import task
+
+
+@task(queue="bookings", batch=True)
+def publish_booking_events(payloads):
+    """
+    Push outbox events right after bookings commit. Queued runs are
+    batched, so a burst of bookings drains the outbox once.
+    """
+    sink = get_sink()
+    try:
+        while relay_batch(sink, batch_size=500):
+            pass
+    finally:
+        sink.close()
+
+
+@task(queue="media")
+def delete_unused_image(name):
+    """Remove a replaced airplane image unless another airplane uses it"""
+    if not Airplane.objects.filter(image=name).exists():
+        default_storage.delete(name)
@@ -0,0 +1,5 @@
+from django.test import override_settings
+
+# API tests of the airport app fail on repeated query shapes (N+1 queries),
+# see airport_api_service.querylog
+strict_queries = override_settings(N_PLUS_ONE_STRICT=True)
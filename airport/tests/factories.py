@@ -0,0 +1,123 @@
+"""
+Factories for the airport model graph.
+
+Each sample_* function creates one object with sensible defaults, and the
+objects it depends on unless they are passed in. Call them from
+setUpTestData where the tests of a class don't need fresh rows, so the
+graph is built once per class instead of once per test.
+"""
+from django.contrib.auth import get_user_model
+
+from airport.models import (
+    Airplane,
+    AirplaneType,
+    Airport,
+    Crew,
+    Flight,
+    Order,
+    Route,
+    Ticket,
+)
+
+
+def sample_user(**params):
+    defaults = {
+        "email": "testuser@gmail.com",
+        "password": "testuser123",
+    }
+    defaults.update(params)
+
+    return get_user_model().objects.create_user(**defaults)
+
+
+def sample_airplane_type(**params):
+    defaults = {
+        "name": "Type A",
+    }
+    defaults.update(params)
+
+    return AirplaneType.objects.create(**defaults)
+
+
+def sample_airplane(**params):
+    if "airplane_type" not in params:
+        params["airplane_type"] = sample_airplane_type()
+
+    defaults = {
+        "name": "Airplane 1",
+        "rows": 10,
+        "seats_in_row": 4,
+    }
+    defaults.update(params)
+
+    return Airplane.objects.create(**defaults)
+
+
+def sample_airport(**params):
+    defaults = {
+        "name": "Airport 1",
+        "closest_big_city": "City 1",
+    }
+    defaults.update(params)
+
+    return Airport.objects.create(**defaults)
+
+
+def sample_route(name="Airport", **params):
+    """A route between two new airports, "<name> A" and "<name> B" """
+    if "source" not in params:
+        params["source"] = sample_airport(
+            name=f"{name} A", closest_big_city="City"
+        )
+    if "destination" not in params:
+        params["destination"] = sample_airport(
+            name=f"{name} B", closest_big_city="City"
+        )
+
+    defaults = {
+        "distance": 1000,
+    }
+    defaults.update(params)
+
+    return Route.objects.create(**defaults)
+
+
+def sample_crew(**params):
+    defaults = {
+        "first_name": "John",
+        "last_name": "Doe",
+    }
+    defaults.update(params)
+
+    return Crew.objects.create(**defaults)
+
+
+def sample_flight(crew=(), **params):
+    if "route" not in params:
+        params["route"] = sample_route()
+    if "airplane" not in params:
+        params["airplane"] = sample_airplane()
+
+    defaults = {
+        "departure_time": "2024-06-01T12:00:00Z",
+        "arrival_time": "2024-06-01T14:00:00Z",
+    }
+    defaults.update(params)
+
+    flight = Flight.objects.create(**defaults)
+    if crew:
+        flight.crew.set(crew)
+    return flight
+
+
+def sample_order(user, seats=(), flight=None, **params):
+    """An order of `user`, with a ticket on `flight` for each of `seats`"""
+    order = Order.objects.create(user=user, **params)
+    for seat in seats:
+        Ticket.objects.create(
+            flight=flight,
+            row=(seat - 1) // flight.airplane.seats_in_row + 1,
+            seat=seat,
+            order=order,
+        )
+    return order
@@ -9,7 +9,9 @@ from django.urls import reverse
 from rest_framework.test import APIClient
 from rest_framework import status
 
-from airport.models import Airplane, AirplaneType
+from airport.tests import strict_queries
+from airport.tests.factories import sample_airplane, sample_airplane_type
+from airport.models import Airplane
 from airport.serializers import (
     AirplaneListSerializer,
 )
@@ -18,29 +20,6 @@ from airport.serializers import (
 AIRPLANE_URL = reverse("airport:airplane-list")
 
 
-def sample_airplane_type(**params):
-    defaults = {
-        "name": "Type A",
-    }
-    defaults.update(params)
-
-    return AirplaneType.objects.create(**defaults)
-
-
-def sample_airplane(**params):
-    if "airplane_type" not in params:
-        params["airplane_type"] = sample_airplane_type()
-
-    defaults = {
-        "name": "Airplane 1",
-        "rows": 10,
-        "seats_in_row": 4,
-    }
-    defaults.update(params)
-
-    return Airplane.objects.create(**defaults)
-
-
 def detail_url(airplane_id) -> str:
     return reverse("airport:airplane-detail", args=[airplane_id])
 
@@ -52,6 +31,7 @@ def temporary_image():
     return SimpleUploadedFile("test.jpg", bts.getvalue())
 
 
+@strict_queries
 class UnauthenticatedTestAirplaneViewSetApiTest(TestCase):
     def setUp(self):
         self.client = APIClient()
@@ -62,6 +42,7 @@ class UnauthenticatedTestAirplaneViewSetApiTest(TestCase):
         self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
 
 
+@strict_queries
 class AuthenticatedTestAirplaneViewSetApiTest(TestCase):
 
     def setUp(self):
@@ -83,6 +64,7 @@ class AuthenticatedTestAirplaneViewSetApiTest(TestCase):
         self.assertEqual(res.data, serializer.data)
 
 
+@strict_queries
 class AuthenticatedAdminTestAirplaneViewSetApiTest(TestCase):
 
     def setUp(self):
@@ -0,0 +1,27 @@
+from django.test import TestCase, override_settings
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.tests import strict_queries
+from airport.tests.factories import sample_user
+
+
+@strict_queries
+@override_settings(ROOT_URLCONF="airport_api_service.urls_api")
+class ApiProfileUrlsTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(sample_user())
+
+    def test_api_is_served(self):
+        res = self.client.get("/api/v1/airport/routes/")
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_admin_and_documentation_are_left_out(self):
+        for path in ("/admin/", "/api/v1/schema/", "/__debug__/"):
+            with self.subTest(path):
+                res = self.client.get(path)
+
+                self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
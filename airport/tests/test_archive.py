@@ -0,0 +1,157 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.archive import archive_orders, cutoff_for
+from airport.models import ArchivedOrder, ArchivedTicket, Order, Ticket
+from airport.tests import strict_queries
+from airport.tests.factories import (
+    sample_airplane,
+    sample_flight,
+    sample_order,
+    sample_route,
+    sample_user,
+)
+from analytics import rollups
+from analytics.models import FlightStats
+
+ORDER_URL = reverse("airport:order-list")
+ORDER_TICKETS_URL = reverse("airport:order-tickets")
+ORDER_SUMMARY_URL = reverse("airport:order-summary")
+
+
+def departing_in(days):
+    departure = timezone.now() + timedelta(days=days)
+    return {
+        "departure_time": departure,
+        "arrival_time": departure + timedelta(hours=2),
+    }
+
+
+@strict_queries
+class ArchiveTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = sample_user()
+        route = sample_route()
+        airplane = sample_airplane()
+        cls.departed = sample_flight(
+            route=route, airplane=airplane, **departing_in(-200)
+        )
+        cls.upcoming = sample_flight(
+            route=route, airplane=airplane, **departing_in(30)
+        )
+        cls.old_order = sample_order(
+            cls.user, seats=(1, 2), flight=cls.departed
+        )
+        cls.mixed_order = sample_order(
+            cls.user, seats=(3,), flight=cls.departed
+        )
+        sample_order(cls.user, seats=(1,), flight=cls.upcoming)
+        Ticket.objects.create(
+            flight=cls.upcoming, order=cls.mixed_order, row=1, seat=2
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def archive(self, **options):
+        stderr = StringIO()
+        call_command("archive_past_flights", stderr=stderr, **options)
+        return stderr.getvalue()
+
+    def test_orders_of_departed_flights_are_moved(self):
+        self.archive(days=90)
+
+        self.assertFalse(Order.objects.filter(pk=self.old_order.pk).exists())
+        archived = ArchivedOrder.objects.get()
+        self.assertEqual(archived.pk, self.old_order.pk)
+        self.assertEqual(archived.created_at, self.old_order.created_at)
+        self.assertEqual(
+            set(archived.tickets.values_list("seat", "flight")),
+            {(1, self.departed.id), (2, self.departed.id)},
+        )
+        # An order with a ticket still to fly stays whole
+        self.assertEqual(Order.objects.count(), 2)
+        self.assertEqual(Ticket.objects.count(), 3)
+
+    def test_batches(self):
+        sample_order(self.user, seats=(4,), flight=self.departed)
+
+        moved = list(archive_orders(cutoff_for(90), batch_size=1))
+
+        self.assertEqual(moved, [(1, 2), (1, 1)])
+        self.assertEqual(ArchivedTicket.objects.count(), 3)
+
+    def test_archived_history_is_read_on_request(self):
+        before = self.client.get(ORDER_URL, {"page_size": 10}).json()
+        ticket_before = self.client.get(
+            ORDER_TICKETS_URL, {"page_size": 10}
+        ).json()
+        self.archive(days=90)
+
+        live = self.client.get(ORDER_URL, {"page_size": 10}).json()
+        archived = self.client.get(
+            ORDER_URL, {"page_size": 10, "archived": "true"}
+        ).json()
+        tickets = self.client.get(
+            ORDER_TICKETS_URL, {"archived": "true"}
+        ).json()
+
+        self.assertEqual(live["count"], 2)
+        self.assertEqual(
+            archived["results"],
+            [o for o in before["results"] if o["id"] == self.old_order.pk],
+        )
+        self.assertEqual(
+            tickets["results"],
+            [
+                t
+                for t in ticket_before["results"]
+                if t["id"] in {row["id"] for row in tickets["results"]}
+            ],
+        )
+        self.assertEqual(tickets["count"], 2)
+
+    def test_rollups_keep_archived_tickets(self):
+        self.archive(days=90)
+        stats = FlightStats.objects.get(flight_id=self.departed.id)
+        self.assertEqual(stats.tickets, 3)
+
+        rollups.rebuild()
+
+        stats = FlightStats.objects.get(flight_id=self.departed.id)
+        self.assertEqual(stats.tickets, 3)
+
+    def test_summaries_are_dropped(self):
+        summary = self.client.get(ORDER_SUMMARY_URL).json()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            output = self.archive(days=90)
+
+        self.assertEqual(
+            self.client.get(ORDER_SUMMARY_URL).json()["orders"],
+            summary["orders"] - 1,
+        )
+        # The tests run with a per-process cache
+        self.assertIn("Configure a shared cache", output)
+
+    def test_departed_flights_cannot_be_booked(self):
+        res = self.client.post(
+            ORDER_URL,
+            {"tickets": [{"flight": self.departed.id, "row": 1, "seat": 5}]},
+            format="json",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("departed", str(res.data))
@@ -0,0 +1,159 @@
+import json
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from airport.models import Ticket
+from airport.tests import strict_queries
+from airport.tests.factories import (
+    sample_airplane,
+    sample_airport,
+    sample_crew,
+    sample_flight,
+    sample_order,
+    sample_route,
+    sample_user,
+)
+
+ASYNC_FLIGHT_URL = reverse("airport:async-flight-list")
+ASYNC_ROUTE_URL = reverse("airport:async-route-list")
+
+
+def async_detail_url(flight_id):
+    return reverse("airport:async-flight-detail", args=[flight_id])
+
+
+@strict_queries
+class AsyncViewsTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = sample_user()
+        airplane = sample_airplane()
+        source = sample_airport(name="Airport 0", closest_big_city="C")
+        cls.routes = [
+            sample_route(
+                source=source,
+                destination=sample_airport(
+                    name=f"Airport {i}", closest_big_city="C"
+                ),
+                distance=100,
+            )
+            for i in range(1, 3)
+        ]
+        crew = [
+            sample_crew(first_name="John", last_name="Doe"),
+            sample_crew(first_name="Jane", last_name="Roe"),
+        ]
+        order = sample_order(cls.user)
+        cls.flights = []
+        for i in range(12):
+            flight = sample_flight(
+                route=cls.routes[i % 2],
+                airplane=airplane,
+                crew=crew[: i % 2 + 1],
+                departure_time=f"2024-06-{i + 1:02d}T12:00:00Z",
+                arrival_time=f"2024-06-{i + 1:02d}T14:00:00Z",
+            )
+            Ticket.objects.create(flight=flight, row=1, seat=1, order=order)
+            cls.flights.append(flight)
+
+    def setUp(self):
+        cache.clear()
+        self.token = str(AccessToken.for_user(self.user))
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    async def get_async(self, url, **params):
+        response = await self.async_client.get(
+            url, params, AUTHORIZATION=f"Bearer {self.token}"
+        )
+        return response.status_code, json.loads(response.content)
+
+    async def get_sync(self, url, **params):
+        response = await sync_to_async(self.client.get)(url, params)
+        return response.status_code, response.json()
+
+    async def assert_same_as_sync(self, async_url, sync_url, **params):
+        expected = await self.get_sync(sync_url, **params)
+        self.assertEqual(expected[0], status.HTTP_200_OK)
+        code, data = await self.get_async(async_url, **params)
+        # Pagination links point at the async endpoint itself
+        data = json.loads(json.dumps(data).replace("/async/", "/"))
+        self.assertEqual((code, data), expected)
+
+    async def test_authentication_required(self):
+        response = await self.async_client.get(ASYNC_FLIGHT_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    async def test_flight_list_matches_sync_view(self):
+        sync_url = reverse("airport:flight-list")
+
+        for params in (
+            {},
+            {"page": 2, "page_size": 5},
+            {"route": str(self.routes[1].id)},
+            {"crew": "roe"},
+            {"departure_time": "2024-06-03"},
+        ):
+            with self.subTest(params=params):
+                await self.assert_same_as_sync(
+                    ASYNC_FLIGHT_URL, sync_url, **params
+                )
+
+    async def test_flight_list_pagination(self):
+        code, data = await self.get_async(ASYNC_FLIGHT_URL, page=2)
+
+        self.assertEqual(code, status.HTTP_200_OK)
+        self.assertEqual(data["count"], 12)
+        self.assertEqual(len(data["results"]), 3)
+        self.assertTrue(data["next"].endswith("?page=3"))
+        self.assertTrue(data["previous"].endswith(ASYNC_FLIGHT_URL))
+
+        code, _ = await self.get_async(ASYNC_FLIGHT_URL, page=5)
+        self.assertEqual(code, status.HTTP_404_NOT_FOUND)
+
+    async def test_flight_detail_matches_sync_view(self):
+        flight_id = self.flights[1].id
+        await self.assert_same_as_sync(
+            async_detail_url(flight_id),
+            reverse("airport:flight-detail", args=[flight_id]),
+        )
+
+    async def test_flight_detail_not_found(self):
+        code, _ = await self.get_async(async_detail_url(0))
+
+        self.assertEqual(code, status.HTTP_404_NOT_FOUND)
+
+    async def test_route_list_matches_sync_view(self):
+        await self.assert_same_as_sync(
+            ASYNC_ROUTE_URL, reverse("airport:route-list")
+        )
+
+    async def test_read_only(self):
+        response = await self.async_client.post(
+            ASYNC_ROUTE_URL, {}, AUTHORIZATION=f"Bearer {self.token}"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    async def test_options(self):
+        for url in (
+            ASYNC_FLIGHT_URL,
+            async_detail_url(self.flights[0].id),
+            ASYNC_ROUTE_URL,
+            reverse("airport:flight-seat-stream", args=[self.flights[0].id]),
+        ):
+            with self.subTest(url):
+                response = await self.async_client.options(
+                    url, AUTHORIZATION=f"Bearer {self.token}"
+                )
+
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                self.assertIn("GET", response["Allow"])
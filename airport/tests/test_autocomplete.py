@@ -0,0 +1,136 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport import autocomplete
+from airport.models import Airport, Crew
+from airport.tests import strict_queries
+
+AIRPORT_AUTOCOMPLETE_URL = reverse("airport:airport-autocomplete")
+CREW_AUTOCOMPLETE_URL = reverse("airport:crew-autocomplete")
+
+
+class PrefixIndexTests(SimpleTestCase):
+
+    def setUp(self):
+        self.index = autocomplete.PrefixIndex(
+            [
+                {"id": 1, "name": "Gatwick", "city": "London"},
+                {"id": 2, "name": "London City", "city": "London"},
+                {"id": 3, "name": "Heathrow", "city": "London"},
+                {"id": 4, "name": "Zürich", "city": "Zürich"},
+                {"id": 5, "name": "Luton", "city": "London"},
+            ],
+            ("name", "city"),
+        )
+
+    def ids(self, query, limit=10):
+        return [row["id"] for row in self.index.search(query, limit)]
+
+    def test_ranking(self):
+        # Text starting with the query first, then earlier words
+        self.assertEqual(self.ids("lon"), [2, 1, 3, 5])
+        self.assertEqual(self.ids("lu"), [5])
+
+    def test_every_token_must_match(self):
+        self.assertEqual(self.ids("london hea"), [3])
+        self.assertEqual(self.ids("city lon"), [2])
+        self.assertEqual(self.ids("heathrow zu"), [])
+
+    def test_case_and_accents_are_ignored(self):
+        self.assertEqual(self.ids("ZURI"), [4])
+
+    def test_limit_and_empty_query(self):
+        self.assertEqual(self.ids("lon", limit=2), [2, 1])
+        self.assertEqual(self.ids("  "), [])
+
+
+@strict_queries
+class AutocompleteApiTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        autocomplete.airports.invalidate()
+        autocomplete.crew.invalidate()
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_user(
+                email="testuser@gmail.com", password="testuser123"
+            )
+        )
+        for name, city in (
+            ("Gatwick", "London"),
+            ("London City", "London"),
+            ("Boryspil", "Kyiv"),
+        ):
+            Airport.objects.create(name=name, closest_big_city=city)
+        Crew.objects.create(first_name="John", last_name="Doe")
+        Crew.objects.create(first_name="Jane", last_name="Johnson")
+
+    def test_airport_autocomplete(self):
+        res = self.client.get(AIRPORT_AUTOCOMPLETE_URL, {"q": "lon"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [airport["name"] for airport in res.data],
+            ["London City", "Gatwick"],
+        )
+        self.assertEqual(
+            set(res.data[0]), {"id", "name", "closest_big_city"}
+        )
+
+    def test_crew_autocomplete(self):
+        res = self.client.get(CREW_AUTOCOMPLETE_URL, {"q": "jo", "limit": 1})
+
+        self.assertEqual(
+            res.data,
+            [
+                {
+                    "id": Crew.objects.get(last_name="Doe").id,
+                    "first_name": "John",
+                    "last_name": "Doe",
+                }
+            ],
+        )
+
+    def test_served_from_memory(self):
+        autocomplete.airports.search("lon", 10)
+
+        with self.assertNumQueries(0):
+            autocomplete.airports.search("ky", 10)
+
+    def test_index_follows_changes(self):
+        autocomplete.airports.search("lu", 10)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            luton = Airport.objects.create(
+                name="Luton", closest_big_city="London"
+            )
+        res = self.client.get(AIRPORT_AUTOCOMPLETE_URL, {"q": "lu"})
+        self.assertEqual([airport["id"] for airport in res.data], [luton.id])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            luton.delete()
+        res = self.client.get(AIRPORT_AUTOCOMPLETE_URL, {"q": "lu"})
+        self.assertEqual(res.data, [])
+
+    def test_falls_back_to_database(self):
+        res = self.client.get(AIRPORT_AUTOCOMPLETE_URL, {"q": "yspil"})
+
+        self.assertEqual(
+            [airport["name"] for airport in res.data], ["Boryspil"]
+        )
+
+    @override_settings(AUTOCOMPLETE_MAX_INDEXED_ROWS=2)
+    def test_large_table_is_searched_in_database(self):
+        res = self.client.get(AIRPORT_AUTOCOMPLETE_URL, {"q": "gat"})
+        with self.assertNumQueries(0):
+            blank = self.client.get(AIRPORT_AUTOCOMPLETE_URL, {"q": " "})
+
+        self.assertEqual(
+            [airport["name"] for airport in res.data], ["Gatwick"]
+        )
+        self.assertEqual(blank.data, [])
@@ -0,0 +1,199 @@
+import threading
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.models import Airport, Flight, Route
+from airport.tests import strict_queries
+from airport.tests.factories import sample_airplane
+from airport_api_service import querylog
+from airport_api_service.batch import BatchView
+from airport_api_service.metrics import current_stats
+
+BATCH_URL = reverse("batch")
+
+
+class BatchTestMixin:
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="testuser@gmail.com", password="testuser123"
+        )
+        self.client.force_authenticate(self.user)
+        self.route = Route.objects.create(
+            source=Airport.objects.create(
+                name="Airport 1", closest_big_city="City 1"
+            ),
+            destination=Airport.objects.create(
+                name="Airport 2", closest_big_city="City 2"
+            ),
+            distance=100,
+        )
+        self.flight = Flight.objects.create(
+            route=self.route,
+            airplane=sample_airplane(),
+            departure_time="2099-06-01T12:00:00Z",
+            arrival_time="2099-06-01T14:00:00Z",
+        )
+        self.paths = [
+            reverse("airport:flight-detail", args=[self.flight.id]),
+            reverse("airport:route-list"),
+            reverse("airport:async-flight-list"),
+            reverse("user:manage"),
+        ]
+
+    def batch(self, *requests):
+        return self.client.post(
+            BATCH_URL, {"requests": list(requests)}, format="json"
+        )
+
+    def assert_same_as_single_requests(self, res):
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        for path, sub_response in zip(self.paths, res.data["responses"]):
+            single = self.client.get(path)
+            self.assertEqual(
+                sub_response, {"status": 200, "body": single.json()}
+            )
+
+
+@strict_queries
+class BatchTests(BatchTestMixin, TestCase):
+
+    def test_authentication_required(self):
+        res = APIClient().post(BATCH_URL, {"requests": []}, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_reads(self):
+        res = self.batch(*({"method": "GET", "path": p} for p in self.paths))
+
+        self.assert_same_as_single_requests(res)
+
+    def test_read_after_write_sees_it(self):
+        orders_url = reverse("airport:order-list")
+        res = self.batch(
+            {
+                "method": "POST",
+                "path": orders_url,
+                "body": {
+                    "tickets": [
+                        {"flight": self.flight.id, "row": 1, "seat": 1}
+                    ]
+                },
+            },
+            {"method": "GET", "path": f"{orders_url}?page_size=10"},
+        )
+
+        created, listed = res.data["responses"]
+        self.assertEqual(created["status"], status.HTTP_201_CREATED)
+        self.assertEqual(listed["body"]["count"], 1)
+
+    def test_sub_request_errors(self):
+        res = self.batch(
+            {"method": "GET", "path": "/api/v1/missing/"},
+            {"method": "GET", "path": BATCH_URL},
+            {"method": "POST", "path": reverse("airport:flight-list")},
+            {"method": "GET", "path": reverse("admin:index")},
+        )
+
+        self.assertEqual(
+            [sub["status"] for sub in res.data["responses"]],
+            [404, 400, 403, 404],
+        )
+
+    def test_failing_sub_request(self):
+        with mock.patch(
+            "airport.views.FlightViewSet.retrieve", side_effect=RuntimeError
+        ), self.assertLogs("airport_api_service.batch", "ERROR"):
+            res = self.batch(
+                {"method": "GET", "path": self.paths[0]},
+                {"method": "GET", "path": self.paths[1]},
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [sub["status"] for sub in res.data["responses"]], [500, 200]
+        )
+
+    def test_invalid_batch(self):
+        res = self.batch(*[{"method": "GET", "path": "/"}] * 21)
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+        res = self.batch({"method": "TRACE", "path": "/"})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_batch_is_throttled_per_sub_request(self):
+        route_url = reverse("airport:route-list")
+
+        res = self.batch(*[{"method": "GET", "path": route_url}] * 20)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            {sub["status"] for sub in res.data["responses"]}, {200}
+        )
+
+        # The user rate is 30/min: 20 are spent, 10 are left
+        for _ in range(10):
+            self.assertEqual(
+                self.client.get(route_url).status_code, status.HTTP_200_OK
+            )
+        res = self.batch({"method": "GET", "path": route_url})
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+
+@strict_queries
+class ConcurrentBatchTests(BatchTestMixin, TransactionTestCase):
+
+    def test_reads_run_concurrently(self):
+        threads = set()
+        dispatch = BatchView.dispatch_sub_request
+
+        def record_thread(view, request, sub_request):
+            threads.add(threading.current_thread().name)
+            return dispatch(view, request, sub_request)
+
+        with mock.patch.object(
+            BatchView, "dispatch_sub_request", record_thread
+        ):
+            res = self.batch(
+                *({"method": "GET", "path": p} for p in self.paths)
+            )
+
+        self.assert_same_as_single_requests(res)
+        self.assertTrue(all(name.startswith("batch") for name in threads))
+
+    def test_concurrent_reads_are_instrumented(self):
+        seen = []
+        dispatch = BatchView.dispatch_sub_request
+
+        def record_context(view, request, sub_request):
+            seen.append(
+                (current_stats(), querylog._current_inspector.get())
+            )
+            return dispatch(view, request, sub_request)
+
+        def count_queries():
+            cache.clear()
+            res = self.batch(
+                *({"method": "GET", "path": p} for p in self.paths)
+            )
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            return res["Server-Timing"].split('"')[1]
+
+        with mock.patch.object(
+            BatchView, "dispatch_sub_request", record_context
+        ):
+            concurrent = count_queries()
+        with override_settings(BATCH_MAX_WORKERS=1):
+            sequential = count_queries()
+
+        self.assertEqual(concurrent, sequential)
+        stats = {id(stats) for stats, inspector in seen}
+        self.assertEqual(len(stats), 1)
+        self.assertTrue(all(inspector for stats, inspector in seen))
@@ -0,0 +1,161 @@
+import gzip
+import json
+import zlib
+from unittest import mock
+
+from asgiref.sync import iscoroutinefunction
+from django.core.cache import cache
+from django.http import StreamingHttpResponse
+from django.test import (
+    RequestFactory,
+    SimpleTestCase,
+    TestCase,
+    override_settings,
+)
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.tests import strict_queries
+from airport.tests.factories import (
+    sample_airplane,
+    sample_airport,
+    sample_crew,
+    sample_flight,
+    sample_route,
+    sample_user,
+)
+from airport_api_service import compression
+
+AIRPORT_URL = reverse("airport:airport-list")
+FLIGHT_URL = reverse("airport:flight-list")
+
+
+@strict_queries
+@override_settings(COMPRESSION_MIN_SIZE=200, CATALOG_CACHE_TTL=60)
+class CompressionTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = sample_user()
+        route = sample_route()
+        airplane = sample_airplane()
+        crew = [sample_crew(first_name=f"Pilot {i}") for i in range(3)]
+        for _ in range(5):
+            sample_flight(route=route, airplane=airplane, crew=crew)
+        for i in range(5):
+            sample_airport(name=f"Airport {i}", closest_big_city=f"City {i}")
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_gzip(self):
+        plain = self.client.get(FLIGHT_URL)
+
+        res = self.client.get(FLIGHT_URL, HTTP_ACCEPT_ENCODING="gzip")
+
+        self.assertNotIn("Content-Encoding", plain)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res["Content-Encoding"], "gzip")
+        self.assertEqual(int(res["Content-Length"]), len(res.content))
+        self.assertLess(len(res.content), len(plain.content))
+        self.assertEqual(gzip.decompress(res.content), plain.content)
+        self.assertIn("Accept-Encoding", res["Vary"])
+
+    def test_small_or_unaccepted_responses_are_not_compressed(self):
+        with override_settings(COMPRESSION_MIN_SIZE=10**6):
+            small = self.client.get(FLIGHT_URL, HTTP_ACCEPT_ENCODING="gzip")
+        refused = self.client.get(
+            FLIGHT_URL, HTTP_ACCEPT_ENCODING="gzip;q=0, identity"
+        )
+
+        for res in (small, refused):
+            self.assertNotIn("Content-Encoding", res)
+            self.assertEqual(len(json.loads(res.content)["results"]), 3)
+
+    def test_catalog_list_is_served_precompressed(self):
+        first = self.client.get(AIRPORT_URL, HTTP_ACCEPT_ENCODING="gzip")
+
+        with self.assertNumQueries(0), mock.patch.object(
+            compression, "compress"
+        ) as compress:
+            second = self.client.get(AIRPORT_URL, HTTP_ACCEPT_ENCODING="gzip")
+            plain = self.client.get(AIRPORT_URL)
+
+        compress.assert_not_called()
+        self.assertEqual(second["Content-Encoding"], "gzip")
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(gzip.decompress(second.content), plain.content)
+        self.assertEqual(len(plain.json()), 7)
+        self.assertEqual(second["Vary"], first["Vary"])
+        self.assertIn("Accept", plain["Vary"])
+
+    def test_unknown_query_params_share_the_cached_list(self):
+        first = self.client.get(AIRPORT_URL)
+
+        with self.assertNumQueries(0):
+            for query in ("?junk=1", "?b=2&a=1", "?utm_source=x"):
+                res = self.client.get(AIRPORT_URL + query)
+                self.assertEqual(res.content, first.content)
+
+    def test_catalog_changes_invalidate_cache(self):
+        self.client.get(AIRPORT_URL)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            sample_airport(name="New Airport")
+        res = self.client.get(AIRPORT_URL)
+
+        self.assertIn("New Airport", [row["name"] for row in res.json()])
+
+
+class StreamCompressionTests(SimpleTestCase):
+
+    def test_each_chunk_is_flushed(self):
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        events = [b"event: seat\ndata: %d\n\n" % i for i in range(3)]
+
+        stream = compression.compress_stream(iter(events), "gzip")
+
+        for event in events:
+            self.assertEqual(decompressor.decompress(next(stream)), event)
+        decompressor.decompress(b"".join(stream))
+        self.assertTrue(decompressor.eof)
+
+    def test_negotiate(self):
+        for header, expected in (
+            ("gzip, deflate", "gzip"),
+            ("*", compression.available_encodings()[0]),
+            ("gzip;q=0", None),
+            ("identity", None),
+            ("", None),
+        ):
+            with self.subTest(header):
+                self.assertEqual(compression.negotiate(header), expected)
+
+    async def test_async_streaming_response(self):
+        events = [b"event: seat\ndata: %d\n\n" % i for i in range(3)]
+
+        async def stream():
+            for event in events:
+                yield event
+
+        async def get_response(request):
+            return StreamingHttpResponse(
+                stream(), content_type="text/event-stream"
+            )
+
+        middleware = compression.CompressionMiddleware(get_response)
+        request = RequestFactory().get("/", HTTP_ACCEPT_ENCODING="gzip")
+
+        self.assertTrue(iscoroutinefunction(middleware))
+        response = await middleware(request)
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertTrue(response.is_async)
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        chunks = [chunk async for chunk in response.streaming_content]
+        for event, chunk in zip(events, chunks):
+            self.assertEqual(decompressor.decompress(chunk), event)
+        decompressor.decompress(b"".join(chunks[len(events):]))
+        self.assertTrue(decompressor.eof)
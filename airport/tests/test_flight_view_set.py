@@ -6,21 +6,23 @@ from django.urls import reverse
 from rest_framework.test import APIClient
 from rest_framework import status
 
-from airport.models import (
-    Flight,
-    Airport,
-    Route,
-    Airplane,
-    AirplaneType,
-    Crew,
-    Ticket,
-    Order,
+from airport.tests import strict_queries
+from airport.tests.factories import (
+    sample_airplane,
+    sample_airplane_type,
+    sample_crew,
+    sample_flight,
+    sample_order,
+    sample_route,
+    sample_user,
 )
+from airport.models import Flight
 from airport.serializers import FlightListSerializer, FlightDetailSerializer
 
 FLIGHT_URL = reverse("airport:flight-list")
 
 
+@strict_queries
 class UnauthenticatedFlightViewSetApiTests(TestCase):
 
     def setUp(self):
@@ -32,50 +34,32 @@ class UnauthenticatedFlightViewSetApiTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
 
 
+@strict_queries
 class AuthenticatedFlightViewSetApiTests(TestCase):
 
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = sample_user()
+        cls.airplane = sample_airplane()
+        cls.route = sample_route(distance=100)
+        cls.crew1 = sample_crew(first_name="John", last_name="Doe")
+        cls.crew2 = sample_crew(first_name="Jane", last_name="Doe")
+        cls.flight = sample_flight(
+            route=cls.route,
+            airplane=cls.airplane,
+            crew=[cls.crew1, cls.crew2],
+        )
+        cls.order = sample_order(
+            cls.user,
+            seats=(1, 2),
+            flight=cls.flight,
+            created_at="2024-06-01T10:00:00Z",
+        )
+
     def setUp(self):
         self.client = APIClient()
-        self.user = get_user_model().objects.create_user(
-            email="testuser@gmail.com", password="testuser123"
-        )
         self.client.force_authenticate(self.user)
 
-        airplane_type = AirplaneType.objects.create(name="Type A")
-        self.airplane = Airplane.objects.create(
-            name="Airplane 1",
-            rows=10,
-            seats_in_row=4,
-            airplane_type=airplane_type,
-        )
-        self.airport1 = Airport.objects.create(
-            name="Airport 1", closest_big_city="City 1"
-        )
-        self.airport2 = Airport.objects.create(
-            name="Airport 2", closest_big_city="City 2"
-        )
-        self.route = Route.objects.create(
-            source=self.airport1, destination=self.airport2, distance=100
-        )
-        self.crew1 = Crew.objects.create(first_name="John", last_name="Doe")
-        self.crew2 = Crew.objects.create(first_name="Jane", last_name="Doe")
-        self.flight = Flight.objects.create(
-            route=self.route,
-            airplane=self.airplane,
-            departure_time="2024-06-01T12:00:00Z",
-            arrival_time="2024-06-01T14:00:00Z",
-        )
-        self.flight.crew.set([self.crew1, self.crew2])
-        self.order = Order.objects.create(
-            created_at="2024-06-01T10:00:00Z", user=self.user
-        )
-        Ticket.objects.create(
-            flight=self.flight, seat=1, row=1, order=self.order
-        )
-        Ticket.objects.create(
-            flight=self.flight, seat=2, row=1, order=self.order
-        )
-
     def test_flights_list(self):
         res = self.client.get(FLIGHT_URL)
 
@@ -137,50 +121,39 @@ class AuthenticatedFlightViewSetApiTests(TestCase):
         self.assertEqual(len(res.data["results"]), 1)
 
 
+@strict_queries
 class AdminAuthenticatedFlightViewSetApiTests(TestCase):
 
-    def setUp(self):
-        self.client = APIClient()
-        self.user = get_user_model().objects.create_superuser(
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_superuser(
             email="testadmin@gmail.com", password="testadmin123"
         )
-        self.client.force_authenticate(self.user)
-
-        airplane_type = AirplaneType.objects.create(name="Type B")
-        self.airplane = Airplane.objects.create(
+        cls.airplane = sample_airplane(
             name="Airplane 2",
-            rows=10,
-            seats_in_row=4,
-            airplane_type=airplane_type,
-        )
-        self.airport1 = Airport.objects.create(
-            name="Airport 3", closest_big_city="City 3"
-        )
-        self.airport2 = Airport.objects.create(
-            name="Airport 4", closest_big_city="City 4"
-        )
-        self.route = Route.objects.create(
-            source=self.airport1, destination=self.airport2, distance=200
-        )
-        self.crew1 = Crew.objects.create(first_name="John", last_name="Smith")
-        self.crew2 = Crew.objects.create(first_name="Jane", last_name="Smith")
-        self.flight = Flight.objects.create(
-            route=self.route,
-            airplane=self.airplane,
+            airplane_type=sample_airplane_type(name="Type B"),
+        )
+        cls.route = sample_route(distance=200)
+        cls.crew1 = sample_crew(first_name="John", last_name="Smith")
+        cls.crew2 = sample_crew(first_name="Jane", last_name="Smith")
+        cls.flight = sample_flight(
+            route=cls.route,
+            airplane=cls.airplane,
+            crew=[cls.crew1, cls.crew2],
             departure_time="2024-06-02T12:00:00Z",
             arrival_time="2024-06-02T14:00:00Z",
         )
-        self.flight.crew.set([self.crew1, self.crew2])
-        self.order = Order.objects.create(
-            created_at="2024-06-02T10:00:00Z", user=self.user
-        )
-        Ticket.objects.create(
-            flight=self.flight, seat=1, row=1, order=self.order
-        )
-        Ticket.objects.create(
-            flight=self.flight, seat=2, row=1, order=self.order
+        cls.order = sample_order(
+            cls.user,
+            seats=(1, 2),
+            flight=cls.flight,
+            created_at="2024-06-02T10:00:00Z",
         )
 
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
     def test_create_flight(self):
         payload = {
             "route": self.route.id,
@@ -0,0 +1,98 @@
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import OperationalError
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+
+from airport_api_service import health
+
+HEALTHZ_URL = reverse("healthz")
+READYZ_URL = reverse("readyz")
+
+
+class HealthCheckTests(TestCase):
+
+    def setUp(self):
+        health.liveness.reset()
+        health.readiness.reset()
+
+    def test_ready(self):
+        res = self.client.get(READYZ_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        checks = res.json()["checks"]
+        self.assertEqual(
+            set(checks), {"database", "connections", "migrations"}
+        )
+        self.assertTrue(all(check["ok"] for check in checks.values()))
+        self.assertEqual(checks["migrations"]["pending"], 0)
+        self.assertIn("latency_ms", checks["database"])
+
+    def test_results_are_cached(self):
+        self.client.get(HEALTHZ_URL)
+        self.client.get(READYZ_URL)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                self.client.get(READYZ_URL).status_code, status.HTTP_200_OK
+            )
+            self.assertEqual(
+                self.client.get(HEALTHZ_URL).status_code, status.HTTP_200_OK
+            )
+
+    def test_unreachable_database(self):
+        with mock.patch.object(
+            health,
+            "probe_database",
+            side_effect=OperationalError("connection refused"),
+        ), mock.patch.object(health.connections["default"], "close"):
+            res = self.client.get(HEALTHZ_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(
+            res.json()["checks"]["database"],
+            {"ok": False, "error": "connection refused"},
+        )
+
+    def test_pending_migrations_are_not_ready(self):
+        with mock.patch.object(
+            MigrationExecutor, "migration_plan", return_value=[("m", False)]
+        ):
+            res = self.client.get(READYZ_URL)
+            live = self.client.get(HEALTHZ_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(res.json()["checks"]["migrations"]["pending"], 1)
+        self.assertEqual(live.status_code, status.HTTP_200_OK)
+
+    @mock.patch("time.sleep")
+    def test_wait_for_db_backs_off(self, sleep):
+        error = OperationalError("starting up")
+        with mock.patch(
+            "airport.management.commands.wait_for_db.probe_database",
+            side_effect=[error, error, error, 1.5],
+        ), mock.patch.object(health.connections["default"], "close"):
+            call_command("wait_for_db", interval=0.5, stdout=StringIO())
+
+        self.assertEqual(
+            [call.args[0] for call in sleep.call_args_list], [0.5, 1.0, 2.0]
+        )
+
+    @mock.patch("time.sleep")
+    def test_wait_for_db_times_out(self, sleep):
+        with mock.patch(
+            "airport.management.commands.wait_for_db.probe_database",
+            side_effect=OperationalError("connection refused"),
+        ), mock.patch.object(
+            health.connections["default"], "close"
+        ), self.assertRaisesMessage(
+            CommandError, "connection refused"
+        ):
+            call_command("wait_for_db", timeout=0, stdout=StringIO())
+
+        sleep.assert_not_called()
@@ -0,0 +1,118 @@
+import shutil
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from airport.tests import strict_queries
+from airport.tests.factories import sample_airplane
+from airport.tests.test_airplane_view_set import temporary_image
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@strict_queries
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, MEDIA_SENDFILE_BACKEND="")
+class MediaServingTests(TestCase):
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_superuser(
+            email="testadmin@gmail.com", password="testadmin123"
+        )
+        self.client.force_authenticate(self.user)
+        self.airplane = sample_airplane()
+
+    def upload_image(self, airplane):
+        url = reverse("airport:airplane-upload-image", args=[airplane.id])
+        with temporary_image() as img:
+            self.client.post(url, {"image": img}, format="multipart")
+        airplane.refresh_from_db()
+        return airplane.image
+
+    def test_image_name_is_content_hashed(self):
+        first = self.upload_image(self.airplane)
+        second = self.upload_image(self.airplane)
+
+        self.assertRegex(first.name, r"airplane-1-[0-9a-f]{16}\.jpg$")
+        self.assertEqual(first.name, second.name)
+
+    def test_hashed_media_is_immutable(self):
+        image = self.upload_image(self.airplane)
+
+        res = self.client.get(image.url)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn("immutable", res["Cache-Control"])
+        self.assertEqual(res["Accept-Ranges"], "bytes")
+        self.assertEqual(res["Content-Type"], "image/jpeg")
+
+        etag = res["ETag"]
+        for if_none_match in (etag, f'"other", W/{etag}', "*"):
+            res = self.client.get(image.url, HTTP_IF_NONE_MATCH=if_none_match)
+            self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        # A substring of the ETag is a different ETag
+        res = self.client.get(image.url, HTTP_IF_NONE_MATCH=etag[1:-2])
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_range_request(self):
+        image = self.upload_image(self.airplane)
+        size = image.size
+
+        res = self.client.get(image.url, HTTP_RANGE="bytes=10-19")
+
+        self.assertEqual(res.status_code, status.HTTP_206_PARTIAL_CONTENT)
+        self.assertEqual(res["Content-Range"], f"bytes 10-19/{size}")
+        self.assertEqual(len(b"".join(res.streaming_content)), 10)
+
+        res = self.client.get(image.url, HTTP_RANGE=f"bytes={size}-")
+        self.assertEqual(
+            res.status_code, status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE
+        )
+
+        # Invalid ranges are ignored, RFC 9110 14.2
+        for invalid in ("bytes=5-3", "bytes=0-1,4-5", "items=0-1"):
+            res = self.client.get(image.url, HTTP_RANGE=invalid)
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            self.assertEqual(len(b"".join(res.streaming_content)), size)
+
+    def test_sendfile_offload(self):
+        image = self.upload_image(self.airplane)
+
+        with override_settings(
+            MEDIA_SENDFILE_BACKEND="nginx",
+            MEDIA_ACCEL_REDIRECT_PREFIX="/protected-media/",
+        ):
+            res = self.client.get(image.url)
+
+        self.assertEqual(
+            res["X-Accel-Redirect"], f"/protected-media/{image.name}"
+        )
+        self.assertEqual(res.content, b"")
+
+    def test_sendfile_path_is_quoted(self):
+        with override_settings(
+            MEDIA_SENDFILE_BACKEND="nginx",
+            MEDIA_ACCEL_REDIRECT_PREFIX="/protected-media/",
+        ):
+            with open(f"{MEDIA_ROOT}/report 100%.csv", "w") as file:
+                file.write("a,b\n")
+            res = self.client.get("/media/report%20100%25.csv")
+
+        self.assertEqual(
+            res["X-Accel-Redirect"], "/protected-media/report%20100%25.csv"
+        )
+
+    def test_missing_file(self):
+        res = self.client.get("/media/uploads/airplanes/missing.jpg")
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,114 @@
+from unittest import mock
+
+from asgiref.sync import iscoroutinefunction
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+from rest_framework_simplejwt.tokens import AccessToken
+
+from airport_api_service.metrics import PerformanceMiddleware, registry
+from airport.tests import strict_queries
+from airport.tests.factories import sample_airplane
+
+AIRPLANE_URL = reverse("airport:airplane-list")
+
+
+@strict_queries
+class PerformanceMiddlewareTests(TestCase):
+
+    def setUp(self):
+        registry.reset()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="testuser@gmail.com", password="testuser123"
+        )
+        self.client.force_authenticate(self.user)
+        sample_airplane()
+
+    def test_server_timing_header(self):
+        res = self.client.get(AIRPLANE_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertRegex(
+            res["Server-Timing"],
+            r'^db;dur=[\d.]+;desc="\d+ queries", view;dur=[\d.]+, '
+            r"render;dur=[\d.]+, total;dur=[\d.]+$",
+        )
+
+    def test_metrics_are_recorded_per_view_action(self):
+        self.client.get(AIRPLANE_URL)
+        self.client.get(AIRPLANE_URL)
+
+        res = self.client.get(reverse("metrics"))
+        body = res.content.decode()
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn(
+            'airport_http_requests_total{view="AirplaneViewSet.list",'
+            'status="200"} 2',
+            body,
+        )
+        self.assertIn(
+            'airport_http_request_duration_seconds_count'
+            '{view="AirplaneViewSet.list"} 2',
+            body,
+        )
+        self.assertRegex(
+            body,
+            r'airport_db_queries_total\{view="AirplaneViewSet.list"\} [1-9]',
+        )
+        if connection.vendor == "postgresql":
+            # SQLite doesn't report a row count for SELECT
+            self.assertRegex(
+                body,
+                r'airport_db_rows_total\{view="AirplaneViewSet.list"\} [1-9]',
+            )
+
+    def test_metrics_allowed_ips_only(self):
+        with override_settings(METRICS_ALLOWED_IPS=["10.0.0.1"]):
+            res = self.client.get(reverse("metrics"))
+            self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+            res = self.client.get(reverse("metrics"), REMOTE_ADDR="10.0.0.1")
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_async_capable(self):
+        async def get_response(request):
+            pass
+
+        self.assertTrue(
+            iscoroutinefunction(PerformanceMiddleware(get_response))
+        )
+        self.assertFalse(
+            iscoroutinefunction(PerformanceMiddleware(lambda request: None))
+        )
+
+    # Left alone, the sync-only debug toolbar would make the chain sync
+    @override_settings(
+        MIDDLEWARE=["airport_api_service.metrics.PerformanceMiddleware"]
+    )
+    async def test_async_request(self):
+        token = AccessToken.for_user(self.user)
+
+        with mock.patch.object(
+            PerformanceMiddleware,
+            "__acall__",
+            autospec=True,
+            side_effect=PerformanceMiddleware.__acall__,
+        ) as acall:
+            res = await self.async_client.get(
+                AIRPLANE_URL, AUTHORIZATION=f"Bearer {token}"
+            )
+
+        acall.assert_called_once()
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertRegex(res["Server-Timing"], r'desc="[1-9]\d* queries"')
+        self.assertIn(
+            'airport_http_requests_total{view="AirplaneViewSet.list",'
+            'status="200"} 1',
+            registry.render(),
+        )
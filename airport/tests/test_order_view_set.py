@@ -0,0 +1,199 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from airport.order_summary import build_summary
+from airport.tests import strict_queries
+from airport.models import (
+    Flight,
+    Airport,
+    Route,
+    Airplane,
+    AirplaneType,
+    Ticket,
+    Order,
+)
+
+ORDER_URL = reverse("airport:order-list")
+ORDER_TICKETS_URL = reverse("airport:order-tickets")
+ORDER_SUMMARY_URL = reverse("airport:order-summary")
+
+
+@strict_queries
+class UnauthenticatedOrderViewSetApiTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_authentication_required(self):
+        res = self.client.get(ORDER_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+@strict_queries
+class AuthenticatedOrderViewSetApiTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
+            email="testuser@gmail.com", password="testuser123"
+        )
+        airplane_type = AirplaneType.objects.create(name="Type A")
+        airplane = Airplane.objects.create(
+            name="Airplane 1",
+            rows=10,
+            seats_in_row=4,
+            airplane_type=airplane_type,
+        )
+        flights = []
+        for i in range(3):
+            route = Route.objects.create(
+                source=Airport.objects.create(
+                    name=f"Airport {i}a", closest_big_city=f"City {i}a"
+                ),
+                destination=Airport.objects.create(
+                    name=f"Airport {i}b", closest_big_city=f"City {i}b"
+                ),
+                distance=100 * (i + 1),
+            )
+            flights.append(
+                Flight.objects.create(
+                    route=route,
+                    airplane=airplane,
+                    departure_time="2024-06-01T12:00:00Z",
+                    arrival_time="2024-06-01T14:00:00Z",
+                )
+            )
+        cls.flights = flights
+        seat = 0
+        for _ in range(12):
+            order = Order.objects.create(user=cls.user)
+            for flight in flights:
+                seat += 1
+                Ticket.objects.create(
+                    flight=flight, row=1, seat=seat, order=order
+                )
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def count_queries(self, url, page_size):
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(url, {"page_size": page_size})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return res, len(queries)
+
+    def test_order_list_uses_constant_number_of_queries(self):
+        res, small_page = self.count_queries(ORDER_URL, 2)
+        res, large_page = self.count_queries(ORDER_URL, 12)
+
+        self.assertEqual(len(res.data["results"]), 12)
+        self.assertEqual(small_page, large_page)
+        # count, orders and tickets with their flights and routes
+        self.assertEqual(large_page, 3)
+
+    def test_order_list_shows_ticket_routes(self):
+        res = self.client.get(ORDER_URL)
+
+        ticket = res.data["results"][0]["tickets"][0]
+        self.assertEqual(
+            ticket["route"],
+            "Airport 0a (City 0a) - Airport 0b (City 0b), 100 km",
+        )
+
+    def test_flat_ticket_list(self):
+        res, small_page = self.count_queries(ORDER_TICKETS_URL, 2)
+        res, large_page = self.count_queries(ORDER_TICKETS_URL, 36)
+
+        self.assertEqual(res.data["count"], 36)
+        self.assertEqual(small_page, large_page)
+        self.assertEqual(large_page, 2)
+        self.assertEqual(
+            set(res.data["results"][0]),
+            {"id", "flight", "route", "row", "seat", "price", "order"},
+        )
+
+    def test_other_users_orders_are_hidden(self):
+        other = get_user_model().objects.create_user(
+            email="other@gmail.com", password="other12345"
+        )
+        self.client.force_authenticate(other)
+
+        res = self.client.get(ORDER_TICKETS_URL)
+
+        self.assertEqual(res.data["count"], 0)
+
+    def test_order_summary_is_cached(self):
+        res = self.client.get(ORDER_SUMMARY_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["orders"], 12)
+        self.assertEqual(res.data["tickets"], 36)
+        self.assertEqual(res.data["upcoming_flights"], [])
+        self.assertEqual(len(res.data["recent_orders"]), 10)
+
+        with self.assertNumQueries(0):
+            self.client.get(ORDER_SUMMARY_URL)
+
+    def test_order_summary_is_updated_on_booking(self):
+        departure = timezone.now() + timedelta(days=3)
+        flight = Flight.objects.create(
+            route=self.flights[0].route,
+            airplane=self.flights[0].airplane,
+            departure_time=departure,
+            arrival_time=departure + timedelta(hours=2),
+        )
+        self.client.get(ORDER_SUMMARY_URL)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            res = self.client.post(
+                ORDER_URL,
+                {"tickets": [{"flight": flight.id, "row": 1, "seat": 40}]},
+                format="json",
+            )
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+        res = self.client.get(ORDER_SUMMARY_URL)
+
+        self.assertEqual(res.data["orders"], 13)
+        self.assertEqual(res.data["tickets"], 37)
+        self.assertEqual(res.data["recent_orders"][0]["tickets"], 1)
+        self.assertEqual(res.data["upcoming_flights"][0]["id"], flight.id)
+        self.assertEqual(res.data["upcoming_flights"][0]["tickets"], 1)
+        self.assertEqual(res.data, build_summary(self.user.id))
+
+    def test_order_summary_invalidated_once_per_flight_delete(self):
+        self.client.get(ORDER_SUMMARY_URL)
+
+        with CaptureQueriesContext(connection) as queries:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.flights[0].delete()
+
+        user_lookups = [
+            query["sql"]
+            for query in queries
+            if query["sql"].startswith('SELECT "airport_order"."user_id"')
+        ]
+        self.assertEqual(len(user_lookups), 1)
+        res = self.client.get(ORDER_SUMMARY_URL)
+        self.assertEqual(res.data["tickets"], 24)
+
+    def test_order_summary_invalidated_on_delete(self):
+        self.client.get(ORDER_SUMMARY_URL)
+
+        Order.objects.filter(user=self.user).first().delete()
+
+        res = self.client.get(ORDER_SUMMARY_URL)
+        self.assertEqual(res.data["orders"], 11)
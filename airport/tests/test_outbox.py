@@ -0,0 +1,138 @@
+import io
+import json
+import os
+import tempfile
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from airport.models import Airport, Flight, OutboxEvent, Route
+from airport.outbox import BOOKING_CREATED, BaseSink, relay_batch
+from airport.tests import strict_queries
+from airport.tests.factories import sample_airplane
+from taskqueue.models import Task
+from taskqueue.worker import Worker
+
+ORDER_URL = reverse("airport:order-list")
+
+
+class FailingSink(BaseSink):
+    def publish(self, messages):
+        raise ConnectionError("sink unavailable")
+
+
+@strict_queries
+class OutboxTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="testuser@gmail.com", password="testuser123"
+        )
+        self.client.force_authenticate(self.user)
+        self.flight = Flight.objects.create(
+            route=Route.objects.create(
+                source=Airport.objects.create(
+                    name="Airport 1", closest_big_city="City 1"
+                ),
+                destination=Airport.objects.create(
+                    name="Airport 2", closest_big_city="City 2"
+                ),
+                distance=100,
+            ),
+            airplane=sample_airplane(),
+            departure_time="2099-06-01T12:00:00Z",
+            arrival_time="2099-06-01T14:00:00Z",
+        )
+
+    def book(self, *seats):
+        res = self.client.post(
+            ORDER_URL,
+            {
+                "tickets": [
+                    {"flight": self.flight.id, "row": 1, "seat": seat}
+                    for seat in seats
+                ]
+            },
+            format="json",
+        )
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        return res.data
+
+    def test_booking_writes_outbox_event(self):
+        order = self.book(1, 2)
+
+        event = OutboxEvent.objects.get()
+        self.assertEqual(event.topic, BOOKING_CREATED)
+        self.assertEqual(event.key, str(order["id"]))
+        self.assertEqual(event.payload["user"], self.user.id)
+        self.assertEqual(
+            [ticket["seat"] for ticket in event.payload["tickets"]], [1, 2]
+        )
+
+    def test_failed_booking_writes_no_event(self):
+        self.book(1)
+
+        res = self.client.post(
+            ORDER_URL,
+            {"tickets": [{"flight": self.flight.id, "row": 1, "seat": 1}]},
+            format="json",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(OutboxEvent.objects.count(), 1)
+
+    def test_relay_publishes_and_deletes_events(self):
+        self.book(1)
+        self.book(2)
+        fd, path = tempfile.mkstemp()
+        os.close(fd)
+        self.addCleanup(os.remove, path)
+
+        with override_settings(
+            OUTBOX_SINK={
+                "BACKEND": "airport.outbox.FileSink",
+                "OPTIONS": {"path": path},
+            }
+        ):
+            call_command("relay_outbox", "--once", stderr=io.StringIO())
+
+        with open(path) as f:
+            messages = [json.loads(line) for line in f]
+        self.assertEqual(len(messages), 2)
+        self.assertEqual(messages[0]["topic"], BOOKING_CREATED)
+        self.assertFalse(OutboxEvent.objects.exists())
+
+    def test_failed_publish_keeps_events(self):
+        self.book(1)
+
+        with self.assertRaises(ConnectionError):
+            relay_batch(FailingSink(), batch_size=10)
+
+        self.assertEqual(OutboxEvent.objects.count(), 1)
+
+    def test_booking_enqueues_event_publishing(self):
+        self.book(1)
+        self.book(2)
+        fd, path = tempfile.mkstemp()
+        os.close(fd)
+        self.addCleanup(os.remove, path)
+
+        with override_settings(
+            OUTBOX_SINK={
+                "BACKEND": "airport.outbox.FileSink",
+                "OPTIONS": {"path": path},
+            }
+        ), mock.patch("taskqueue.worker.close_old_connections"):
+            Worker({"bookings": 1}, pool="inline").run(once=True)
+
+        with open(path) as f:
+            self.assertEqual(len(f.readlines()), 2)
+        self.assertFalse(OutboxEvent.objects.exists())
+        self.assertFalse(Task.objects.exists())
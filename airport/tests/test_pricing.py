@@ -0,0 +1,170 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport import pricing
+from airport.models import Airport, Flight, Order, Route, Ticket
+from airport.tests import strict_queries
+from airport.tests.factories import sample_airplane
+
+FLIGHT_URL = reverse("airport:flight-list")
+ORDER_URL = reverse("airport:order-list")
+
+
+class FareTableTests(SimpleTestCase):
+
+    def setUp(self):
+        self.now = timezone.now()
+
+    def table(self, distance=1000, capacity=100, days=20):
+        return pricing.FareTable(
+            pricing.band_fare(distance),
+            capacity,
+            self.now + timedelta(days=days),
+        )
+
+    def test_distance_bands(self):
+        self.assertEqual(self.table(500).price(0, self.now), Decimal("49"))
+        self.assertEqual(self.table(501).price(0, self.now), Decimal("89"))
+        self.assertEqual(self.table(9000).price(0, self.now), Decimal("399"))
+
+    def test_load_factor(self):
+        table = self.table()
+
+        self.assertEqual(table.price(49, self.now), Decimal("89.00"))
+        self.assertEqual(table.price(50, self.now), Decimal("102.35"))
+        self.assertEqual(table.price(100, self.now), Decimal("142.40"))
+
+    def test_time_to_departure(self):
+        self.assertEqual(
+            self.table(days=40).price(0, self.now), Decimal("80.10")
+        )
+        self.assertEqual(
+            self.table(days=1).price(0, self.now), Decimal("133.50")
+        )
+        # Departed flights keep the last-minute fare
+        self.assertEqual(
+            self.table(days=-1).price(0, self.now), Decimal("133.50")
+        )
+
+
+@strict_queries
+class FlightPriceTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="testuser@gmail.com", password="testuser123"
+        )
+        self.client.force_authenticate(self.user)
+        self.route = Route.objects.create(
+            source=Airport.objects.create(
+                name="Airport 1", closest_big_city="City 1"
+            ),
+            destination=Airport.objects.create(
+                name="Airport 2", closest_big_city="City 2"
+            ),
+            distance=1000,
+        )
+        self.airplane = sample_airplane(rows=1, seats_in_row=8)
+        self.departure = timezone.now() + timedelta(days=20)
+
+    def create_flight(self):
+        return Flight.objects.create(
+            route=self.route,
+            airplane=self.airplane,
+            departure_time=self.departure,
+            arrival_time=self.departure + timedelta(hours=2),
+        )
+
+    def book(self, flight, *seats):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(
+                ORDER_URL,
+                {
+                    "tickets": [
+                        {"flight": flight.id, "row": 1, "seat": seat}
+                        for seat in seats
+                    ]
+                },
+                format="json",
+            )
+
+    def list_prices(self):
+        res = self.client.get(FLIGHT_URL, {"page_size": 10})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return {
+            flight["id"]: flight["price"] for flight in res.data["results"]
+        }
+
+    def test_prices_add_no_queries_per_flight(self):
+        flight = self.create_flight()
+        with CaptureQueriesContext(connection) as single:
+            self.list_prices()
+
+        for _ in range(4):
+            self.create_flight()
+        cache.clear()
+        with self.assertNumQueries(len(single)):
+            prices = self.list_prices()
+
+        self.assertEqual(prices[flight.id], "89.00")
+        self.assertEqual(len(prices), 5)
+
+    def test_booking_prices_tickets_and_updates_table(self):
+        flight = self.create_flight()
+        self.assertEqual(self.list_prices()[flight.id], "89.00")
+
+        res = self.book(flight, *range(1, 6))
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            [ticket["price"] for ticket in res.data["tickets"]],
+            ["89.00"] * 4 + ["102.35"],
+        )
+        # 5 of 8 sold; the booking dropped the cached quote
+        self.assertEqual(self.list_prices()[flight.id], "102.35")
+        self.book(flight, 6, 7)
+        self.assertEqual(self.list_prices()[flight.id], "120.15")
+
+    def test_refunds_and_flight_changes(self):
+        flight = self.create_flight()
+        order = Order.objects.create(user=self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            for seat in range(1, 6):
+                Ticket.objects.create(
+                    flight=flight, row=1, seat=seat, order=order
+                )
+        self.assertEqual(self.list_prices()[flight.id], "102.35")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Ticket.objects.filter(seat__in=(4, 5)).delete()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            flight.departure_time = timezone.now() + timedelta(days=1)
+            flight.save()
+        self.assertEqual(self.list_prices()[flight.id], "133.50")
+        # Priced from the 3 tickets left in the database
+        res = self.book(flight, 4)
+        self.assertEqual(res.data["tickets"][0]["price"], "133.50")
+
+    def test_bookings_count_sold_tickets(self):
+        flight = self.create_flight()
+        self.list_prices()
+        order = Order.objects.create(user=self.user)
+        for seat in range(1, 6):
+            Ticket.objects.create(flight=flight, row=1, seat=seat, order=order)
+
+        res = self.book(flight, 6)
+
+        self.assertEqual(res.data["tickets"][0]["price"], "102.35")
@@ -0,0 +1,228 @@
+"""
+Query plan regression tests for the hot querysets.
+
+A medium dataset is seeded once with seed_perf_data and analyzed, then
+each queryset in HOT_QUERYSETS, built by the same view code that serves
+it, is explained with EXPLAIN (FORMAT JSON). The tests assert properties
+of the plans: no sequential scan on airport_ticket, and an estimated cost
+below the ceiling in COST_CEILINGS.
+
+The shape of each plan (node types, relations and indexes) is compared
+with the one stored in query_plans.json and differences are reported as
+warnings rather than failures, as plans legitimately vary between
+PostgreSQL versions. Run with
+UPDATE_QUERY_PLANS=1 to store the current plans after an intended change.
+"""
+import difflib
+import json
+import os
+import unittest
+import warnings
+from io import StringIO
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import Count
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from airport.models import Flight, Order
+from airport.views import FlightViewSet, OrderViewSet, RouteViewSet
+
+STORED_PLANS = Path(__file__).with_name("query_plans.json")
+
+DATASET = {
+    "airports": 50,
+    "routes": 300,
+    "airplanes": 50,
+    "crew": 200,
+    "flights": 3000,
+    "users": 200,
+    "orders": 8000,
+}
+
+PAGE_SIZE = 3
+
+
+def viewset_queryset(viewset, action, user=None, **params):
+    request = Request(APIRequestFactory().get("/", params))
+    request.user = user
+    view = viewset(
+        action=action,
+        request=request,
+        args=(),
+        kwargs={},
+        format_kwarg=None,
+    )
+    return view.get_queryset()
+
+
+class CountOf:
+    """Stands for the count() of a queryset, as paginators run it"""
+
+    def __init__(self, queryset):
+        self.queryset = queryset
+
+
+def flight_list(**params):
+    return lambda data: viewset_queryset(FlightViewSet, "list", **params)[
+        :PAGE_SIZE
+    ]
+
+
+def order_page(data):
+    return viewset_queryset(OrderViewSet, "list", data.user)[:PAGE_SIZE]
+
+
+# Named querysets, each built from the test data
+HOT_QUERYSETS = {
+    "flight-list": flight_list(),
+    "flight-list-count": lambda data: CountOf(
+        viewset_queryset(FlightViewSet, "list")
+    ),
+    "flight-list-by-route": lambda data: viewset_queryset(
+        FlightViewSet, "list", route=f"{data.route.id}"
+    )[:PAGE_SIZE],
+    "flight-list-by-departure": lambda data: viewset_queryset(
+        FlightViewSet,
+        "list",
+        departure_time=data.flight.departure_time.date().isoformat(),
+    )[:PAGE_SIZE],
+    "flight-list-by-crew": flight_list(crew="shev"),
+    "flight-detail": lambda data: viewset_queryset(
+        FlightViewSet, "retrieve"
+    ).filter(pk=data.flight.pk),
+    "flight-detail-taken-seats": lambda data: data.flight.tickets.all(),
+    "order-list": order_page,
+    "order-list-tickets": lambda data: OrderViewSet.ticket_queryset.filter(
+        order__in=[order.pk for order in order_page(data)]
+    ),
+    "order-tickets": lambda data: viewset_queryset(
+        OrderViewSet, "tickets", data.user
+    )[:PAGE_SIZE],
+    "route-list": lambda data: viewset_queryset(RouteViewSet, "list"),
+}
+
+# Estimated total cost ceilings, a few times what the plans cost today
+COST_CEILINGS = {
+    "flight-list": 300,
+    "flight-list-count": 250,
+    "flight-list-by-route": 300,
+    "flight-list-by-departure": 300,
+    "flight-list-by-crew": 300,
+    "flight-detail": 60,
+    "flight-detail-taken-seats": 100,
+    "order-list": 30,
+    "order-list-tickets": 250,
+    "order-tickets": 100,
+    "route-list": 50,
+}
+
+
+def explain(query) -> dict:
+    """EXPLAIN (FORMAT JSON) of a queryset, or of a count() on one"""
+    if isinstance(query, CountOf):
+        with CaptureQueriesContext(connection) as queries:
+            query.queryset.count()
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {queries[-1]['sql']}")
+            plan = cursor.fetchone()[0]
+    else:
+        plan = query.explain(format="json")
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]["Plan"]
+
+
+def nodes(plan):
+    yield plan
+    for child in plan.get("Plans", ()):
+        yield from nodes(child)
+
+
+def shape(plan, depth=0) -> list:
+    """One line per plan node, without the costs and row estimates"""
+    line = "  " * depth + plan["Node Type"]
+    if "Relation Name" in plan:
+        line += f" on {plan['Relation Name']}"
+    if "Index Name" in plan:
+        line += f" using {plan['Index Name']}"
+    lines = [line]
+    for child in plan.get("Plans", ()):
+        lines += shape(child, depth + 1)
+    return lines
+
+
+@unittest.skipUnless(
+    connection.vendor == "postgresql", "Plans are PostgreSQL-specific"
+)
+class QueryPlanTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        call_command("seed_perf_data", stdout=StringIO(), **DATASET)
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+        busiest = (
+            Order.objects.values("user")
+            .annotate(orders=Count("id"))
+            .order_by("-orders", "user")
+            .first()
+        )
+        cls.user = get_user_model().objects.get(pk=busiest["user"])
+        cls.flight = (
+            Flight.objects.filter(tickets__isnull=False).order_by("id").first()
+        )
+        cls.route = cls.flight.route
+
+    def setUp(self):
+        self.plans = {
+            name: explain(build(self))
+            for name, build in HOT_QUERYSETS.items()
+        }
+
+    def test_no_sequential_scan_on_tickets(self):
+        for name, plan in self.plans.items():
+            with self.subTest(name):
+                self.assertNotIn(
+                    ("Seq Scan", "airport_ticket"),
+                    [
+                        (node["Node Type"], node.get("Relation Name"))
+                        for node in nodes(plan)
+                    ],
+                    "\n".join(shape(plan)),
+                )
+
+    def test_cost_ceilings(self):
+        for name, plan in self.plans.items():
+            with self.subTest(name):
+                self.assertLessEqual(
+                    plan["Total Cost"],
+                    COST_CEILINGS[name],
+                    "\n".join(shape(plan)),
+                )
+
+    def test_plans_match_stored(self):
+        shapes = {name: shape(plan) for name, plan in self.plans.items()}
+        if os.environ.get("UPDATE_QUERY_PLANS"):
+            STORED_PLANS.write_text(json.dumps(shapes, indent=2) + "\n")
+            return
+
+        stored = json.loads(STORED_PLANS.read_text())
+        for name, lines in shapes.items():
+            diff = list(
+                difflib.unified_diff(
+                    stored.get(name, []),
+                    lines,
+                    f"stored {name}",
+                    f"current {name}",
+                    lineterm="",
+                )
+            )
+            if diff:
+                warnings.warn("Query plan changed:\n" + "\n".join(diff))
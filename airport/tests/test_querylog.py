@@ -0,0 +1,101 @@
+import json
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import RequestFactory, TestCase, override_settings
+
+from airport.tests import strict_queries
+from airport.models import (
+    Flight,
+    Airport,
+    Route,
+    Airplane,
+    AirplaneType,
+    Crew,
+)
+from airport.serializers import FlightDetailSerializer
+from airport_api_service.querylog import (
+    NPlusOneError,
+    QueryInspectionMiddleware,
+    inspect_queries,
+    query_shape,
+)
+
+
+@strict_queries
+class QueryInspectionTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        airplane_type = AirplaneType.objects.create(name="Type A")
+        airplane = Airplane.objects.create(
+            name="Airplane 1",
+            rows=10,
+            seats_in_row=4,
+            airplane_type=airplane_type,
+        )
+        route = Route.objects.create(
+            source=Airport.objects.create(name="A1", closest_big_city="C1"),
+            destination=Airport.objects.create(
+                name="A2", closest_big_city="C2"
+            ),
+            distance=100,
+        )
+        crew = Crew.objects.create(first_name="John", last_name="Doe")
+        for day in range(1, 6):
+            flight = Flight.objects.create(
+                route=route,
+                airplane=airplane,
+                departure_time=f"2024-06-0{day}T12:00:00Z",
+                arrival_time=f"2024-06-0{day}T14:00:00Z",
+            )
+            flight.crew.add(crew)
+
+    def test_query_shape_collapses_literals(self):
+        self.assertEqual(
+            query_shape(
+                "SELECT * FROM t WHERE id IN (%s, %s, %s) AND x = 'a' LIMIT 21"
+            ),
+            "SELECT * FROM t WHERE id IN (...) AND x = ? LIMIT ?",
+        )
+
+    def test_repeated_query_shape_raises_in_strict_mode(self):
+        flights = Flight.objects.all()
+
+        with self.assertRaises(NPlusOneError):
+            with inspect_queries(threshold=3):
+                FlightDetailSerializer(flights, many=True).data
+
+    def test_prefetched_queries_pass(self):
+        flights = Flight.objects.select_related(
+            "route__source", "route__destination", "airplane__airplane_type"
+        ).prefetch_related("crew", "tickets")
+
+        with inspect_queries(threshold=3):
+            FlightDetailSerializer(flights, many=True).data
+
+    def test_slow_queries_are_logged_with_plan(self):
+        with self.assertLogs("airport_api_service.querylog") as logs:
+            with inspect_queries(slow_ms=0):
+                get_user_model().objects.filter(email="nobody").exists()
+
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record["event"], "slow_query")
+        self.assertIn("user_user", record["sql"])
+        if connection.vendor == "postgresql":
+            self.assertIn("Plan", record["plan"][0])
+
+    @override_settings(N_PLUS_ONE_THRESHOLD=3)
+    async def test_async_middleware(self):
+        def serialize():
+            return FlightDetailSerializer(Flight.objects.all(), many=True).data
+
+        async def get_response(request):
+            return await sync_to_async(serialize)()
+
+        middleware = QueryInspectionMiddleware(get_response)
+
+        self.assertTrue(iscoroutinefunction(middleware))
+        with self.assertRaises(NPlusOneError):
+            await middleware(RequestFactory().get("/"))
@@ -0,0 +1,174 @@
+import gzip
+import json
+import shutil
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from drf_spectacular.drainage import GENERATOR_STATS
+from drf_spectacular.generators import SchemaGenerator
+from rest_framework import status
+
+from airport_api_service import schema
+
+SCHEMA_URL = reverse("schema")
+PAGINATED_FLIGHTS = "#/components/schemas/PaginatedFlightListList"
+
+
+class SchemaViewTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        settings = override_settings(
+            OPENAPI_SCHEMA_DIR=directory, OPENAPI_SCHEMA_VERSION="test"
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+        schema.clear_loaded()
+        self.addCleanup(schema.clear_loaded)
+
+    def count_generations(self):
+        return mock.patch.object(
+            SchemaGenerator,
+            "get_schema",
+            autospec=True,
+            side_effect=SchemaGenerator.get_schema,
+        )
+
+    def test_schema_is_generated_once(self):
+        with self.count_generations() as get_schema:
+            first = self.client.get(SCHEMA_URL)
+            second = self.client.get(SCHEMA_URL)
+            schema.clear_loaded()  # as a fresh worker would
+            third = self.client.get(SCHEMA_URL)
+
+        self.assertEqual(get_schema.call_count, 1)
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertEqual(first.content, second.content)
+        self.assertEqual(first.content, third.content)
+        self.assertIn(b"/api/v1/airport/flights/", first.content)
+        self.assertTrue(schema.schema_path("yaml").exists())
+
+    def test_json_format(self):
+        res = self.client.get(SCHEMA_URL, {"format": "json"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn("paths", json.loads(res.content))
+
+    def test_bearer_security_scheme(self):
+        document = json.loads(
+            self.client.get(SCHEMA_URL, {"format": "json"}).content
+        )
+
+        self.assertEqual(
+            document["components"]["securitySchemes"]["jwtAuth"]["scheme"],
+            "bearer",
+        )
+        flights = document["paths"]["/api/v1/airport/flights/"]["get"]
+        self.assertIn({"jwtAuth": []}, flights["security"])
+
+    def test_seat_stream(self):
+        document = json.loads(
+            self.client.get(SCHEMA_URL, {"format": "json"}).content
+        )
+
+        stream = document["paths"][
+            "/api/v1/airport/flights/{id}/seats/stream/"
+        ]["get"]
+        self.assertIn({"streamToken": []}, stream["security"])
+        self.assertIn(
+            "text/event-stream", stream["responses"]["200"]["content"]
+        )
+        self.assertEqual(
+            document["components"]["securitySchemes"]["streamToken"]["in"],
+            "query",
+        )
+
+    def test_async_views(self):
+        document = json.loads(
+            self.client.get(SCHEMA_URL, {"format": "json"}).content
+        )
+
+        paths = document["paths"]
+        flights = paths["/api/v1/airport/async/flights/"]["get"]
+        self.assertEqual(
+            [
+                paths[path]["get"]["operationId"]
+                for path in (
+                    "/api/v1/airport/async/flights/",
+                    "/api/v1/airport/async/flights/{id}/",
+                    "/api/v1/airport/async/routes/",
+                )
+            ],
+            [
+                "airport_async_flights_list",
+                "airport_async_flights_retrieve",
+                "airport_async_routes_list",
+            ],
+        )
+        self.assertEqual(
+            flights["responses"]["200"]["content"]["application/json"],
+            {"schema": {"$ref": PAGINATED_FLIGHTS}},
+        )
+
+    def test_etag_revalidation(self):
+        etag = self.client.get(SCHEMA_URL)["ETag"]
+
+        res = self.client.get(SCHEMA_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(res["ETag"], etag)
+
+    def test_precompressed(self):
+        plain = self.client.get(SCHEMA_URL)
+
+        res = self.client.get(SCHEMA_URL, HTTP_ACCEPT_ENCODING="gzip, br")
+
+        self.assertEqual(res["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(res.content), plain.content)
+        self.assertNotEqual(res["ETag"], plain["ETag"])
+        self.assertIn("Accept-Encoding", res["Vary"])
+
+    def test_refused_gzip(self):
+        plain = self.client.get(SCHEMA_URL)
+
+        res = self.client.get(
+            SCHEMA_URL, HTTP_ACCEPT_ENCODING="gzip;q=0, identity"
+        )
+
+        self.assertNotIn("Content-Encoding", res)
+        self.assertEqual(res.content, plain.content)
+        self.assertEqual(res["ETag"], plain["ETag"])
+
+    def test_generate_schema_command(self):
+        call_command("generate_schema", stdout=StringIO())
+
+        with self.count_generations() as get_schema:
+            res = self.client.get(SCHEMA_URL)
+
+        get_schema.assert_not_called()
+        self.assertEqual(res.content, schema.schema_path("yaml").read_bytes())
+
+
+class SchemaGenerationTests(SimpleTestCase):
+
+    def test_schema_has_no_warnings(self):
+        # Counts accumulate over the process, e.g. from the view tests
+        GENERATOR_STATS.reset()
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+
+        call_command(
+            "spectacular",
+            "--fail-on-warn",
+            "--validate",
+            "--file",
+            f"{directory}/schema.yml",
+            stderr=StringIO(),
+        )
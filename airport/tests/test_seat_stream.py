@@ -0,0 +1,191 @@
+import asyncio
+import json
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework_simplejwt.tokens import AccessToken
+
+from airport.models import Airport, Flight, Order, Route, Ticket
+from airport.seat_stream import seat_channel
+from airport.tests import strict_queries
+from airport.tests.factories import sample_airplane
+from airport_api_service import pubsub
+
+
+def parse_event(chunk: bytes) -> tuple:
+    fields = dict(
+        line.split(": ", 1) for line in chunk.decode().strip().split("\n")
+    )
+    return fields["event"], json.loads(fields["data"])
+
+
+@strict_queries
+@override_settings(SEAT_STREAM_HEARTBEAT_SECONDS=5)
+class SeatStreamTests(TestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="testuser@gmail.com", password="testuser123"
+        )
+        self.token = str(AccessToken.for_user(self.user))
+        self.flight = Flight.objects.create(
+            route=Route.objects.create(
+                source=Airport.objects.create(
+                    name="Airport 1", closest_big_city="City 1"
+                ),
+                destination=Airport.objects.create(
+                    name="Airport 2", closest_big_city="City 2"
+                ),
+                distance=100,
+            ),
+            airplane=sample_airplane(),
+            departure_time="2024-06-01T12:00:00Z",
+            arrival_time="2024-06-01T14:00:00Z",
+        )
+        self.order = Order.objects.create(user=self.user)
+        Ticket.objects.create(
+            row=1, seat=1, flight=self.flight, order=self.order
+        )
+        self.url = reverse(
+            "airport:flight-seat-stream", args=[self.flight.id]
+        )
+
+    def book(self, seat):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Ticket.objects.create(
+                row=2, seat=seat, flight=self.flight, order=self.order
+            )
+
+    def release(self, ticket):
+        with self.captureOnCommitCallbacks(execute=True):
+            ticket.delete()
+
+    async def open_stream(self, **params):
+        if params:
+            response = await self.async_client.get(self.url, params)
+        else:
+            response = await self.async_client.get(
+                self.url, AUTHORIZATION=f"Bearer {self.token}"
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        content = response.streaming_content
+        self.assertTrue((await anext(content)).startswith(b"retry: "))
+        return content
+
+    async def test_stream_requires_authentication(self):
+        response = await self.async_client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    async def test_stream_token_in_query(self):
+        response = await self.async_client.post(
+            reverse("user:token_stream"),
+            AUTHORIZATION=f"Bearer {self.token}",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        content = await self.open_stream(token=response.json()["token"])
+
+        self.assertEqual(parse_event(await anext(content))[0], "snapshot")
+        await content.aclose()
+
+    async def test_access_token_is_refused_in_query(self):
+        for token in (self.token, "invalid"):
+            with self.subTest(token):
+                response = await self.async_client.get(
+                    self.url, {"token": token}
+                )
+
+                self.assertEqual(
+                    response.status_code, status.HTTP_401_UNAUTHORIZED
+                )
+
+    async def test_unread_stream_holds_no_subscription(self):
+        response = await self.async_client.get(
+            self.url, AUTHORIZATION=f"Bearer {self.token}"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            pubsub.broker.subscribers(seat_channel(self.flight.id)), 0
+        )
+
+    async def test_unknown_flight(self):
+        url = reverse("airport:flight-seat-stream", args=[self.flight.id + 1])
+
+        response = await self.async_client.get(
+            url, AUTHORIZATION=f"Bearer {self.token}"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    async def test_snapshot_then_deltas(self):
+        content = await self.open_stream()
+
+        event, data = parse_event(await anext(content))
+        self.assertEqual(event, "snapshot")
+        self.assertEqual(data["taken"], [{"row": 1, "seat": 1}])
+
+        ticket = await sync_to_async(self.book)(5)
+        event, data = parse_event(await anext(content))
+        self.assertEqual(event, "seat")
+        self.assertEqual(
+            data,
+            {"flight": self.flight.id, "row": 2, "seat": 5, "change": "taken"},
+        )
+
+        await sync_to_async(self.release)(ticket)
+        event, data = parse_event(await anext(content))
+        self.assertEqual(data["change"], "released")
+
+        await content.aclose()
+
+    async def test_uncommitted_booking_is_not_published(self):
+        content = await self.open_stream()
+        await anext(content)
+
+        await sync_to_async(Ticket.objects.create)(
+            row=2, seat=5, flight=self.flight, order=self.order
+        )
+
+        with override_settings(SEAT_STREAM_HEARTBEAT_SECONDS=0.01):
+            self.assertEqual(await anext(content), b": heartbeat\n\n")
+        await content.aclose()
+
+    @override_settings(SEAT_STREAM_MAX_SECONDS=0.05)
+    async def test_stream_ends_and_unsubscribes(self):
+        content = await self.open_stream()
+        channel = seat_channel(self.flight.id)
+        self.assertEqual(pubsub.broker.subscribers(channel), 1)
+
+        chunks = [chunk async for chunk in content]
+
+        self.assertEqual(parse_event(chunks[0])[0], "snapshot")
+        self.assertEqual(pubsub.broker.subscribers(channel), 0)
+
+
+class BrokerTests(TestCase):
+
+    async def test_slow_subscriber_is_resynced(self):
+        broker = pubsub.Broker()
+        with broker.subscribe("channel", maxsize=2) as subscription:
+            for message in range(3):
+                broker.deliver("channel", message)
+            await asyncio.sleep(0)
+
+            self.assertIs(await subscription.get(), pubsub.RESYNC)
+            broker.deliver("channel", 4)
+            self.assertEqual(await subscription.get(), 4)
+
+        self.assertEqual(broker.subscribers("channel"), 0)
+
+    async def test_deliver_from_another_thread(self):
+        broker = pubsub.Broker()
+        with broker.subscribe("channel") as subscription:
+            await asyncio.to_thread(broker.deliver, "channel", "message")
+
+            self.assertEqual(await subscription.get(timeout=1), "message")
@@ -0,0 +1,62 @@
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.db.models import Count, Sum
+from django.test import TestCase
+
+from airport.models import Airport, Flight, Ticket
+from analytics.models import DailyStats
+
+SMALL = {
+    "airports": 5,
+    "routes": 10,
+    "airplane_types": 2,
+    "airplanes": 3,
+    "crew": 6,
+    "flights": 20,
+    "users": 4,
+    "orders": 30,
+}
+
+
+class SeedPerfDataTests(TestCase):
+
+    def seed(self, **options):
+        call_command("seed_perf_data", stdout=StringIO(), **SMALL, **options)
+
+    def snapshot(self):
+        return list(
+            Ticket.objects.order_by("id").values_list(
+                "flight__route__distance", "row", "seat", "price"
+            )
+        )
+
+    def test_seeds_requested_volumes(self):
+        self.seed()
+
+        self.assertEqual(Airport.objects.count(), 5)
+        self.assertEqual(Flight.objects.count(), 20)
+        self.assertTrue(
+            all(
+                2 <= flight.crew_count <= 4
+                for flight in Flight.objects.annotate(crew_count=Count("crew"))
+            )
+        )
+        tickets = Ticket.objects.count()
+        self.assertGreaterEqual(tickets, 30)
+        self.assertFalse(Ticket.objects.filter(price=None).exists())
+        self.assertEqual(
+            DailyStats.objects.aggregate(tickets=Sum("tickets"))["tickets"],
+            tickets,
+        )
+
+    def test_same_seed_same_data(self):
+        self.seed(prefix="One")
+        first = self.snapshot()
+        Ticket.objects.all().delete()
+
+        self.seed(prefix="Two")
+
+        self.assertEqual(self.snapshot(), first)
+        with self.assertRaises(CommandError):
+            self.seed(prefix="Two")
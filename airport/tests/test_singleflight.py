@@ -0,0 +1,125 @@
+import threading
+import time
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.tests import strict_queries
+from airport.tests.factories import sample_flight, sample_user
+from airport_api_service import singleflight
+from airport_api_service.metrics import registry
+
+FLIGHT_URL = reverse("airport:flight-list")
+
+
+class GroupTests(SimpleTestCase):
+
+    def setUp(self):
+        self.group = singleflight.Group()
+        self.calls = 0
+
+    def slow_call(self):
+        self.calls += 1
+        time.sleep(0.2)
+        return self.calls
+
+    def test_concurrent_calls_share_one_computation(self):
+        barrier = threading.Barrier(5)
+        results = []
+
+        def request():
+            barrier.wait()
+            results.append(self.group.do("key", self.slow_call))
+
+        threads = [threading.Thread(target=request) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(self.calls, 1)
+        self.assertCountEqual(
+            results, [(1, None)] + [(1, singleflight.INFLIGHT)] * 4
+        )
+
+    def test_other_keys_are_computed(self):
+        self.group.do("a", self.slow_call)
+        self.group.do("b", self.slow_call)
+
+        self.assertEqual(self.calls, 2)
+
+    @mock.patch("time.monotonic")
+    def test_microcache(self, monotonic):
+        monotonic.return_value = 100.0
+        self.group.do("key", self.slow_call, ttl=0.5)
+
+        monotonic.return_value = 100.4
+        self.assertEqual(
+            self.group.do("key", self.slow_call, ttl=0.5),
+            (1, singleflight.MICROCACHE),
+        )
+        monotonic.return_value = 100.6
+        self.assertEqual(self.group.do("key", self.slow_call, ttl=0.5)[0], 2)
+
+    def test_errors_are_not_kept(self):
+        with self.assertRaises(ZeroDivisionError):
+            self.group.do("key", lambda: 1 / 0, ttl=60)
+
+        self.assertEqual(self.group.do("key", self.slow_call, ttl=60)[0], 1)
+
+
+@strict_queries
+@override_settings(SINGLEFLIGHT_MICROCACHE_SECONDS=60)
+class CoalescedFlightReadsTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = sample_user()
+        cls.flight = sample_flight()
+
+    def setUp(self):
+        cache.clear()
+        registry.reset()
+        singleflight.group.clear()
+        self.addCleanup(singleflight.group.clear)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_repeated_reads_are_served_once(self):
+        detail_url = reverse("airport:flight-detail", args=[self.flight.id])
+        first = self.client.get(FLIGHT_URL)
+        first_detail = self.client.get(detail_url)
+
+        with self.assertNumQueries(0):
+            second = self.client.get(FLIGHT_URL)
+            detail = self.client.get(detail_url)
+
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(detail.content, first_detail.content)
+        metrics = registry.render()
+        for view in ("FlightViewSet.list", "FlightViewSet.retrieve"):
+            self.assertIn(
+                f'airport_coalesced_requests_total{{view="{view}",'
+                'via="microcache"} 1',
+                metrics,
+            )
+
+    def test_query_string_is_part_of_the_key(self):
+        self.client.get(FLIGHT_URL)
+
+        res = self.client.get(FLIGHT_URL, {"route": "0"})
+
+        self.assertEqual(res.data["count"], 0)
+
+    def test_permissions_run_for_every_request(self):
+        self.client.get(FLIGHT_URL)
+        self.client.force_authenticate(None)
+
+        res = self.client.get(FLIGHT_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
@@ -1,6 +1,8 @@
 from django.urls import path, include
 from rest_framework import routers
 
+from .async_views import FlightDetailView, FlightListView, RouteListView
+from .seat_stream import FlightSeatStreamView
 from .views import (
     AirplaneViewSet,
     AirplaneTypeViewSet,
@@ -20,6 +22,24 @@ router.register("crews", CrewViewSet)
 router.register("flights", FlightViewSet)
 router.register("orders", OrderViewSet)
 
-urlpatterns = [path("", include(router.urls))]
+urlpatterns = [
+    path(
+        "flights/<int:pk>/seats/stream/",
+        FlightSeatStreamView.as_view(),
+        name="flight-seat-stream",
+    ),
+    path(
+        "async/flights/", FlightListView.as_view(), name="async-flight-list"
+    ),
+    path(
+        "async/flights/<int:pk>/",
+        FlightDetailView.as_view(),
+        name="async-flight-detail",
+    ),
+    path(
+        "async/routes/", RouteListView.as_view(), name="async-route-list"
+    ),
+    path("", include(router.urls)),
+]
 
 app_name = "airport"
@@ -1,7 +1,16 @@
-from django.db.models import Count, F, Q
+from django.conf import settings
+from django.db.models import (
+    Count,
+    Exists,
+    F,
+    OuterRef,
+    Prefetch,
+    Q,
+    Subquery,
+)
+from django.db.models.functions import Coalesce
 from django.utils.dateparse import parse_date
 from rest_framework import viewsets, mixins, status
-from rest_framework.authentication import TokenAuthentication
 from rest_framework.decorators import action
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.permissions import IsAdminUser, IsAuthenticated
@@ -9,6 +18,12 @@ from rest_framework.response import Response
 from rest_framework.viewsets import GenericViewSet
 from drf_spectacular.utils import extend_schema, OpenApiParameter
 
+from airport_api_service.singleflight import CoalescedReadMixin
+
+from . import autocomplete
+from .catalog_cache import CachedListMixin
+from .order_summary import get_summary
+from .tasks import delete_unused_image
 from .models import (
     Airplane,
     AirplaneType,
@@ -17,6 +32,9 @@ from .models import (
     Crew,
     Flight,
     Order,
+    Ticket,
+    ArchivedOrder,
+    ArchivedTicket,
 )
 from .permissions import IsAdminOrIfAuthenticatedReadOnly
 from .serializers import (
@@ -35,6 +53,9 @@ from .serializers import (
     FlightDetailSerializer,
     OrderSerializer,
     OrderListSerializer,
+    TicketListSerializer,
+    ArchivedOrderListSerializer,
+    ArchivedTicketListSerializer,
 )
 
 
@@ -44,8 +65,119 @@ class OrderPagination(PageNumberPagination):
     max_page_size = 100
 
 
+def _params_to_ints(query_string):
+    return [int(str_id) for str_id in query_string.split(",")]
+
+
+def filter_flights(queryset, query_params):
+    """Apply the route, departure_time and crew filters of the flight list"""
+    route = query_params.get("route")
+    departure_time = query_params.get("departure_time")
+    crew = query_params.get("crew")
+
+    if route:
+        route = _params_to_ints(route)
+        queryset = queryset.filter(route__id__in=route)
+
+    if departure_time:
+        parsed_date = parse_date(departure_time)
+        if parsed_date:
+            queryset = queryset.filter(departure_time__date=parsed_date)
+
+    if crew:
+        # EXISTS rather than a join, so flights don't repeat per crew member
+        queryset = queryset.filter(
+            Exists(
+                Crew.objects.filter(flights=OuterRef("pk")).filter(
+                    Q(last_name__icontains=crew) | Q(first_name__icontains=crew)
+                )
+            )
+        )
+
+    return queryset
+
+
+FLIGHT_FILTER_PARAMETERS = [
+    OpenApiParameter(
+        name="route",
+        description="Filter by route IDs (e.g. ?route=2,3)",
+        required=False,
+        type={"type": "array", "items": {"type": "number"}},
+    ),
+    OpenApiParameter(
+        name="departure_time",
+        description="Filter by departure date (e.g. ?departure_date=2022-01-01)",
+        required=False,
+        type={"type": "string", "format": "date"},
+    ),
+    OpenApiParameter(
+        name="crew",
+        description="Filter by crew members name or surname (e.g. ?crew=John)",
+        required=False,
+        type={"type": "string"},
+    ),
+]
+
+AUTOCOMPLETE_PARAMETERS = [
+    OpenApiParameter(
+        name="q",
+        description="Start of a name or city (e.g. ?q=lon)",
+        required=True,
+        type={"type": "string"},
+    ),
+    OpenApiParameter(
+        name="limit",
+        description="Number of suggestions, at most 50 (e.g. ?limit=5)",
+        required=False,
+        type={"type": "number"},
+    ),
+]
+
+ARCHIVED_PARAMETERS = [
+    OpenApiParameter(
+        name="archived",
+        description=(
+            "Orders of long departed flights, moved to the archive "
+            "(e.g. ?archived=true)"
+        ),
+        required=False,
+        type={"type": "boolean"},
+    ),
+]
+
+
+def autocomplete_response(index, request):
+    try:
+        limit = int(
+            request.query_params.get("limit", settings.AUTOCOMPLETE_LIMIT)
+        )
+    except ValueError:
+        limit = settings.AUTOCOMPLETE_LIMIT
+    limit = min(max(limit, 1), settings.AUTOCOMPLETE_MAX_LIMIT)
+    return Response(index.search(request.query_params.get("q", ""), limit))
+
+
+def with_remaining_seats(queryset):
+    # A correlated count reads the tickets of the flights on the page only,
+    # where a join with GROUP BY aggregates every ticket of every flight
+    sold = (
+        Ticket.objects.filter(flight=OuterRef("pk"))
+        .order_by()
+        .values("flight")
+        .annotate(count=Count("id"))
+        .values("count")
+    )
+    return queryset.annotate(
+        remaining_seats=F("airplane__rows") * F("airplane__seats_in_row")
+        - Coalesce(Subquery(sold), 0),
+    )
+
+
 class AirplaneTypeViewSet(
-    mixins.ListModelMixin, mixins.CreateModelMixin, viewsets.GenericViewSet
+    CachedListMixin,
+    mixins.ListModelMixin,
+    mixins.CreateModelMixin,
+    viewsets.GenericViewSet,
 ):
     queryset = AirplaneType.objects.all()
     serializer_class = AirplaneTypeSerializer
@@ -53,6 +185,7 @@ class AirplaneTypeViewSet(
 
 
 class AirplaneViewSet(
+    CachedListMixin,
     mixins.ListModelMixin,
     mixins.CreateModelMixin,
     mixins.UpdateModelMixin,
@@ -86,24 +219,36 @@ class AirplaneViewSet(
     )
     def upload_image(self, request, pk=None):
         item = self.get_object()
+        previous_image = item.image.name
         serializer = self.get_serializer(item, data=request.data)
 
         if serializer.is_valid():
             serializer.save()
+            if previous_image and previous_image != item.image.name:
+                delete_unused_image.enqueue(name=previous_image)
             return Response(serializer.data, status=status.HTTP_200_OK)
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
 class AirportViewSet(
-    mixins.ListModelMixin, mixins.CreateModelMixin, viewsets.GenericViewSet
+    CachedListMixin,
+    mixins.ListModelMixin,
+    mixins.CreateModelMixin,
+    viewsets.GenericViewSet,
 ):
     queryset = Airport.objects.all()
     serializer_class = AirportSerializer
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
 
+    @extend_schema(parameters=AUTOCOMPLETE_PARAMETERS)
+    @action(methods=("GET",), detail=False)
+    def autocomplete(self, request):
+        """Airports whose name or closest city starts with ?q, ranked"""
+        return autocomplete_response(autocomplete.airports, request)
+
 
-class RouteViewSet(viewsets.ModelViewSet):
+class RouteViewSet(CachedListMixin, viewsets.ModelViewSet):
     queryset = Route.objects.all().select_related("source", "destination")
     serializer_class = RouteSerializer
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
@@ -121,14 +266,24 @@ class RouteViewSet(viewsets.ModelViewSet):
 
 
 class CrewViewSet(
-    mixins.ListModelMixin, mixins.CreateModelMixin, viewsets.GenericViewSet
+    CachedListMixin,
+    mixins.ListModelMixin,
+    mixins.CreateModelMixin,
+    viewsets.GenericViewSet,
 ):
     queryset = Crew.objects.all()
     serializer_class = CrewSerializer
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
 
+    @extend_schema(parameters=AUTOCOMPLETE_PARAMETERS)
+    @action(methods=("GET",), detail=False)
+    def autocomplete(self, request):
+        """Crew members whose first or last name starts with ?q, ranked"""
+        return autocomplete_response(autocomplete.crew, request)
+
 
 class FlightViewSet(
+    CoalescedReadMixin,
     mixins.CreateModelMixin,
     mixins.ListModelMixin,
     mixins.RetrieveModelMixin,
@@ -138,10 +293,6 @@ class FlightViewSet(
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
     pagination_class = OrderPagination
 
-    @staticmethod
-    def _params_to_ints(query_string):
-        return [int(str_id) for str_id in query_string.split(",")]
-
     def get_serializer_class(self):
         if self.action == "list":
             return FlightListSerializer
@@ -151,55 +302,14 @@ class FlightViewSet(
         return FlightSerializer
 
     def get_queryset(self):
-        queryset = self.queryset
-        route = self.request.query_params.get("route")
-        departure_time = self.request.query_params.get("departure_time")
-        crew = self.request.query_params.get("crew")
-
-        if route:
-            route = self._params_to_ints(route)
-            queryset = queryset.filter(route__id__in=route)
-
-        if departure_time:
-            parsed_date = parse_date(departure_time)
-            if parsed_date:
-                queryset = queryset.filter(departure_time__date=parsed_date)
-
-        if crew:
-            queryset = queryset.filter(
-                Q(crew__last_name__icontains=crew) | Q(crew__first_name__icontains=crew)
-            )
+        queryset = filter_flights(self.queryset, self.request.query_params)
 
         if self.action == "list":
-            queryset = queryset.prefetch_related("airplane").annotate(
-                remaining_seats=F("airplane__rows") * F("airplane__seats_in_row")
-                - Count("tickets"),
-            )
+            queryset = with_remaining_seats(queryset.prefetch_related("crew"))
 
-        return queryset.distinct()
-
-    @extend_schema(
-        parameters=[
-            OpenApiParameter(
-                name="route",
-                description="Filter by route IDs (e.g. ?route=2,3)",
-                required=False,
-                type={"type": "array", "items": {"type": "number"}},
-            ),
-            OpenApiParameter(
-                name="departure_time",
-                description="Filter by departure date (e.g. ?departure_date=2022-01-01)",
-                required=False,
-                type={"type": "string", "format": "date"},
-            ),
-            OpenApiParameter(
-                name="crew",
-                description="Filter by crew members name or surname (e.g. ?crew=John)",
-                required=False,
-                type={"type": "string"},
-            ),
-        ],
-    )
+        return queryset
+
+    @extend_schema(parameters=FLIGHT_FILTER_PARAMETERS)
     def list(self, request, *args, **kwargs):
         """return list of movies with optional filters"""
         return super().list(request, *args, **kwargs)
@@ -210,23 +320,51 @@ class OrderViewSet(
     mixins.ListModelMixin,
     viewsets.GenericViewSet,
 ):
+    ticket_queryset = Ticket.objects.select_related(
+        "flight__route__source",
+        "flight__route__destination",
+        "flight__airplane",
+    )
     queryset = Order.objects.prefetch_related(
-        "tickets__flight__route",
-        "tickets__flight__airplane",
+        Prefetch("tickets", queryset=ticket_queryset)
+    )
+    archived_ticket_queryset = ArchivedTicket.objects.select_related(
+        "flight__route__source",
+        "flight__route__destination",
+        "flight__airplane",
+    )
+    archived_queryset = ArchivedOrder.objects.prefetch_related(
+        Prefetch("tickets", queryset=archived_ticket_queryset)
     )
     serializer_class = OrderSerializer
     permission_classes = (IsAuthenticated,)
     pagination_class = OrderPagination
 
     def get_permissions(self):
-        if self.action in ("create", "list"):
+        if self.action in ("create", "list", "tickets", "summary"):
             return (IsAuthenticated(),)
 
         return super().get_permissions()
 
+    def is_archived(self) -> bool:
+        """Whether ?archived=true asks for orders moved to the archive"""
+        archived = self.request.query_params.get("archived", "").lower()
+        return self.action in ("list", "tickets") and archived in ("1", "true")
+
     def get_queryset(self):
-        queryset = self.queryset.filter(user=self.request.user)
-        return queryset
+        archived = self.is_archived()
+        if self.action == "tickets":
+            tickets = (
+                self.archived_ticket_queryset
+                if archived
+                else self.ticket_queryset
+            )
+            return tickets.select_related("order").filter(
+                order__user=self.request.user
+            ).order_by("-order__created_at", "seat")
+
+        queryset = self.archived_queryset if archived else self.queryset
+        return queryset.filter(user=self.request.user)
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
@@ -235,4 +373,26 @@ class OrderViewSet(
         serializer = self.serializer_class
         if self.action == "list":
             serializer = OrderListSerializer
+            if self.is_archived():
+                serializer = ArchivedOrderListSerializer
+        if self.action == "tickets":
+            serializer = TicketListSerializer
+            if self.is_archived():
+                serializer = ArchivedTicketListSerializer
         return serializer
+
+    @extend_schema(parameters=ARCHIVED_PARAMETERS)
+    def list(self, request, *args, **kwargs):
+        """The user's orders, newest first"""
+        return super().list(request, *args, **kwargs)
+
+    @extend_schema(parameters=ARCHIVED_PARAMETERS)
+    @action(methods=("GET",), detail=False)
+    def tickets(self, request):
+        """Flat list of the user's tickets, newest orders first"""
+        return self.list(request)
+
+    @action(methods=("GET",), detail=False)
+    def summary(self, request):
+        """Order counts, upcoming flights and the latest orders"""
+        return Response(get_summary(request.user.id))
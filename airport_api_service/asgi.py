@@ -2,6 +2,9 @@
 ASGI config for airport_api_service project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Long-lived streams such as the seat availability events in
+``airport.seat_stream`` need to be served by this application; under WSGI
+each open stream would hold a worker.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/4.2/howto/deployment/asgi/
@@ -0,0 +1,246 @@
+"""
+Batch endpoint: several API calls in one request.
+
+POST /api/v1/batch/ with::
+
+    {"requests": [
+        {"method": "GET", "path": "/api/v1/airport/flights/1/"},
+        {"method": "GET", "path": "/api/v1/user/me/"}
+    ]}
+
+returns ``{"responses": [{"status": 200, "body": {...}}, ...]}`` in the same
+order. The batch is authenticated and throttled once (one throttle unit per
+sub-request); each sub-request is then resolved and dispatched in-process
+to its view as the same user, skipping middleware, token decoding and
+rendering. Only DRF views can be batched (other paths, such as the admin,
+answer 404), and a sub-request that raises gets a 500 entry of its own.
+
+Runs of consecutive reads (GET, HEAD) are dispatched concurrently on up to
+BATCH_MAX_WORKERS threads. Writes run one at a time in the order given and
+separate the runs, so a read placed after a write sees its result. Inside
+a transaction (ATOMIC_REQUESTS, tests) everything runs in the request's
+own thread, as other threads could not see its uncommitted changes.
+Each read runs in a copy of the request's context, so its queries still
+count towards the batch's metrics and pass the N+1 detector.
+"""
+import asyncio
+import contextvars
+import io
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from urllib.parse import urlsplit
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.db import connection, connections
+from django.http import HttpRequest, QueryDict
+from django.urls import Resolver404, resolve
+from drf_spectacular.utils import extend_schema, inline_serializer
+from rest_framework import serializers
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from airport_api_service.metrics import instrument_queries
+from airport_api_service.querylog import (
+    inspect_thread_queries,
+    reset_query_counts,
+)
+
+logger = logging.getLogger(__name__)
+
+SAFE_METHODS = ("GET", "HEAD")
+
+# Headers of the batch request that sub-requests inherit
+INHERITED_META = (
+    "SERVER_NAME",
+    "SERVER_PORT",
+    "REMOTE_ADDR",
+    "HTTP_HOST",
+    "HTTP_X_FORWARDED_FOR",
+    "HTTP_USER_AGENT",
+    "wsgi.url_scheme",
+)
+
+
+class SubRequestSerializer(serializers.Serializer):
+    method = serializers.ChoiceField(
+        choices=("GET", "HEAD", "POST", "PUT", "PATCH", "DELETE")
+    )
+    path = serializers.CharField()
+    body = serializers.JSONField(required=False)
+
+    def validate_path(self, value):
+        if not value.startswith("/"):
+            raise serializers.ValidationError("Use a path like /api/v1/...")
+        return value
+
+
+class BatchSerializer(serializers.Serializer):
+    requests = SubRequestSerializer(many=True, allow_empty=False)
+
+    def validate_requests(self, value):
+        if len(value) > settings.BATCH_MAX_REQUESTS:
+            raise serializers.ValidationError(
+                f"At most {settings.BATCH_MAX_REQUESTS} requests per batch."
+            )
+        return value
+
+
+@lru_cache(maxsize=None)
+def get_executor():
+    return ThreadPoolExecutor(
+        max_workers=settings.BATCH_MAX_WORKERS, thread_name_prefix="batch"
+    )
+
+
+class BatchView(APIView):
+    permission_classes = (IsAuthenticated,)
+
+    def check_throttles(self, request):
+        # What a batch costs is only known once its body is validated
+        serializer = BatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        self.sub_requests = serializer.validated_data["requests"]
+        self.throttle_cost = len(self.sub_requests)
+        super().check_throttles(request)
+
+    @extend_schema(
+        request=BatchSerializer,
+        responses=inline_serializer(
+            "BatchResponse",
+            fields={
+                "responses": inline_serializer(
+                    "SubResponse",
+                    fields={
+                        "status": serializers.IntegerField(),
+                        "body": serializers.JSONField(),
+                    },
+                    many=True,
+                )
+            },
+        ),
+    )
+    def post(self, request):
+        concurrent = (
+            settings.BATCH_MAX_WORKERS > 1 and not connection.in_atomic_block
+        )
+        responses = []
+        reads = []
+        for sub_request in self.sub_requests:
+            if sub_request["method"] in SAFE_METHODS:
+                reads.append(sub_request)
+                continue
+            responses += self.run_reads(request, reads, concurrent)
+            reads = []
+            responses.append(self.dispatch_sub_request(request, sub_request))
+        responses += self.run_reads(request, reads, concurrent)
+
+        return Response({"responses": responses})
+
+    def run_reads(self, request, reads, concurrent) -> list:
+        if not concurrent or len(reads) < 2:
+            return [
+                self.dispatch_sub_request(request, sub_request)
+                for sub_request in reads
+            ]
+        # One fresh copy of the context per task: a context can't be
+        # entered by two threads at once
+        futures = [
+            get_executor().submit(
+                contextvars.copy_context().run,
+                self.dispatch_in_thread,
+                request,
+                sub_request,
+            )
+            for sub_request in reads
+        ]
+        return [future.result() for future in futures]
+
+    def dispatch_in_thread(self, request, sub_request) -> dict:
+        try:
+            with instrument_queries(), inspect_thread_queries():
+                return self.dispatch_sub_request(request, sub_request)
+        finally:
+            # Pool threads own their connections
+            connections.close_all()
+
+    def build_request(self, request, sub_request) -> HttpRequest:
+        url = urlsplit(sub_request["path"])
+        body = b""
+        if "body" in sub_request:
+            body = json.dumps(sub_request["body"]).encode()
+
+        http_request = HttpRequest()
+        http_request.method = sub_request["method"]
+        http_request.path = http_request.path_info = url.path
+        http_request.GET = QueryDict(url.query)
+        http_request.META = {
+            key: request.META[key]
+            for key in INHERITED_META
+            if key in request.META
+        }
+        http_request.META.update(
+            REQUEST_METHOD=sub_request["method"],
+            PATH_INFO=url.path,
+            QUERY_STRING=url.query,
+            HTTP_ACCEPT="application/json",
+            CONTENT_TYPE="application/json",
+            CONTENT_LENGTH=str(len(body)),
+        )
+        http_request._stream = io.BytesIO(body)
+        http_request._read_started = False
+        # Authenticated once for the whole batch, see also throttling
+        http_request._force_auth_user = request.user
+        http_request._force_auth_token = request.auth
+        http_request.in_batch = True
+        return http_request
+
+    def dispatch_sub_request(self, request, sub_request) -> dict:
+        http_request = self.build_request(request, sub_request)
+        try:
+            match = resolve(http_request.path_info)
+        except Resolver404:
+            return {"status": 404, "body": {"detail": "Not found."}}
+        view_class = getattr(match.func, "cls", None)
+        # Only API views honour the forced authentication and answer JSON
+        if view_class is None or not issubclass(view_class, APIView):
+            return {"status": 404, "body": {"detail": "Not found."}}
+        if view_class is type(self):
+            return {"status": 400, "body": {"detail": "Batches can't nest."}}
+
+        http_request.resolver_match = match
+        # Each sub-request is its own unit of work for the N+1 detector
+        reset_query_counts()
+        view = match.func
+        if asyncio.iscoroutinefunction(view):
+            view = async_to_sync(view)
+        try:
+            response = view(http_request, *match.args, **match.kwargs)
+        except Exception:
+            # One broken sub-request must not fail the others
+            logger.exception(
+                "Batch sub-request %s %s failed",
+                sub_request["method"],
+                sub_request["path"],
+            )
+            return {
+                "status": 500,
+                "body": {"detail": "A server error occurred."},
+            }
+
+        if response.streaming:
+            response.close()
+            return {
+                "status": 400,
+                "body": {"detail": "Streaming responses can't be batched."},
+            }
+        if isinstance(response, Response):
+            body = response.data
+        elif response.get("Content-Type", "").startswith("application/json"):
+            body = json.loads(response.content or b"null")
+        else:
+            body = response.content.decode(response.charset)
+        return {"status": response.status_code, "body": body}
@@ -0,0 +1,191 @@
+"""
+Negotiated response compression.
+
+CompressionMiddleware encodes responses of a compressible type (JSON, the
+OpenAPI schema, text) with the best encoding the client accepts: brotli
+when the optional `brotli` package is installed, gzip otherwise. Bodies
+smaller than COMPRESSION_MIN_SIZE are sent as they are, where the framing
+would cost more than it saves.
+
+Streaming responses are compressed chunk by chunk and flushed after every
+chunk, so an event written to a stream reaches the client at once instead
+of waiting in the compressor. The middleware runs under WSGI and ASGI;
+async streaming content stays an async iterator. Responses already carrying a
+Content-Encoding, such as the stored schema, are left alone.
+
+A view that has the encoded bodies at hand, e.g. from a cache, sets
+`response.precompressed` to a dict of encoding to bytes (see
+compress_all()) and the middleware sends them without compressing again.
+"""
+import gzip
+import zlib
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/vnd.oai.openapi",
+    "application/xml",
+    "application/javascript",
+    "text/",
+)
+
+
+def available_encodings() -> tuple:
+    """Encodings this process can produce, preferred first"""
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def _qualities(accept_encoding: str) -> dict:
+    accepted = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[coding.strip().lower()] = quality
+    return accepted
+
+
+def accepts(accept_encoding: str, encoding: str) -> bool:
+    """Whether an Accept-Encoding header allows encoding (q above zero)"""
+    accepted = _qualities(accept_encoding)
+    return accepted.get(encoding, accepted.get("*", 0)) > 0
+
+
+def negotiate(accept_encoding: str):
+    """The preferred encoding the client accepts, or None"""
+    for encoding in available_encodings():
+        if accepts(accept_encoding, encoding):
+            return encoding
+    return None
+
+
+def compress(content: bytes, encoding: str) -> bytes:
+    level = settings.COMPRESSION_LEVELS[encoding]
+    if encoding == "br":
+        return brotli.compress(content, quality=level)
+    return gzip.compress(content, compresslevel=level, mtime=0)
+
+
+def compress_all(content: bytes) -> dict:
+    """The content in every available encoding, if worth compressing"""
+    if len(content) < settings.COMPRESSION_MIN_SIZE:
+        return {}
+    return {
+        encoding: compress(content, encoding)
+        for encoding in available_encodings()
+    }
+
+
+class _StreamCompressor:
+    def __init__(self, encoding: str):
+        level = settings.COMPRESSION_LEVELS[encoding]
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=level)
+            self.compress = self._compressor.process
+            self.flush = self._compressor.flush
+            self.finish = self._compressor.finish
+        else:
+            # wbits 16 + MAX_WBITS writes the gzip header and trailer
+            self._compressor = zlib.compressobj(
+                level, zlib.DEFLATED, 16 + zlib.MAX_WBITS
+            )
+            self.compress = self._compressor.compress
+            self.flush = lambda: self._compressor.flush(zlib.Z_SYNC_FLUSH)
+            self.finish = self._compressor.flush
+
+    def chunk(self, data: bytes) -> bytes:
+        return self.compress(data) + self.flush()
+
+
+def compress_stream(chunks, encoding: str):
+    compressor = _StreamCompressor(encoding)
+    for data in chunks:
+        if data:
+            yield compressor.chunk(data)
+    yield compressor.finish()
+
+
+async def acompress_stream(chunks, encoding: str):
+    compressor = _StreamCompressor(encoding)
+    async for data in chunks:
+        if data:
+            yield compressor.chunk(data)
+    yield compressor.finish()
+
+
+def is_compressible(response) -> bool:
+    content_type = response.get("Content-Type", "").lower()
+    return (
+        content_type.startswith(COMPRESSIBLE_TYPES)
+        and not response.has_header("Content-Encoding")
+        and not response.has_header("Content-Range")
+    )
+
+
+class CompressionMiddleware:
+    async_capable = True
+    sync_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.process_response(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        return self.process_response(request, response)
+
+    def process_response(self, request, response):
+        if not is_compressible(response):
+            return response
+        patch_vary_headers(response, ("Accept-Encoding",))
+
+        encoding = negotiate(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = acompress_stream(
+                    response.streaming_content, encoding
+                )
+            else:
+                response.streaming_content = compress_stream(
+                    response.streaming_content, encoding
+                )
+            if response.has_header("Content-Length"):
+                del response["Content-Length"]
+        else:
+            precompressed = getattr(response, "precompressed", {})
+            if encoding in precompressed:
+                response.content = precompressed[encoding]
+            elif len(response.content) >= settings.COMPRESSION_MIN_SIZE:
+                response.content = compress(response.content, encoding)
+            else:
+                return response
+            response["Content-Length"] = str(len(response.content))
+
+        # The encoded body is a different representation of the resource
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response["ETag"] = "W/" + etag
+        response["Content-Encoding"] = encoding
+        return response
@@ -0,0 +1,133 @@
+"""
+Liveness and readiness checks.
+
+``/healthz`` answers whether the process can serve requests at all: the
+database answers a ``SELECT 1`` within HEALTH_DB_LATENCY_MS. ``/readyz``
+also requires that PostgreSQL has connection slots left (below
+HEALTH_MAX_CONNECTION_USAGE of max_connections) and that no migration is
+pending, so traffic only reaches an instance running against the schema
+it expects. Both respond 200 or 503 with the result of every check.
+
+Results are cached per process for HEALTH_CHECK_CACHE_SECONDS, failures
+included, and computed by one thread at a time, so however often the
+orchestrator probes, each worker costs the database a few queries every
+few seconds. The wait_for_db command uses the same database probe.
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+from django.db.migrations.executor import MigrationExecutor
+from django.http import JsonResponse
+
+
+def probe_database(alias=DEFAULT_DB_ALIAS) -> float:
+    """Run SELECT 1 on a real connection; return the round trip in ms"""
+    connection = connections[alias]
+    start = time.perf_counter()
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1")
+        cursor.fetchone()
+    return (time.perf_counter() - start) * 1000
+
+
+def check_database() -> dict:
+    latency = probe_database()
+    return {
+        "ok": latency <= settings.HEALTH_DB_LATENCY_MS,
+        "latency_ms": round(latency, 1),
+    }
+
+
+def check_connections() -> dict:
+    """Share of the PostgreSQL connection slots in use"""
+    connection = connections[DEFAULT_DB_ALIAS]
+    if connection.vendor != "postgresql":
+        return {"ok": True}
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT count(*), current_setting('max_connections')::int "
+            "FROM pg_stat_activity WHERE backend_type = 'client backend'"
+        )
+        used, limit = cursor.fetchone()
+    return {
+        "ok": used / limit < settings.HEALTH_MAX_CONNECTION_USAGE,
+        "used": used,
+        "max": limit,
+    }
+
+
+def check_migrations() -> dict:
+    executor = MigrationExecutor(connections[DEFAULT_DB_ALIAS])
+    plan = executor.migration_plan(executor.loader.graph.leaf_nodes())
+    return {"ok": not plan, "pending": len(plan)}
+
+
+LIVENESS_CHECKS = {"database": check_database}
+
+READINESS_CHECKS = {
+    **LIVENESS_CHECKS,
+    "connections": check_connections,
+    "migrations": check_migrations,
+}
+
+
+class CachedChecks:
+    """Run a set of checks at most once per HEALTH_CHECK_CACHE_SECONDS"""
+
+    def __init__(self, checks: dict):
+        self.checks = checks
+        self._lock = threading.Lock()
+        self._result = None
+        self._expires = 0.0
+
+    def run(self) -> dict:
+        results = {}
+        for name, check in self.checks.items():
+            try:
+                results[name] = check()
+            except DatabaseError as error:
+                results[name] = {"ok": False, "error": str(error).strip()}
+                # A broken connection would fail every later check too
+                connections[DEFAULT_DB_ALIAS].close()
+                break
+        return results
+
+    def get(self) -> dict:
+        with self._lock:
+            if time.monotonic() >= self._expires:
+                self._result = self.run()
+                self._expires = (
+                    time.monotonic() + settings.HEALTH_CHECK_CACHE_SECONDS
+                )
+            return self._result
+
+    def reset(self) -> None:
+        with self._lock:
+            self._expires = 0.0
+
+
+liveness = CachedChecks(LIVENESS_CHECKS)
+readiness = CachedChecks(READINESS_CHECKS)
+
+
+def _response(checks: CachedChecks) -> JsonResponse:
+    results = checks.get()
+    ok = len(results) == len(checks.checks) and all(
+        result["ok"] for result in results.values()
+    )
+    return JsonResponse(
+        {"status": "ok" if ok else "unavailable", "checks": results},
+        status=200 if ok else 503,
+    )
+
+
+def healthz(request):
+    """Liveness probe"""
+    return _response(liveness)
+
+
+def readyz(request):
+    """Readiness probe"""
+    return _response(readiness)
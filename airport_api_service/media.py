@@ -0,0 +1,187 @@
+"""
+Media delivery for uploaded files (airplane images).
+
+Uploaded files are stored under content-hashed names, so a given URL always
+points at the same bytes. That lets us hand out long-lived immutable cache
+headers and strong ETags, answer conditional and range requests, and
+optionally offload the transfer itself to the front web server via
+X-Accel-Redirect (nginx) or X-Sendfile (Apache, lighttpd).
+"""
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.http import (
+    Http404,
+    HttpResponse,
+    HttpResponseNotModified,
+    FileResponse,
+    StreamingHttpResponse,
+)
+from django.utils._os import safe_join
+from django.utils.http import http_date, parse_etags
+from django.views.decorators.http import require_safe
+
+HASHED_NAME_RE = re.compile(r"-(?P<hash>[0-9a-f]{16})\.[A-Za-z0-9]+$")
+RANGE_RE = re.compile(r"^bytes=(?P<start>\d*)-(?P<end>\d*)$")
+IMMUTABLE_MAX_AGE = 60 * 60 * 24 * 365
+CHUNK_SIZE = 64 * 1024
+# _parse_range() result for a valid range outside the file
+UNSATISFIABLE = "unsatisfiable"
+
+
+def is_content_hashed(name: str) -> bool:
+    return bool(HASHED_NAME_RE.search(name))
+
+
+class ContentHashedStorage(FileSystemStorage):
+    """
+    File system storage that keeps content-hashed names stable.
+
+    Two uploads with identical bytes resolve to the same name, so the second
+    one reuses the stored file instead of getting a random suffix.
+    """
+
+    def get_available_name(self, name, max_length=None):
+        if is_content_hashed(name):
+            return name
+        return super().get_available_name(name, max_length=max_length)
+
+    def _save(self, name, content):
+        if is_content_hashed(name) and self.exists(name):
+            return name
+        return super()._save(name, content)
+
+
+def _parse_range(header: str, size: int):
+    """
+    Return (start, end) of a single byte range, UNSATISFIABLE, or None when
+    the header is invalid or asks for several ranges and is to be ignored
+    """
+    match = RANGE_RE.match(header.strip())
+    if not match:
+        return None
+
+    start, end = match.group("start"), match.group("end")
+    if not start and not end:
+        return None
+    if not start:
+        length = int(end)
+        if length == 0 or size == 0:
+            return UNSATISFIABLE
+        return max(size - length, 0), size - 1
+
+    start = int(start)
+    if end and int(end) < start:
+        return None
+    if start >= size:
+        return UNSATISFIABLE
+    end = min(int(end), size - 1) if end else size - 1
+    return start, end
+
+
+def _iter_range(path, start: int, length: int):
+    with open(path, "rb") as f:
+        f.seek(start)
+        while length > 0:
+            chunk = f.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def _offload_headers(path: str, full_path: str) -> dict:
+    backend = settings.MEDIA_SENDFILE_BACKEND
+    if backend == "nginx":
+        prefix = settings.MEDIA_ACCEL_REDIRECT_PREFIX
+        return {"X-Accel-Redirect": prefix.rstrip("/") + "/" + quote(path)}
+    if backend == "xsendfile":
+        return {"X-Sendfile": full_path}
+
+    return {}
+
+
+@require_safe
+def serve_media(request, path):
+    """Serve a file from MEDIA_ROOT with caching and range support"""
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+    except ValueError:
+        raise Http404("Invalid media path")
+    if not os.path.isfile(full_path):
+        raise Http404("Media file not found")
+
+    stat = os.stat(full_path)
+    hashed = HASHED_NAME_RE.search(path)
+    etag = (
+        f'"{hashed.group("hash")}"'
+        if hashed
+        else f'"{int(stat.st_mtime):x}-{stat.st_size:x}"'
+    )
+    headers = {
+        "ETag": etag,
+        "Last-Modified": http_date(stat.st_mtime),
+        "Accept-Ranges": "bytes",
+        "Cache-Control": (
+            f"public, max-age={IMMUTABLE_MAX_AGE}, immutable"
+            if hashed
+            else f"public, max-age={settings.MEDIA_CACHE_MAX_AGE}"
+        ),
+    }
+
+    if_none_match = parse_etags(request.headers.get("If-None-Match", ""))
+    # Weak comparison, as If-None-Match calls for
+    if "*" in if_none_match or etag in (
+        tag.removeprefix("W/") for tag in if_none_match
+    ):
+        response = HttpResponseNotModified()
+        for header, value in headers.items():
+            response[header] = value
+        return response
+
+    content_type = mimetypes.guess_type(full_path)[0]
+    content_type = content_type or "application/octet-stream"
+
+    offload = _offload_headers(path, full_path)
+    if offload:
+        # The web server handles ranges and conditional requests itself
+        response = HttpResponse(content_type=content_type)
+        headers.update(offload)
+    else:
+        response = _file_response(request, full_path, stat.st_size, etag)
+        if response is None:
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{stat.st_size}"
+            return response
+        response["Content-Type"] = content_type
+
+    for header, value in headers.items():
+        response[header] = value
+    return response
+
+
+def _file_response(request, full_path: str, size: int, etag: str):
+    range_header = request.headers.get("Range")
+    if_range = request.headers.get("If-Range")
+    byte_range = None
+    if range_header and not (if_range and if_range != etag):
+        byte_range = _parse_range(range_header, size)
+    if byte_range is None:
+        response = FileResponse(open(full_path, "rb"))
+        response["Content-Length"] = size
+        return response
+    if byte_range == UNSATISFIABLE:
+        return None
+
+    start, end = byte_range
+    length = end - start + 1
+    response = StreamingHttpResponse(
+        _iter_range(full_path, start, length), status=206
+    )
+    response["Content-Range"] = f"bytes {start}-{end}/{size}"
+    response["Content-Length"] = length
+    return response
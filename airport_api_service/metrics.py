@@ -0,0 +1,339 @@
+"""
+Lightweight request instrumentation.
+
+PerformanceMiddleware times every request and wraps database execution to
+collect, per view action (e.g. ``FlightViewSet.list``):
+
+* wall time of the whole request,
+* time spent in the database, number of queries and rows returned,
+* time spent in the view outside the database (serializer work for the
+  read endpoints),
+* time spent rendering the response.
+
+The numbers are aggregated in a process-local registry exposed in the
+Prometheus text format at ``/metrics`` (to the addresses listed in
+METRICS_ALLOWED_IPS) and, per request, in a ``Server-Timing`` header. Each
+worker process keeps its own registry, so scrape every worker (or sum by
+instance) when running several. The middleware works under WSGI and ASGI.
+
+The per-request cost is a few ``perf_counter()`` calls, one execute wrapper
+call per query and a short critical section when the request finishes.
+"""
+import contextlib
+import threading
+import time
+from collections import defaultdict
+from contextvars import ContextVar
+
+from asgiref.sync import (
+    iscoroutinefunction,
+    markcoroutinefunction,
+    sync_to_async,
+)
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse, HttpResponseForbidden
+
+DURATION_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+_current_stats = ContextVar("request_stats", default=None)
+# Worker threads of a batch request add to the same stats concurrently
+_stats_lock = threading.Lock()
+
+
+class RequestStats:
+    __slots__ = (
+        "view",
+        "db_time",
+        "queries",
+        "rows",
+        "view_start",
+        "view_end",
+        "render_start",
+        "render_end",
+    )
+
+    def __init__(self):
+        self.view = None
+        self.db_time = 0.0
+        self.queries = 0
+        self.rows = 0
+        self.view_start = self.view_end = None
+        self.render_start = self.render_end = None
+
+    @property
+    def view_time(self) -> float:
+        if self.view_start is None or self.view_end is None:
+            return 0.0
+        return max(self.view_end - self.view_start - self.db_time, 0.0)
+
+    @property
+    def render_time(self) -> float:
+        if self.render_start is None or self.render_end is None:
+            return 0.0
+        return self.render_end - self.render_start
+
+
+def current_stats():
+    """Return the stats of the request being processed, if any"""
+    return _current_stats.get()
+
+
+class _ViewMetrics:
+    __slots__ = (
+        "requests",
+        "buckets",
+        "wall",
+        "db",
+        "queries",
+        "rows",
+        "view",
+        "render",
+    )
+
+    def __init__(self):
+        self.requests = defaultdict(int)
+        self.buckets = [0] * len(DURATION_BUCKETS)
+        self.wall = self.db = self.view = self.render = 0.0
+        self.queries = self.rows = 0
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._views = defaultdict(_ViewMetrics)
+        self._counters = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def observe(self, view: str, status: int, wall: float, stats):
+        with self._lock:
+            metrics = self._views[view]
+            metrics.requests[status] += 1
+            for i, bound in enumerate(DURATION_BUCKETS):
+                if wall <= bound:
+                    metrics.buckets[i] += 1
+                    break
+            metrics.wall += wall
+            metrics.db += stats.db_time
+            metrics.queries += stats.queries
+            metrics.rows += stats.rows
+            metrics.view += stats.view_time
+            metrics.render += stats.render_time
+
+    def increment(self, name: str, labels: tuple = (), value: int = 1):
+        """Bump a free-form counter, exported as airport_<name>_total"""
+        with self._lock:
+            self._counters[(name, labels)] += value
+
+    def reset(self):
+        with self._lock:
+            self._views.clear()
+            self._counters.clear()
+
+    def render(self) -> str:
+        with self._lock:
+            views = sorted(self._views.items())
+            counters = sorted(self._counters.items())
+
+        lines = [
+            "# HELP airport_http_requests_total Requests by view and status.",
+            "# TYPE airport_http_requests_total counter",
+        ]
+        for view, metrics in views:
+            for status, count in sorted(metrics.requests.items()):
+                lines.append(
+                    f'airport_http_requests_total{{view="{view}",'
+                    f'status="{status}"}} {count}'
+                )
+
+        lines += [
+            "# HELP airport_http_request_duration_seconds Request wall time.",
+            "# TYPE airport_http_request_duration_seconds histogram",
+        ]
+        for view, metrics in views:
+            cumulative = 0
+            for bound, count in zip(DURATION_BUCKETS, metrics.buckets):
+                cumulative += count
+                lines.append(
+                    "airport_http_request_duration_seconds_bucket"
+                    f'{{view="{view}",le="{bound}"}} {cumulative}'
+                )
+            total = sum(metrics.requests.values())
+            lines += [
+                "airport_http_request_duration_seconds_bucket"
+                f'{{view="{view}",le="+Inf"}} {total}',
+                "airport_http_request_duration_seconds_sum"
+                f'{{view="{view}"}} {metrics.wall:.6f}',
+                "airport_http_request_duration_seconds_count"
+                f'{{view="{view}"}} {total}',
+            ]
+
+        for name, attribute, help_text in (
+            ("db_duration_seconds", "db", "Time spent in the database."),
+            ("db_queries", "queries", "Database queries executed."),
+            ("db_rows", "rows", "Rows returned by the database."),
+            (
+                "view_duration_seconds",
+                "view",
+                "Time spent in the view outside the database.",
+            ),
+            (
+                "render_duration_seconds",
+                "render",
+                "Time spent rendering responses.",
+            ),
+        ):
+            lines += [
+                f"# HELP airport_{name}_total {help_text}",
+                f"# TYPE airport_{name}_total counter",
+            ]
+            for view, metrics in views:
+                value = getattr(metrics, attribute)
+                if isinstance(value, float):
+                    value = f"{value:.6f}"
+                lines.append(f'airport_{name}_total{{view="{view}"}} {value}')
+
+        seen = set()
+        for (name, labels), value in counters:
+            if name not in seen:
+                seen.add(name)
+                lines.append(f"# TYPE airport_{name}_total counter")
+            rendered = ",".join(f'{key}="{val}"' for key, val in labels)
+            lines.append(f"airport_{name}_total{{{rendered}}} {value}")
+
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+
+def _instrument_query(execute, sql, params, many, context):
+    stats = _current_stats.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        duration = time.perf_counter() - start
+        rowcount = getattr(context["cursor"], "rowcount", -1)
+        with _stats_lock:
+            stats.db_time += duration
+            stats.queries += 1
+            if rowcount and rowcount > 0:
+                stats.rows += rowcount
+
+
+@contextlib.contextmanager
+def instrument_queries():
+    """
+    Count the queries run on this thread's connections into the stats of
+    the current request. Connections are per thread, so a thread working
+    for the request (with a copy of its context) has to call this too.
+    """
+    with contextlib.ExitStack() as stack:
+        if _current_stats.get() is not None:
+            for connection in connections.all():
+                stack.enter_context(
+                    connection.execute_wrapper(_instrument_query)
+                )
+        yield
+
+
+def _view_label(view_func, method: str) -> str:
+    view_class = getattr(view_func, "cls", None)
+    if view_class is None:
+        return getattr(view_func, "__name__", "unknown")
+
+    actions = getattr(view_func, "actions", None) or {}
+    action = actions.get(method.lower(), method.lower())
+    return f"{view_class.__name__}.{action}"
+
+
+class PerformanceMiddleware:
+    """Collect per-view timings and database usage, see module docstring"""
+
+    async_capable = True
+    sync_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        stats = RequestStats()
+        token = _current_stats.set(stats)
+        start = time.perf_counter()
+        try:
+            with instrument_queries():
+                response = self.get_response(request)
+        finally:
+            _current_stats.reset(token)
+        return self.finish(response, stats, start)
+
+    async def __acall__(self, request):
+        stats = RequestStats()
+        token = _current_stats.set(stats)
+        start = time.perf_counter()
+        # Connections are per thread: wrap those of the thread that runs
+        # the request's sync code and ORM calls (thread-sensitive)
+        queries = instrument_queries()
+        await sync_to_async(queries.__enter__)()
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(queries.__exit__)(None, None, None)
+            _current_stats.reset(token)
+        return self.finish(response, stats, start)
+
+    def finish(self, response, stats, start):
+        end = time.perf_counter()
+        wall = end - start
+        if stats.view_start is not None and stats.view_end is None:
+            stats.view_end = end
+
+        registry.observe(
+            stats.view or "unresolved", response.status_code, wall, stats
+        )
+        if settings.METRICS_SERVER_TIMING:
+            response["Server-Timing"] = (
+                f'db;dur={stats.db_time * 1000:.2f};desc="{stats.queries} '
+                f'queries", view;dur={stats.view_time * 1000:.2f}, '
+                f"render;dur={stats.render_time * 1000:.2f}, "
+                f"total;dur={wall * 1000:.2f}"
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        stats = _current_stats.get()
+        if stats is not None:
+            stats.view = _view_label(view_func, request.method)
+            stats.view_start = time.perf_counter()
+
+    def process_template_response(self, request, response):
+        stats = _current_stats.get()
+        if stats is not None:
+            stats.view_end = stats.render_start = time.perf_counter()
+            response.add_post_render_callback(self._rendered)
+        return response
+
+    @staticmethod
+    def _rendered(response):
+        stats = _current_stats.get()
+        if stats is not None:
+            stats.render_end = time.perf_counter()
+
+
+def metrics_view(request):
+    """Prometheus scrape endpoint, open to METRICS_ALLOWED_IPS only"""
+    # REMOTE_ADDR rather than X-Forwarded-For, which clients can forge
+    if request.META.get("REMOTE_ADDR") not in settings.METRICS_ALLOWED_IPS:
+        return HttpResponseForbidden()
+    return HttpResponse(
+        registry.render(), content_type="text/plain; version=0.0.4"
+    )
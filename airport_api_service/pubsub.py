@@ -0,0 +1,172 @@
+"""
+In-process publish/subscribe for pushing events to streaming responses.
+
+Subscribers are async iterators living on the ASGI event loop; publishers
+may be any thread (usually a post-commit hook in a sync view). Every
+subscriber has a bounded queue. A subscriber that falls behind loses its
+backlog and receives RESYNC instead, so it can reload the current state
+rather than slowing down everybody else.
+
+A backend carries messages between processes:
+
+* ``LocalBackend`` delivers within the current process only, which is
+  enough for a single ASGI worker and for tests.
+* ``PostgresBackend`` sends ``NOTIFY`` on publish and runs one ``LISTEN``
+  thread per process that hands notifications to the local subscribers, so
+  every worker sees events published by every other worker.
+
+The backend is configured with ``PUBSUB = {"BACKEND": ..., "OPTIONS": {}}``.
+"""
+import asyncio
+import json
+import logging
+import threading
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import connections
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+RESYNC = object()
+
+
+class Subscription:
+    def __init__(self, broker, channel: str, maxsize: int):
+        self.broker = broker
+        self.channel = channel
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=maxsize)
+
+    def _put(self, message) -> None:
+        # Runs on the subscriber's event loop
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESYNC)
+
+    def deliver(self, message) -> None:
+        self.loop.call_soon_threadsafe(self._put, message)
+
+    async def get(self, timeout: float = None):
+        """Next message or RESYNC; raise TimeoutError after `timeout`"""
+        return await asyncio.wait_for(self.queue.get(), timeout)
+
+    def close(self) -> None:
+        self.broker.unsubscribe(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class Broker:
+    """Fan messages out to the subscriptions of this process"""
+
+    def __init__(self):
+        self._channels = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, channel: str, maxsize: int = 100) -> Subscription:
+        subscription = Subscription(self, channel, maxsize)
+        with self._lock:
+            self._channels.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            subscribers = self._channels.get(subscription.channel)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._channels[subscription.channel]
+
+    def subscribers(self, channel: str) -> int:
+        with self._lock:
+            return len(self._channels.get(channel, ()))
+
+    def deliver(self, channel: str, message) -> None:
+        with self._lock:
+            subscribers = tuple(self._channels.get(channel, ()))
+        for subscription in subscribers:
+            try:
+                subscription.deliver(message)
+            except RuntimeError:  # the subscriber's event loop is gone
+                self.unsubscribe(subscription)
+
+
+class LocalBackend:
+    def __init__(self, broker: Broker):
+        self.broker = broker
+
+    def publish(self, channel: str, message) -> None:
+        self.broker.deliver(channel, message)
+
+    def start(self) -> None:
+        pass
+
+
+class PostgresBackend(LocalBackend):
+    def __init__(
+        self, broker: Broker, channel="airport_pubsub", using="default"
+    ):
+        super().__init__(broker)
+        self.channel = channel
+        self.using = using
+        self._listener = None
+        self._lock = threading.Lock()
+
+    def publish(self, channel: str, message) -> None:
+        payload = json.dumps({"channel": channel, "message": message})
+        with connections[self.using].cursor() as cursor:
+            cursor.execute("SELECT pg_notify(%s, %s)", [self.channel, payload])
+
+    def start(self) -> None:
+        with self._lock:
+            if self._listener is None or not self._listener.is_alive():
+                self._listener = threading.Thread(
+                    target=self._listen, name="pubsub-listener", daemon=True
+                )
+                self._listener.start()
+
+    def _listen(self) -> None:
+        wrapper = connections[self.using]
+        while True:
+            try:
+                conn = wrapper.get_new_connection(
+                    wrapper.get_connection_params()
+                )
+                conn.autocommit = True
+                conn.execute(f'LISTEN "{self.channel}"')
+                for notify in conn.notifies():
+                    data = json.loads(notify.payload)
+                    self.broker.deliver(data["channel"], data["message"])
+            except Exception:
+                logger.exception("Pub/sub listener failed, reconnecting")
+                threading.Event().wait(1)
+
+
+broker = Broker()
+
+
+@lru_cache(maxsize=None)
+def get_backend():
+    config = settings.PUBSUB
+    return import_string(config["BACKEND"])(
+        broker, **config.get("OPTIONS", {})
+    )
+
+
+def publish(channel: str, message) -> None:
+    get_backend().publish(channel, message)
+
+
+def subscribe(channel: str, maxsize: int = 100) -> Subscription:
+    """Subscribe from async code; use as a context manager"""
+    get_backend().start()
+    return broker.subscribe(channel, maxsize)
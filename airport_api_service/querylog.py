@@ -0,0 +1,219 @@
+"""
+Slow-query log and N+1 detector.
+
+While a request is processed, every query is reduced to its shape (the SQL
+with literals and IN-list lengths collapsed) and counted. When one shape
+runs more than ``N_PLUS_ONE_THRESHOLD`` times, the request most likely
+issues one query per row: it is logged, or raises NPlusOneError when
+``N_PLUS_ONE_STRICT`` is on (as in the airport test suite).
+
+Queries slower than ``SLOW_QUERY_THRESHOLD_MS`` are written to the
+``airport_api_service.querylog`` logger as one JSON object per line,
+together with their ``EXPLAIN (FORMAT JSON)`` plan on PostgreSQL.
+
+QueryInspectionMiddleware works under WSGI and ASGI; under ASGI it watches
+the connections of the thread the request's ORM calls run in.
+"""
+import json
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import (
+    iscoroutinefunction,
+    markcoroutinefunction,
+    sync_to_async,
+)
+from django.conf import settings
+from django.db import connections
+
+from airport_api_service.metrics import current_stats
+
+logger = logging.getLogger(__name__)
+
+_current_inspector = ContextVar("query_inspector", default=None)
+
+_SHAPE_RULES = (
+    (re.compile(r"\bIN \((?:%s, )*%s\)"), "IN (...)"),
+    (re.compile(r"'(?:[^']|'')*'"), "?"),
+    (re.compile(r"\b\d+\b"), "?"),
+)
+
+
+class NPlusOneError(Exception):
+    pass
+
+
+def query_shape(sql: str) -> str:
+    for pattern, replacement in _SHAPE_RULES:
+        sql = pattern.sub(replacement, sql)
+    return sql
+
+
+class QueryInspector:
+    def __init__(self, threshold: int, strict: bool, slow_ms: float):
+        self.threshold = threshold
+        self.strict = strict
+        self.slow_ms = slow_ms
+        self.shapes = Counter()
+        self.reported = set()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        result = execute(sql, params, many, context)
+        duration_ms = (time.perf_counter() - start) * 1000
+
+        if self.slow_ms is not None and duration_ms >= self.slow_ms:
+            self.log_slow_query(
+                context["connection"], sql, params, many, duration_ms
+            )
+
+        shape = query_shape(sql)
+        self.shapes[shape] += 1
+        if self.shapes[shape] > self.threshold and shape not in self.reported:
+            self.reported.add(shape)
+            self.report_repeated(shape)
+
+        return result
+
+    def report_repeated(self, shape: str):
+        stats = current_stats()
+        message = (
+            f"Query executed more than {self.threshold} times in "
+            f"{getattr(stats, 'view', None) or 'one unit of work'}, "
+            f"probably an N+1: {shape}"
+        )
+        if self.strict:
+            raise NPlusOneError(message)
+        logger.warning(message)
+
+    def log_slow_query(self, connection, sql, params, many, duration_ms):
+        stats = current_stats()
+        record = {
+            "event": "slow_query",
+            "view": getattr(stats, "view", None),
+            "duration_ms": round(duration_ms, 3),
+            "sql": sql,
+            "params": None if many else [repr(p) for p in params or ()],
+        }
+        if (
+            settings.SLOW_QUERY_EXPLAIN
+            and not many
+            and connection.vendor == "postgresql"
+            and sql.lstrip().upper().startswith("SELECT")
+        ):
+            record["plan"] = self.explain(connection, sql, params)
+        logger.info(json.dumps(record, default=str))
+
+    @staticmethod
+    def explain(connection, sql, params):
+        # Use the raw driver cursor so the EXPLAIN bypasses the execute
+        # wrappers and is neither counted nor inspected itself. Inside a
+        # transaction a savepoint keeps a failed EXPLAIN from aborting it.
+        savepoint = connection.in_atomic_block
+        with connection.connection.cursor() as cursor:
+            if savepoint:
+                cursor.execute("SAVEPOINT querylog_explain")
+            try:
+                cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+                plan = cursor.fetchone()[0]
+            except Exception as error:  # never fail a request over a plan
+                if savepoint:
+                    cursor.execute("ROLLBACK TO SAVEPOINT querylog_explain")
+                return {"error": str(error)}
+            if savepoint:
+                cursor.execute("RELEASE SAVEPOINT querylog_explain")
+            return plan
+
+
+def new_inspector(threshold=None, strict=None, slow_ms=None):
+    """Build an inspector, taking what isn't given from the settings"""
+    return QueryInspector(
+        threshold=(
+            settings.N_PLUS_ONE_THRESHOLD if threshold is None else threshold
+        ),
+        strict=settings.N_PLUS_ONE_STRICT if strict is None else strict,
+        slow_ms=(
+            settings.SLOW_QUERY_THRESHOLD_MS if slow_ms is None else slow_ms
+        ),
+    )
+
+
+@contextmanager
+def wrap_connections(inspector):
+    """Pass every query run on this thread's connections to the inspector"""
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(inspector))
+        yield inspector
+
+
+@contextmanager
+def inspect_queries(threshold=None, strict=None, slow_ms=None):
+    """Inspect every query run on any connection inside the block"""
+    inspector = new_inspector(threshold, strict, slow_ms)
+    token = _current_inspector.set(inspector)
+    try:
+        with wrap_connections(inspector):
+            yield inspector
+    finally:
+        _current_inspector.reset(token)
+
+
+@contextmanager
+def inspect_thread_queries():
+    """
+    Inspect the queries of a thread working for the current request, e.g.
+    a batch sub-request, like the request's own. The thread runs in a copy
+    of the request's context but has its own connections and counts.
+    """
+    parent = _current_inspector.get()
+    if parent is None:
+        yield None
+        return
+    with inspect_queries(
+        threshold=parent.threshold,
+        strict=parent.strict,
+        slow_ms=parent.slow_ms,
+    ) as inspector:
+        yield inspector
+
+
+def reset_query_counts():
+    """Start counting afresh, e.g. for each sub-request of a batch"""
+    inspector = _current_inspector.get()
+    if inspector is not None:
+        inspector.shapes.clear()
+        inspector.reported.clear()
+
+
+class QueryInspectionMiddleware:
+    async_capable = True
+    sync_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with inspect_queries():
+            return self.get_response(request)
+
+    async def __acall__(self, request):
+        inspector = new_inspector()
+        token = _current_inspector.set(inspector)
+        # Connections are per thread: wrap those of the thread that runs
+        # the request's sync code and ORM calls (thread-sensitive)
+        wrapped = wrap_connections(inspector)
+        await sync_to_async(wrapped.__enter__)()
+        try:
+            return await self.get_response(request)
+        finally:
+            await sync_to_async(wrapped.__exit__)(None, None, None)
+            _current_inspector.reset(token)
@@ -0,0 +1,192 @@
+"""
+OpenAPI schema generated once per code version instead of per request.
+
+drf-spectacular walks every view and serializer to build the schema, which
+costs far more than serving it. SchemaView renders the YAML and JSON
+schema the first time it is asked for and stores them, gzipped too, in
+OPENAPI_SCHEMA_DIR under the code version. Every later request, in any
+worker and after restarts, reads the stored file into memory once and
+answers with it. Responses carry an ETag, so clients revalidate with 304s.
+
+The code version is OPENAPI_SCHEMA_VERSION when set (e.g. the commit a
+release is built from), otherwise a hash of the project sources and the
+schema settings, so changing a view or serializer yields a new schema.
+`python manage.py generate_schema` writes the files ahead of time, e.g.
+while building the image. Requests with ?lang= or ?version= are generated
+as before.
+"""
+import gzip
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+from functools import lru_cache
+from pathlib import Path
+
+import drf_spectacular
+from django.apps import apps
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags
+from drf_spectacular.renderers import OpenApiJsonRenderer, OpenApiYamlRenderer
+from drf_spectacular.utils import extend_schema
+from drf_spectacular.views import SCHEMA_KWARGS, SpectacularAPIView
+
+from airport_api_service import compression
+
+RENDERERS = {
+    "yaml": OpenApiYamlRenderer,
+    "json": OpenApiJsonRenderer,
+}
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_loaded = {}
+
+
+@lru_cache(maxsize=None)
+def code_version() -> str:
+    if settings.OPENAPI_SCHEMA_VERSION:
+        return settings.OPENAPI_SCHEMA_VERSION
+
+    digest = hashlib.sha256()
+    digest.update(drf_spectacular.__version__.encode())
+    digest.update(repr(sorted(settings.SPECTACULAR_SETTINGS.items())).encode())
+    base_dir = Path(settings.BASE_DIR).resolve()
+    roots = {base_dir / "airport_api_service"}
+    for app_config in apps.get_app_configs():
+        path = Path(app_config.path).resolve()
+        if path.is_relative_to(base_dir):
+            roots.add(path)
+    for root in sorted(roots):
+        for source in sorted(root.rglob("*.py")):
+            if {"tests", "migrations"} & set(source.relative_to(root).parts):
+                continue
+            digest.update(str(source.relative_to(base_dir)).encode())
+            digest.update(source.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def schema_path(fmt, version=None) -> Path:
+    directory = Path(settings.OPENAPI_SCHEMA_DIR)
+    return directory / f"openapi-{version or code_version()}.{fmt}"
+
+
+def _write(path: Path, content: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Workers may generate concurrently; each file appears whole or not
+    fd, temporary = tempfile.mkstemp(dir=path.parent, prefix=path.name)
+    with os.fdopen(fd, "wb") as file:
+        file.write(content)
+    os.replace(temporary, path)
+
+
+def render() -> dict:
+    """The schema in every format, as bytes"""
+    generator = SpectacularAPIView.generator_class()
+    schema = generator.get_schema(
+        request=None, public=SpectacularAPIView.serve_public
+    )
+    return {
+        fmt: renderer().render(schema, renderer.media_type, {})
+        for fmt, renderer in RENDERERS.items()
+    }
+
+
+def store(rendered: dict) -> list:
+    """Write the rendered schema, gzipped too if configured; return paths"""
+    paths = []
+    for fmt, content in rendered.items():
+        paths.append(schema_path(fmt))
+        _write(paths[-1], content)
+        if settings.OPENAPI_SCHEMA_PRECOMPRESS:
+            paths.append(schema_path(f"{fmt}.gz"))
+            _write(paths[-1], gzip.compress(content, mtime=0))
+    return paths
+
+
+class StoredSchema:
+    """One format of the stored schema, with its ETags"""
+
+    def __init__(self, content: bytes, compressed: bytes = None):
+        self.content = content
+        self.compressed = compressed
+        tag = hashlib.sha256(content).hexdigest()[:32]
+        self.etag = f'"{tag}"'
+        self.compressed_etag = f'"{tag}-gzip"'
+
+
+def _read(path: Path):
+    try:
+        return path.read_bytes()
+    except FileNotFoundError:
+        return None
+
+
+def _load(version) -> None:
+    rendered = {fmt: _read(schema_path(fmt, version)) for fmt in RENDERERS}
+    if None in rendered.values():
+        rendered = render()
+        try:
+            store(rendered)
+        except OSError:
+            # e.g. a read-only image: serve this process from memory
+            logger.exception("Could not store the OpenAPI schema")
+    for fmt, content in rendered.items():
+        compressed = None
+        if settings.OPENAPI_SCHEMA_PRECOMPRESS:
+            compressed = _read(schema_path(f"{fmt}.gz", version))
+            if compressed is None:
+                compressed = gzip.compress(content, mtime=0)
+        _loaded[version, fmt] = StoredSchema(content, compressed)
+
+
+def stored_schema(fmt) -> StoredSchema:
+    version = code_version()
+    if (version, fmt) not in _loaded:
+        with _lock:
+            if (version, fmt) not in _loaded:
+                _load(version)
+    return _loaded[version, fmt]
+
+
+def clear_loaded() -> None:
+    _loaded.clear()
+    code_version.cache_clear()
+
+
+class SchemaView(SpectacularAPIView):
+    """SpectacularAPIView answering from the stored schema"""
+
+    @extend_schema(**SCHEMA_KWARGS)
+    def get(self, request, *args, **kwargs):
+        if self.custom_settings or {"lang", "version"} & set(request.GET):
+            return super().get(request, *args, **kwargs)
+
+        renderer = request.accepted_renderer
+        schema = stored_schema(renderer.format)
+        content, etag = schema.content, schema.etag
+        gzipped = schema.compressed is not None and compression.accepts(
+            request.META.get("HTTP_ACCEPT_ENCODING", ""), "gzip"
+        )
+        if gzipped:
+            content, etag = schema.compressed, schema.compressed_etag
+
+        if_none_match = parse_etags(request.META.get("HTTP_IF_NONE_MATCH", ""))
+        if etag in if_none_match or "*" in if_none_match:
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(
+                content, content_type=request.accepted_media_type
+            )
+            response["Content-Disposition"] = (
+                f'inline; filename="{self._get_filename(request, None)}"'
+            )
+            if gzipped:
+                response["Content-Encoding"] = "gzip"
+        response["ETag"] = etag
+        patch_vary_headers(response, ("Accept", "Accept-Encoding"))
+        return response
@@ -41,13 +41,17 @@ INSTALLED_APPS = [
     "rest_framework",
     "user",
     "airport",
+    "taskqueue",
+    "analytics",
     "debug_toolbar",
-    "rest_framework.authtoken",
     "drf_spectacular",
 ]
 
 MIDDLEWARE = [
+    "airport_api_service.metrics.PerformanceMiddleware",
+    "airport_api_service.querylog.QueryInspectionMiddleware",
     "django.middleware.security.SecurityMiddleware",
+    "airport_api_service.compression.CompressionMiddleware",
     "debug_toolbar.middleware.DebugToolbarMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -84,11 +88,11 @@ WSGI_APPLICATION = "airport_api_service.wsgi.application"
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.postgresql",
-        "HOST": os.environ["POSTGRES_HOST"],
-        "NAME": os.environ["POSTGRES_DB"],
-        "USER": os.environ["POSTGRES_USER"],
-        "PASSWORD": os.environ["POSTGRES_PASSWORD"],
-        "PORT": os.environ["POSTGRES_PORT"],
+        "HOST": os.environ.get("POSTGRES_HOST"),
+        "NAME": os.environ.get("POSTGRES_DB"),
+        "USER": os.environ.get("POSTGRES_USER"),
+        "PASSWORD": os.environ.get("POSTGRES_PASSWORD"),
+        "PORT": os.environ.get("POSTGRES_PORT"),
     }
 }
 
@@ -113,6 +117,29 @@ AUTH_PASSWORD_VALIDATORS = [
 
 AUTH_USER_MODEL = "user.User"
 
+AUTHENTICATION_BACKENDS = ["user.backends.PooledModelBackend"]
+
+# The first hasher encodes new passwords; hashes made by any other listed
+# hasher, or with a different work factor, are upgraded on login.
+PASSWORD_HASHERS = [
+    "user.hashers.ConfigurablePBKDF2PasswordHasher",
+    "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+    "django.contrib.auth.hashers.ScryptPasswordHasher",
+]
+
+PASSWORD_HASH_ITERATIONS = int(
+    os.environ.get("PASSWORD_HASH_ITERATIONS", 600_000)
+)
+
+# Bounded pool that runs login password hashing, see user.hashers
+PASSWORD_HASHING_POOL = {
+    "WORKERS": int(
+        os.environ.get("PASSWORD_HASHING_WORKERS", min(4, os.cpu_count() or 1))
+    ),
+    "QUEUE_SIZE": 32,
+    "TIMEOUT": 5,
+}
+
 # Internationalization
 # https://docs.djangoproject.com/en/4.2/topics/i18n/
 
@@ -143,14 +170,34 @@ MEDIA_ROOT = BASE_DIR / "media"
 
 MEDIA_URL = "/media/"
 
+STORAGES = {
+    "default": {
+        "BACKEND": "airport_api_service.media.ContentHashedStorage",
+    },
+    "staticfiles": {
+        "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage",
+    },
+}
+
+# Offload media transfers to the front web server: "nginx" (X-Accel-Redirect)
+# or "xsendfile" (X-Sendfile). Empty means Django streams the file itself.
+MEDIA_SENDFILE_BACKEND = os.environ.get("MEDIA_SENDFILE_BACKEND", "")
+
+MEDIA_ACCEL_REDIRECT_PREFIX = os.environ.get(
+    "MEDIA_ACCEL_REDIRECT_PREFIX", "/protected-media/"
+)
+
+# Cache lifetime for media files without a content hash in their name
+MEDIA_CACHE_MAX_AGE = 60 * 60
+
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "user.authentication.CachedJWTAuthentication",
     ),
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
     "DEFAULT_THROTTLE_CLASSES": [
-        "rest_framework.throttling.AnonRateThrottle",
-        "rest_framework.throttling.UserRateThrottle",
+        "airport_api_service.throttling.AnonRateThrottle",
+        "airport_api_service.throttling.UserRateThrottle",
     ],
     "DEFAULT_THROTTLE_RATES": {"anon": "10/min", "user": "30/min"},
 }
@@ -167,8 +214,178 @@ SPECTACULAR_SETTINGS = {
         "defaultModelExpandDepth": 2,
     },
 }
+# Pre-generated OpenAPI schema, see airport_api_service.schema
+OPENAPI_SCHEMA_DIR = os.environ.get("OPENAPI_SCHEMA_DIR", BASE_DIR / "openapi")
+
+# Code version keying the stored schema; empty hashes the sources
+OPENAPI_SCHEMA_VERSION = os.environ.get("OPENAPI_SCHEMA_VERSION", "")
+
+OPENAPI_SCHEMA_PRECOMPRESS = True
+
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=60),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=1),
     "ROTATE_REFRESH_TOKENS": False,
 }
+
+# Lifetime of the tokens for event streams, see user.authentication
+STREAM_TOKEN_LIFETIME = timedelta(minutes=5)
+
+# Expose per-request db/view/render timings to clients
+METRICS_SERVER_TIMING = True
+
+# Client addresses allowed to scrape /metrics, comma-separated
+METRICS_ALLOWED_IPS = os.environ.get(
+    "METRICS_ALLOWED_IPS", "127.0.0.1,::1"
+).split(",")
+
+# Repeated query shapes per request, see airport_api_service.querylog
+N_PLUS_ONE_THRESHOLD = 10
+
+N_PLUS_ONE_STRICT = False
+
+SLOW_QUERY_THRESHOLD_MS = 200
+
+SLOW_QUERY_EXPLAIN = True
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "formatters": {
+        "message": {"format": "%(message)s"},
+    },
+    "handlers": {
+        "querylog": {
+            "class": "logging.StreamHandler",
+            "formatter": "message",
+        },
+    },
+    "loggers": {
+        "airport_api_service.querylog": {
+            "handlers": ["querylog"],
+            "level": "INFO",
+            "propagate": False,
+        },
+    },
+}
+
+# Every process (web workers, run_tasks, management commands) must share
+# the cache: the version bumps and invalidations of the order summary,
+# autocomplete, fares and catalog lists are written by one process and read
+# by the others. The default in-process cache only suits a single process,
+# e.g. runserver alone; docker-compose uses the database cache, created
+# with `python manage.py createcachetable`. Redis works too
+# (django.core.cache.backends.redis.RedisCache, with the redis package).
+CACHES = {
+    "default": {
+        "BACKEND": os.environ.get(
+            "CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": os.environ.get("CACHE_LOCATION", ""),
+    }
+}
+
+# Cached per-user order summary, see airport.order_summary
+ORDER_SUMMARY_CACHE_TTL = 10 * 60
+
+ORDER_SUMMARY_RECENT_ORDERS = 10
+
+# Orders of flights departed this long ago are archived, see airport.archive
+ARCHIVE_AFTER_DAYS = 90
+
+ARCHIVE_BATCH_SIZE = 500
+
+# Where relay_outbox publishes booking events, see airport.outbox
+OUTBOX_SINK = {
+    "BACKEND": "airport.outbox.StreamSink",
+    "OPTIONS": {},
+}
+
+# Response compression, see airport_api_service.compression
+COMPRESSION_MIN_SIZE = 1024
+COMPRESSION_LEVELS = {"br": 5, "gzip": 6}
+
+# Rendered catalog lists, see airport.catalog_cache
+CATALOG_CACHE_TTL = 5 * 60
+
+# Request coalescing of flight reads, see airport_api_service.singleflight
+# Seconds a result is reused after it completes (e.g. 0.5); 0 disables
+SINGLEFLIGHT_MICROCACHE_SECONDS = float(
+    os.environ.get("SINGLEFLIGHT_MICROCACHE_SECONDS", 0)
+)
+
+# Airport and crew autocomplete, see airport.autocomplete
+AUTOCOMPLETE_LIMIT = 10
+AUTOCOMPLETE_MAX_LIMIT = 50
+AUTOCOMPLETE_INDEX_TTL = 5 * 60
+AUTOCOMPLETE_MAX_INDEXED_ROWS = 100_000
+AUTOCOMPLETE_MIN_SIMILARITY = 0.3
+
+# Fare engine, see airport.pricing
+# (longest route in km, fare); None means no upper bound
+FARE_DISTANCE_BANDS = (
+    (500, "49.00"),
+    (1500, "89.00"),
+    (3000, "149.00"),
+    (6000, "249.00"),
+    (None, "399.00"),
+)
+# (lowest share of seats sold, multiplier)
+FARE_LOAD_FACTORS = (
+    (0, "1.00"),
+    (0.5, "1.15"),
+    (0.75, "1.35"),
+    (0.9, "1.60"),
+)
+# (fewest days before departure, multiplier)
+FARE_DEPARTURE_WINDOWS = (
+    (0, "1.50"),
+    (3, "1.30"),
+    (7, "1.15"),
+    (14, "1.00"),
+    (30, "0.90"),
+)
+FARE_TABLE_TTL = 60
+
+# Occupancy and revenue reports, see analytics.views
+ANALYTICS_TOP_ROUTES_LIMIT = 10
+ANALYTICS_MAX_LIMIT = 100
+
+# Liveness and readiness probes, see airport_api_service.health
+HEALTH_CHECK_CACHE_SECONDS = 5
+HEALTH_DB_LATENCY_MS = 500
+HEALTH_MAX_CONNECTION_USAGE = 0.9
+
+# Batch endpoint, see airport_api_service.batch
+BATCH_MAX_REQUESTS = 20
+BATCH_MAX_WORKERS = 4
+
+# Cross-process pub/sub for streamed events, see airport_api_service.pubsub
+PUBSUB = {
+    "BACKEND": "airport_api_service.pubsub.LocalBackend",
+    "OPTIONS": {},
+}
+
+# Seat availability stream, see airport.seat_stream
+SEAT_STREAM_HEARTBEAT_SECONDS = 15
+SEAT_STREAM_RETRY_MS = 3000
+SEAT_STREAM_QUEUE_SIZE = 100
+SEAT_STREAM_MAX_SECONDS = 5 * 60
+
+# Background task queues and their concurrency, see taskqueue.worker
+TASKQUEUE_QUEUES = {
+    "default": {"CONCURRENCY": 4},
+    "bookings": {"CONCURRENCY": 1},
+    "media": {"CONCURRENCY": 2},
+}
+
+TASKQUEUE_LEASE_SECONDS = 5 * 60
+
+# Retry delay: base seconds doubled per attempt, capped
+TASKQUEUE_RETRY_BACKOFF = (5, 60 * 60)
+
+# Process-local cache of authenticated users, see user.authentication
+JWT_USER_CACHE = {
+    "MAX_SIZE": 10_000,
+    "TTL": 30,
+}
@@ -0,0 +1,49 @@
+"""
+API-only settings for the workers serving /api/v1/ traffic.
+
+Start them with DJANGO_SETTINGS_MODULE=airport_api_service.settings_api.
+Everything the API never uses is left out so workers start faster: the
+admin, sessions, messages, static files, templates, the debug toolbar and
+drf-spectacular's schema and documentation views. Requests authenticate
+with JWT only and responses are JSON only. Serve the admin and the API
+documentation from workers on the full settings.
+
+Compare the profiles with ``python -m benchmarks.startup``.
+"""
+from airport_api_service.settings import *  # noqa: F401,F403
+from airport_api_service.settings import REST_FRAMEWORK
+
+INSTALLED_APPS = [
+    "django.contrib.auth",
+    "django.contrib.contenttypes",
+    "user",
+    "airport",
+    "taskqueue",
+    "analytics",
+]
+
+MIDDLEWARE = [
+    "airport_api_service.metrics.PerformanceMiddleware",
+    "airport_api_service.querylog.QueryInspectionMiddleware",
+    "django.middleware.security.SecurityMiddleware",
+    "airport_api_service.compression.CompressionMiddleware",
+    "django.middleware.common.CommonMiddleware",
+    "django.middleware.clickjacking.XFrameOptionsMiddleware",
+]
+
+ROOT_URLCONF = "airport_api_service.urls_api"
+
+TEMPLATES = []
+
+REST_FRAMEWORK = {
+    **REST_FRAMEWORK,
+    "DEFAULT_RENDERER_CLASSES": ("rest_framework.renderers.JSONRenderer",),
+    "DEFAULT_PARSER_CLASSES": (
+        "rest_framework.parsers.JSONParser",
+        "rest_framework.parsers.MultiPartParser",
+    ),
+    # @extend_schema subclasses the default schema class as views are
+    # decorated; DRF's base inspector spares importing drf-spectacular's
+    # schema generator, which only the documentation views need
+    "DEFAULT_SCHEMA_CLASS": "rest_framework.schemas.inspectors.ViewInspector",
+}
@@ -0,0 +1,44 @@
+"""
+Settings for the test suite, used by `python manage.py test`.
+
+They trade production-grade costs for speed: password hashing does a
+single PBKDF2 iteration and uploads go to a temporary directory. With
+TEST_DATABASE=sqlite the suite runs against in-memory SQLite and needs no
+PostgreSQL server or POSTGRES_* variables; PostgreSQL-specific tests skip
+themselves. Both databases support `manage.py test --parallel`.
+"""
+import os
+import tempfile
+from pathlib import Path
+
+from airport_api_service.settings import *  # noqa: F401,F403
+from airport_api_service.settings import BASE_DIR, SECRET_KEY
+
+SECRET_KEY = SECRET_KEY or "test-secret-key"
+
+if os.environ.get("TEST_DATABASE") == "sqlite":
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": BASE_DIR / "test.sqlite3",
+            "TEST": {"NAME": ":memory:"},
+        }
+    }
+
+# Query-count assertions must not see cache reads, whatever CACHE_BACKEND
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    }
+}
+
+# Still ConfigurablePBKDF2PasswordHasher, so hash upgrades stay covered
+PASSWORD_HASH_ITERATIONS = 1
+
+MEDIA_ROOT = Path(tempfile.gettempdir()) / "airport-test-media"
+
+OPENAPI_SCHEMA_DIR = Path(tempfile.gettempdir()) / "airport-test-openapi"
+
+# Test cases roll back their rows but not the cache, so a list cached by
+# one test would answer another; the catalog cache tests turn it on
+CATALOG_CACHE_TTL = 0
@@ -0,0 +1,122 @@
+"""
+Request coalescing ("singleflight") for identical concurrent reads.
+
+When a sale opens, many clients ask for the very same flight page within
+the same second, and each request would run the same queries. A view
+using CoalescedReadMixin runs its list and retrieve actions once per
+distinct request (view, action, host and path with its query string) at a
+time within the process. Requests arriving while that computation is in
+flight wait for it and share its response data. Authentication,
+permissions and throttling still run for every request, and every
+request still renders its own response.
+
+With SINGLEFLIGHT_MICROCACHE_SECONDS above zero, a result is also kept
+for that long after it completes, so a burst spread over a few hundred
+milliseconds is served by one computation too. The data can then be that
+much older than the database. Errors are shared with the requests that
+waited for them but never kept.
+
+Shared requests are counted in the airport_coalesced_requests_total
+metric, by view and by `via` ("inflight" or "microcache").
+"""
+import threading
+import time
+
+from django.conf import settings
+from rest_framework.response import Response
+
+from airport_api_service.metrics import registry
+
+INFLIGHT = "inflight"
+MICROCACHE = "microcache"
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class Group:
+    """Runs one call per key at a time and shares its result, see module"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._recent = {}
+
+    def do(self, key, fn, ttl: float = 0.0):
+        """
+        Return (result of fn(), how it was shared) for key.
+
+        The second item is None for the caller that ran fn, INFLIGHT for
+        callers that waited for it and MICROCACHE for callers served from
+        a result completed less than ttl seconds ago.
+        """
+        with self._lock:
+            recent = self._recent.get(key)
+            if recent is not None and recent[0] > time.monotonic():
+                return recent[1], MICROCACHE
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, INFLIGHT
+
+        try:
+            call.result = fn()
+        except BaseException as error:
+            call.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+                now = time.monotonic()
+                self._recent = {
+                    k: entry
+                    for k, entry in self._recent.items()
+                    if entry[0] > now
+                }
+                if ttl > 0 and call.error is None:
+                    self._recent[key] = (now + ttl, call.result)
+            call.done.set()
+        return call.result, None
+
+    def clear(self) -> None:
+        """Forget the kept results"""
+        with self._lock:
+            self._recent.clear()
+
+
+group = Group()
+
+
+class CoalescedReadMixin:
+    """Coalesces identical list and retrieve requests, see module"""
+
+    def list(self, request, *args, **kwargs):
+        return self._coalesce(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._coalesce(super().retrieve, request, *args, **kwargs)
+
+    def _coalesce(self, handler, request, *args, **kwargs):
+        view = f"{type(self).__name__}.{self.action}"
+        key = (view, request.get_host(), request.get_full_path())
+        response, shared = group.do(
+            key,
+            lambda: handler(request, *args, **kwargs),
+            ttl=settings.SINGLEFLIGHT_MICROCACHE_SECONDS,
+        )
+        if shared is not None:
+            registry.increment(
+                "coalesced_requests", (("view", view), ("via", shared))
+            )
+        # Each request renders its own Response from the shared data
+        return Response(response.data, status=response.status_code)
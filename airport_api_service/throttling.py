@@ -0,0 +1,41 @@
+"""
+Rate throttles that understand batch requests.
+
+A batch (see airport_api_service.batch) is charged once per sub-request
+when it arrives, against the same quota as individual requests. Its
+sub-requests are then dispatched without being throttled again.
+"""
+from rest_framework import throttling
+
+
+class BatchAwareThrottleMixin:
+    def allow_request(self, request, view):
+        if getattr(request, "in_batch", False):
+            return True
+
+        cost = getattr(view, "throttle_cost", 1)
+        if cost == 1 or self.rate is None:
+            return super().allow_request(request, view)
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        self.history = self.cache.get(self.key, [])
+        self.now = self.timer()
+        while self.history and self.history[-1] <= self.now - self.duration:
+            self.history.pop()
+        if len(self.history) + cost > self.num_requests:
+            return self.throttle_failure()
+
+        self.history[:0] = [self.now] * cost
+        self.cache.set(self.key, self.history, self.duration)
+        return True
+
+
+class AnonRateThrottle(BatchAwareThrottleMixin, throttling.AnonRateThrottle):
+    pass
+
+
+class UserRateThrottle(BatchAwareThrottleMixin, throttling.UserRateThrottle):
+    pass
@@ -1,19 +1,28 @@
-from django.conf.urls.static import static
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, re_path, include
 from django.conf import settings
-from drf_spectacular.views import (
-    SpectacularAPIView,
-    SpectacularRedocView,
-    SpectacularSwaggerView,
-)
+from drf_spectacular.views import SpectacularRedocView, SpectacularSwaggerView
+
+from airport_api_service.batch import BatchView
+from airport_api_service.health import healthz, readyz
+from airport_api_service.media import serve_media
+from airport_api_service.metrics import metrics_view
+from airport_api_service.schema import SchemaView
 
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/v1/airport/", include("airport.urls", namespace="airport")),
     path("__debug__/", include("debug_toolbar.urls")),
     path("api/v1/user/", include("user.urls", namespace="user")),
-    path("api/v1/schema/", SpectacularAPIView.as_view(), name="schema"),
+    path(
+        "api/v1/analytics/",
+        include("analytics.urls", namespace="analytics"),
+    ),
+    path("api/v1/batch/", BatchView.as_view(), name="batch"),
+    path("metrics", metrics_view, name="metrics"),
+    path("healthz", healthz, name="healthz"),
+    path("readyz", readyz, name="readyz"),
+    path("api/v1/schema/", SchemaView.as_view(), name="schema"),
     path(
         "api/v1/doc/schema/swagger/",
         SpectacularSwaggerView.as_view(url_name="schema"),
@@ -24,4 +33,9 @@ urlpatterns = [
         SpectacularRedocView.as_view(url_name="schema"),
         name="redoc",
     ),
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+    re_path(
+        rf"^{settings.MEDIA_URL.lstrip('/')}(?P<path>.+)$",
+        serve_media,
+        name="media",
+    ),
+]
@@ -0,0 +1,30 @@
+"""
+URLs of the API-only profile, see airport_api_service.settings_api: the
+routes of airport_api_service.urls without the admin, the debug toolbar
+and the schema and documentation views.
+"""
+from django.conf import settings
+from django.urls import include, path, re_path
+
+from airport_api_service.batch import BatchView
+from airport_api_service.health import healthz, readyz
+from airport_api_service.media import serve_media
+from airport_api_service.metrics import metrics_view
+
+urlpatterns = [
+    path("api/v1/airport/", include("airport.urls", namespace="airport")),
+    path("api/v1/user/", include("user.urls", namespace="user")),
+    path(
+        "api/v1/analytics/",
+        include("analytics.urls", namespace="analytics"),
+    ),
+    path("api/v1/batch/", BatchView.as_view(), name="batch"),
+    path("metrics", metrics_view, name="metrics"),
+    path("healthz", healthz, name="healthz"),
+    path("readyz", readyz, name="readyz"),
+    re_path(
+        rf"^{settings.MEDIA_URL.lstrip('/')}(?P<path>.+)$",
+        serve_media,
+        name="media",
+    ),
+]
@@ -0,0 +1,33 @@
+from django.contrib import admin
+
+from .models import DailyStats, FlightStats
+
+
+@admin.register(DailyStats)
+class DailyStatsAdmin(admin.ModelAdmin):
+    list_display = (
+        "day",
+        "route",
+        "airplane_type",
+        "flights",
+        "capacity",
+        "tickets",
+        "revenue",
+    )
+    list_filter = ("airplane_type",)
+    list_select_related = (
+        "route__source",
+        "route__destination",
+        "airplane_type",
+    )
+    date_hierarchy = "day"
+
+
+@admin.register(FlightStats)
+class FlightStatsAdmin(admin.ModelAdmin):
+    list_display = ("flight", "capacity", "tickets", "revenue")
+    list_select_related = (
+        "flight__airplane",
+        "flight__route__source",
+        "flight__route__destination",
+    )
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from analytics.rollups import rebuild
+
+
+class Command(BaseCommand):
+    help = "Recompute the occupancy and revenue rollups from the tickets"
+
+    def handle(self, *args, **options):
+        flights = rebuild()
+        self.stdout.write(
+            self.style.SUCCESS(f"Rebuilt analytics for {flights} flights")
+        )
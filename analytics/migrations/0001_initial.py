@@ -0,0 +1,101 @@
+# Generated by Django 4.2.11 on 2026-10-19 10:31
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ("airport", "0009_ticket_price"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DailyStats",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField()),
+                ("flights", models.IntegerField(default=0)),
+                ("capacity", models.IntegerField(default=0)),
+                ("tickets", models.IntegerField(default=0)),
+                (
+                    "revenue",
+                    models.DecimalField(
+                        decimal_places=2, default=0, max_digits=14
+                    ),
+                ),
+                (
+                    "airplane_type",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="daily_stats",
+                        to="airport.airplanetype",
+                    ),
+                ),
+                (
+                    "route",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="daily_stats",
+                        to="airport.route",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name_plural": "daily stats",
+                "ordering": ("day", "route"),
+            },
+        ),
+        migrations.CreateModel(
+            name="FlightStats",
+            fields=[
+                (
+                    "flight",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="stats",
+                        serialize=False,
+                        to="airport.flight",
+                    ),
+                ),
+                ("capacity", models.IntegerField()),
+                ("tickets", models.IntegerField(default=0)),
+                (
+                    "revenue",
+                    models.DecimalField(
+                        decimal_places=2, default=0, max_digits=12
+                    ),
+                ),
+                (
+                    "daily",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="flight_stats",
+                        to="analytics.dailystats",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name_plural": "flight stats",
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="dailystats",
+            constraint=models.UniqueConstraint(
+                fields=("day", "route", "airplane_type"),
+                name="analytics_dailystats_unique_key",
+            ),
+        ),
+    ]
@@ -0,0 +1,55 @@
+from django.db import models
+
+from airport.models import AirplaneType, Flight, Route
+
+
+class DailyStats(models.Model):
+    """Flights, seats and sales of one route and airplane type on a day"""
+
+    day = models.DateField()
+    route = models.ForeignKey(
+        Route, on_delete=models.CASCADE, related_name="daily_stats"
+    )
+    airplane_type = models.ForeignKey(
+        AirplaneType, on_delete=models.CASCADE, related_name="daily_stats"
+    )
+    flights = models.IntegerField(default=0)
+    capacity = models.IntegerField(default=0)
+    tickets = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        verbose_name_plural = "daily stats"
+        ordering = ("day", "route")
+        constraints = [
+            models.UniqueConstraint(
+                fields=["day", "route", "airplane_type"],
+                name="analytics_dailystats_unique_key",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.day} {self.route} ({self.airplane_type})"
+
+
+class FlightStats(models.Model):
+    """Seats and sales of one flight, and the daily row it counts towards"""
+
+    flight = models.OneToOneField(
+        Flight,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="stats",
+    )
+    daily = models.ForeignKey(
+        DailyStats, on_delete=models.CASCADE, related_name="flight_stats"
+    )
+    capacity = models.IntegerField()
+    tickets = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
+    class Meta:
+        verbose_name_plural = "flight stats"
+
+    def __str__(self):
+        return str(self.flight)
@@ -0,0 +1,202 @@
+"""
+Occupancy and revenue rollups, kept up to date as tickets sell.
+
+FlightStats holds the capacity, tickets sold and revenue of every flight;
+DailyStats sums them per departure day, route and airplane type. The
+signals in analytics.signals apply every booked order, and every ticket
+or order deleted, as one increment of both rows per flight inside the
+transaction making the change, so the rollups always agree with the
+tickets they count, and reports aggregate a few rows per day instead of
+every ticket.
+
+Editing a flight moves its figures to the daily row it now belongs to.
+What the signals can't see (bulk updates, raw SQL, resizing an airplane,
+editing a ticket in the admin) is fixed by
+`python manage.py rebuild_analytics`, which also backfills the rollups of
+an existing database. Tickets moved to the archive (see airport.archive)
+stay counted.
+"""
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import (
+    Count,
+    DecimalField,
+    F,
+    OuterRef,
+    Subquery,
+    Sum,
+    Value,
+)
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from airport.models import ArchivedTicket, Flight, Ticket
+from analytics.models import DailyStats, FlightStats
+
+
+def departure_day(flight):
+    departure = Flight._meta.get_field("departure_time").to_python(
+        flight.departure_time
+    )
+    if timezone.is_naive(departure):
+        departure = timezone.make_aware(departure)
+    return timezone.localdate(departure)
+
+
+def daily_key(flight) -> dict:
+    return {
+        "day": departure_day(flight),
+        "route_id": flight.route_id,
+        "airplane_type_id": flight.airplane.airplane_type_id,
+    }
+
+
+def _sold(aggregate, default):
+    """Aggregate of a flight's tickets, archived ones included"""
+    live, archived = (
+        Coalesce(
+            Subquery(
+                model.objects.filter(flight=OuterRef("pk"))
+                .order_by()
+                .values("flight")
+                .annotate(total=aggregate)
+                .values("total")
+            ),
+            default,
+        )
+        for model in (Ticket, ArchivedTicket)
+    )
+    return live + archived
+
+
+def flights_with_sales():
+    return Flight.objects.annotate(
+        sold=_sold(Count("id"), Value(0)),
+        sales=_sold(
+            Sum("price"),
+            Value(
+                Decimal(0),
+                output_field=DecimalField(max_digits=12, decimal_places=2),
+            ),
+        ),
+    )
+
+
+def _move(daily_id, flights, capacity, tickets, revenue) -> None:
+    DailyStats.objects.filter(pk=daily_id).update(
+        flights=F("flights") + flights,
+        capacity=F("capacity") + capacity,
+        tickets=F("tickets") + tickets,
+        revenue=F("revenue") + revenue,
+    )
+
+
+def add_flight(flight, tickets=0, revenue=Decimal(0)) -> None:
+    capacity = flight.airplane.capacity
+    with transaction.atomic():
+        daily, _ = DailyStats.objects.get_or_create(**daily_key(flight))
+        _move(daily.pk, 1, capacity, tickets, revenue)
+        FlightStats.objects.create(
+            flight_id=flight.id,
+            daily=daily,
+            capacity=capacity,
+            tickets=tickets,
+            revenue=revenue,
+        )
+
+
+def remove_flight(flight_id) -> None:
+    with transaction.atomic():
+        stats = (
+            FlightStats.objects.select_for_update()
+            .filter(flight_id=flight_id)
+            .first()
+        )
+        if stats is None:
+            return
+        _move(
+            stats.daily_id,
+            -1,
+            -stats.capacity,
+            -stats.tickets,
+            -stats.revenue,
+        )
+        stats.delete()
+        DailyStats.objects.filter(pk=stats.daily_id, flights=0).delete()
+
+
+def refile_flight(flight) -> None:
+    """Count a changed flight towards the daily row it belongs to now"""
+    stats = (
+        FlightStats.objects.select_related("daily")
+        .filter(flight_id=flight.id)
+        .first()
+    )
+    if stats is not None:
+        key = daily_key(flight)
+        if stats.capacity == flight.airplane.capacity and all(
+            getattr(stats.daily, field) == value
+            for field, value in key.items()
+        ):
+            return
+
+    with transaction.atomic():
+        remove_flight(flight.id)
+        sold = flights_with_sales().get(pk=flight.id)
+        add_flight(flight, sold.sold, sold.sales)
+
+
+def count_tickets(tickets, sign: int = 1) -> None:
+    """
+    Add sold tickets to the rollups, or take deleted ones off, with one
+    increment of each row per flight
+    """
+    totals = {}
+    for ticket in tickets:
+        count, revenue = totals.get(ticket.flight_id, (0, Decimal(0)))
+        totals[ticket.flight_id] = (count + 1, revenue + (ticket.price or 0))
+
+    for flight_id, (count, revenue) in totals.items():
+        stats = FlightStats.objects.filter(flight_id=flight_id)
+        changes = {
+            "tickets": F("tickets") + count * sign,
+            "revenue": F("revenue") + revenue * sign,
+        }
+        stats.update(**changes)
+        DailyStats.objects.filter(
+            pk=Subquery(stats.values("daily_id"))
+        ).update(**changes)
+
+
+def rebuild() -> int:
+    """Recompute every rollup from the tickets; returns the flights counted"""
+    flights = flights_with_sales().select_related("airplane")
+    with transaction.atomic():
+        FlightStats.objects.all().delete()
+        DailyStats.objects.all().delete()
+
+        daily = {}
+        rows = []
+        for flight in flights.iterator(chunk_size=2000):
+            key = daily_key(flight)
+            totals = daily.setdefault(tuple(key.values()), DailyStats(**key))
+            stats = FlightStats(
+                flight_id=flight.id,
+                capacity=flight.airplane.capacity,
+                tickets=flight.sold,
+                revenue=flight.sales,
+            )
+            totals.flights += 1
+            totals.capacity += stats.capacity
+            totals.tickets += stats.tickets
+            totals.revenue += stats.revenue
+            rows.append((totals, stats))
+
+        DailyStats.objects.bulk_create(daily.values(), batch_size=1000)
+        for totals, stats in rows:
+            stats.daily = totals
+        FlightStats.objects.bulk_create(
+            [stats for _, stats in rows], batch_size=1000
+        )
+    return len(rows)
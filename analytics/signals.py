@@ -0,0 +1,46 @@
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from airport.events import deleted_through, tickets_booked
+from airport.models import Flight, Order, Ticket
+from analytics import rollups
+
+
+@receiver(post_save, sender=Flight)
+def flight_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        rollups.add_flight(instance)
+    else:
+        rollups.refile_flight(instance)
+
+
+@receiver(pre_delete, sender=Flight)
+def flight_deleted(sender, instance, **kwargs):
+    # Before the cascade, so deleting its tickets doesn't count twice
+    rollups.remove_flight(instance.id)
+
+
+@receiver(pre_delete, sender=Order)
+def order_deleted(sender, instance, **kwargs):
+    # Take the order's tickets off at once, before the cascade
+    rollups.count_tickets(instance.tickets.only("flight_id", "price"), -1)
+
+
+@receiver(tickets_booked)
+def order_booked(sender, order, tickets, **kwargs):
+    rollups.count_tickets(tickets)
+
+
+@receiver(post_save, sender=Ticket)
+def ticket_saved(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        rollups.count_tickets([instance])
+
+
+@receiver(post_delete, sender=Ticket)
+def ticket_deleted(sender, instance, origin=None, **kwargs):
+    # Tickets deleted with their order or flight are already accounted for
+    if deleted_through(origin) is Ticket:
+        rollups.count_tickets([instance], -1)
@@ -0,0 +1,248 @@
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.models import Flight, Order, Ticket
+from airport.tests import strict_queries
+from airport.tests.factories import (
+    sample_airplane,
+    sample_airplane_type,
+    sample_route,
+)
+from analytics.models import DailyStats, FlightStats
+from analytics.views import TopRouteSerializer
+
+ORDER_URL = reverse("airport:order-list")
+OCCUPANCY_URL = reverse("analytics:occupancy")
+TOP_ROUTES_URL = reverse("analytics:top-routes")
+
+
+class AnalyticsTestMixin:
+
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            email="admin@gmail.com", password="admin12345", is_staff=True
+        )
+        self.order = Order.objects.create(user=self.user)
+        self.small = sample_airplane(rows=1, seats_in_row=4)
+        self.large = sample_airplane(
+            name="Airplane 2",
+            rows=2,
+            seats_in_row=4,
+            airplane_type=sample_airplane_type(name="Type B"),
+        )
+        self.kyiv = sample_route("Kyiv")
+        self.lviv = sample_route("Lviv")
+
+    def create_flight(self, route, airplane, day="2024-06-01"):
+        return Flight.objects.create(
+            route=route,
+            airplane=airplane,
+            departure_time=f"{day}T12:00:00Z",
+            arrival_time=f"{day}T14:00:00Z",
+        )
+
+    def sell(self, flight, *seats, price="100.00"):
+        for seat in seats:
+            Ticket.objects.create(
+                flight=flight,
+                row=1,
+                seat=seat,
+                order=self.order,
+                price=Decimal(price),
+            )
+
+    def daily(self):
+        return {
+            (str(row.day), row.route_id, row.airplane_type_id): (
+                row.flights,
+                row.capacity,
+                row.tickets,
+                row.revenue,
+            )
+            for row in DailyStats.objects.all()
+        }
+
+
+class RollupTests(AnalyticsTestMixin, TestCase):
+
+    def test_tickets_are_counted_incrementally(self):
+        flight = self.create_flight(self.kyiv, self.small)
+        self.create_flight(self.kyiv, self.small)
+        key = ("2024-06-01", self.kyiv.id, self.small.airplane_type_id)
+
+        self.sell(flight, 1, 2, 3)
+        Ticket.objects.filter(seat=3).delete()
+
+        self.assertEqual(self.daily(), {key: (2, 8, 2, Decimal("200"))})
+        stats = FlightStats.objects.get(flight=flight)
+        self.assertEqual((stats.tickets, stats.revenue), (2, Decimal("200")))
+
+    def test_orders_are_counted_once_per_flight(self):
+        first = self.create_flight(self.kyiv, self.small, "2099-06-01")
+        second = self.create_flight(self.lviv, self.small, "2099-06-01")
+        client = APIClient()
+        client.force_authenticate(self.user)
+
+        with CaptureQueriesContext(connection) as booking:
+            res = client.post(
+                ORDER_URL,
+                {
+                    "tickets": [
+                        {"flight": flight.id, "row": 1, "seat": seat}
+                        for flight in (first, second)
+                        for seat in (1, 2)
+                    ]
+                },
+                format="json",
+            )
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        stats = FlightStats.objects.get(flight=first)
+        prices = Ticket.objects.filter(flight=first).values_list(
+            "price", flat=True
+        )
+        self.assertEqual((stats.tickets, stats.revenue), (2, sum(prices)))
+
+        with CaptureQueriesContext(connection) as deleting:
+            Order.objects.get(pk=res.data["id"]).delete()
+        self.assertEqual(FlightStats.objects.get(flight=first).tickets, 0)
+        self.assertEqual(
+            {row[2:] for row in self.daily().values()}, {(0, Decimal(0))}
+        )
+
+        for queries in (booking, deleting):
+            rollup_updates = [
+                query["sql"]
+                for query in queries
+                if query["sql"].startswith('UPDATE "analytics_')
+            ]
+            # FlightStats and DailyStats of each flight
+            self.assertEqual(len(rollup_updates), 4)
+
+    def test_changed_flights_move_between_days(self):
+        flight = self.create_flight(self.kyiv, self.small)
+        self.sell(flight, 1)
+
+        flight.departure_time = "2024-06-02T12:00:00Z"
+        flight.airplane = self.large
+        flight.save()
+
+        self.assertEqual(
+            self.daily(),
+            {
+                ("2024-06-02", self.kyiv.id, self.large.airplane_type_id): (
+                    1,
+                    8,
+                    1,
+                    Decimal("100"),
+                )
+            },
+        )
+
+        flight.delete()
+        self.assertEqual(self.daily(), {})
+        self.assertFalse(FlightStats.objects.exists())
+
+    def test_rebuild_matches_incremental_rollups(self):
+        first = self.create_flight(self.kyiv, self.small)
+        second = self.create_flight(self.lviv, self.large, "2024-06-02")
+        self.sell(first, 1, 2)
+        self.sell(second, 1, price="50.00")
+        expected = self.daily()
+        DailyStats.objects.all().delete()
+
+        call_command("rebuild_analytics", stdout=StringIO())
+
+        self.assertEqual(self.daily(), expected)
+        self.assertEqual(FlightStats.objects.count(), 2)
+
+
+@strict_queries
+class AnalyticsApiTests(AnalyticsTestMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        kyiv = self.create_flight(self.kyiv, self.small)
+        self.sell(kyiv, 1, 2, 3)
+        self.sell(self.create_flight(self.kyiv, self.large, "2024-06-02"), 1)
+        self.sell(self.create_flight(self.lviv, self.large), 1, 2)
+
+    def test_admin_only(self):
+        user = get_user_model().objects.create_user(
+            email="user@gmail.com", password="user12345"
+        )
+        self.client.force_authenticate(user)
+
+        res = self.client.get(OCCUPANCY_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_occupancy_by_route(self):
+        with self.assertNumQueries(1):
+            res = self.client.get(OCCUPANCY_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            res.data[0],
+            {
+                "route": self.kyiv.id,
+                "source": "Kyiv A",
+                "destination": "Kyiv B",
+                "flights": 2,
+                "capacity": 12,
+                "tickets": 4,
+                "revenue": "400.00",
+                "load_factor": 0.3333,
+            },
+        )
+
+    def test_occupancy_by_day_and_airplane_type(self):
+        res = self.client.get(
+            OCCUPANCY_URL, {"group_by": "day", "date_to": "2024-06-01"}
+        )
+        self.assertEqual(
+            [(row["day"], row["tickets"]) for row in res.data],
+            [(date(2024, 6, 1), 5)],
+        )
+
+        res = self.client.get(OCCUPANCY_URL, {"group_by": "airplane_type"})
+        self.assertEqual(
+            [(row["airplane_type_name"], row["capacity"]) for row in res.data],
+            [("Type A", 4), ("Type B", 16)],
+        )
+
+    def test_top_routes(self):
+        res = self.client.get(TOP_ROUTES_URL, {"order_by": "load_factor"})
+        self.assertEqual(
+            [row["route"] for row in res.data], [self.kyiv.id, self.lviv.id]
+        )
+        # The documented response shape, see TopRouteSerializer
+        self.assertEqual(set(res.data[0]), set(TopRouteSerializer().fields))
+
+        res = self.client.get(
+            TOP_ROUTES_URL, {"date_from": "2024-06-02", "limit": 1}
+        )
+        self.assertEqual(
+            [(row["route"], row["tickets"]) for row in res.data],
+            [(self.kyiv.id, 1)],
+        )
+
+    def test_invalid_parameters(self):
+        res = self.client.get(OCCUPANCY_URL, {"group_by": "crew"})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+        res = self.client.get(TOP_ROUTES_URL, {"limit": 0})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,10 @@
+from django.urls import path
+
+from .views import OccupancyView, TopRoutesView
+
+urlpatterns = [
+    path("occupancy/", OccupancyView.as_view(), name="occupancy"),
+    path("top-routes/", TopRoutesView.as_view(), name="top-routes"),
+]
+
+app_name = "analytics"
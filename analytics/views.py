@@ -0,0 +1,148 @@
+from django.conf import settings
+from django.db.models import F, FloatField, Sum
+from django.db.models.functions import Cast, NullIf
+from drf_spectacular.utils import extend_schema
+from rest_framework import serializers
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from analytics.models import DailyStats
+
+# (key fields, labels) each occupancy grouping reports, by ?group_by=
+GROUPS = {
+    "route": (
+        ("route",),
+        {
+            "source": F("route__source__name"),
+            "destination": F("route__destination__name"),
+        },
+    ),
+    "airplane_type": (
+        ("airplane_type",),
+        {"airplane_type_name": F("airplane_type__name")},
+    ),
+    "day": (("day",), {}),
+}
+
+TOTALS = ("flights", "capacity", "tickets", "revenue", "load_factor")
+
+
+class ReportQuerySerializer(serializers.Serializer):
+    date_from = serializers.DateField(required=False)
+    date_to = serializers.DateField(required=False)
+
+
+class OccupancyQuerySerializer(ReportQuerySerializer):
+    group_by = serializers.ChoiceField(choices=tuple(GROUPS), default="route")
+
+
+class TopRoutesQuerySerializer(ReportQuerySerializer):
+    order_by = serializers.ChoiceField(
+        choices=("tickets", "revenue", "load_factor"), default="tickets"
+    )
+    limit = serializers.IntegerField(
+        min_value=1,
+        max_value=settings.ANALYTICS_MAX_LIMIT,
+        default=settings.ANALYTICS_TOP_ROUTES_LIMIT,
+    )
+
+
+class ReportRowSerializer(serializers.Serializer):
+    """Totals of one report row, documents the shape of report_row()"""
+
+    flights = serializers.IntegerField()
+    capacity = serializers.IntegerField()
+    tickets = serializers.IntegerField()
+    revenue = serializers.DecimalField(max_digits=14, decimal_places=2)
+    load_factor = serializers.FloatField()
+
+
+class OccupancyRowSerializer(ReportRowSerializer):
+    """The key and labels present depend on ?group_by"""
+
+    route = serializers.IntegerField(required=False)
+    source = serializers.CharField(required=False)
+    destination = serializers.CharField(required=False)
+    airplane_type = serializers.IntegerField(required=False)
+    airplane_type_name = serializers.CharField(required=False)
+    day = serializers.DateField(required=False)
+
+
+class TopRouteSerializer(ReportRowSerializer):
+    route = serializers.IntegerField()
+    source = serializers.CharField()
+    destination = serializers.CharField()
+
+
+def report(group: tuple, date_from=None, date_to=None):
+    """Sum the daily rollups of the period per key of group"""
+    fields, labels = group
+    queryset = DailyStats.objects.all()
+    if date_from:
+        queryset = queryset.filter(day__gte=date_from)
+    if date_to:
+        queryset = queryset.filter(day__lte=date_to)
+    # Annotations can't shadow the field names, hence the total_ prefix
+    return (
+        queryset.values(*fields, **labels)
+        .annotate(
+            total_flights=Sum("flights"),
+            total_capacity=Sum("capacity"),
+            total_tickets=Sum("tickets"),
+            total_revenue=Sum("revenue"),
+            total_load_factor=Cast(Sum("tickets"), FloatField())
+            / NullIf(Cast(Sum("capacity"), FloatField()), 0.0),
+        )
+        .order_by(*fields)
+    )
+
+
+def report_row(row: dict) -> dict:
+    for name in TOTALS:
+        row[name] = row.pop(f"total_{name}")
+    row["revenue"] = f"{row['revenue']:.2f}"
+    row["load_factor"] = round(row["load_factor"] or 0.0, 4)
+    return row
+
+
+class OccupancyView(APIView):
+    """Flights, seats, tickets sold, load factor and revenue per group"""
+
+    permission_classes = (IsAdminUser,)
+
+    @extend_schema(
+        parameters=[OccupancyQuerySerializer],
+        responses=OccupancyRowSerializer(many=True),
+    )
+    def get(self, request):
+        query = OccupancyQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        params = query.validated_data
+        rows = report(
+            GROUPS[params["group_by"]],
+            params.get("date_from"),
+            params.get("date_to"),
+        )
+        return Response([report_row(row) for row in rows])
+
+
+class TopRoutesView(APIView):
+    """Routes with the most tickets, revenue or highest load factor"""
+
+    permission_classes = (IsAdminUser,)
+
+    @extend_schema(
+        parameters=[TopRoutesQuerySerializer],
+        responses=TopRouteSerializer(many=True),
+    )
+    def get(self, request):
+        query = TopRoutesQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        params = query.validated_data
+        rows = report(
+            GROUPS["route"], params.get("date_from"), params.get("date_to")
+        ).order_by(
+            F(f"total_{params['order_by']}").desc(nulls_last=True), "route"
+        )
+        return Response([report_row(row) for row in rows[: params["limit"]]])
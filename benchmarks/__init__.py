@@ -0,0 +1,63 @@
+"""
+Benchmarks for the airport API service.
+
+Run them from the project root as modules, e.g.::
+
+    python -m benchmarks.jwt_auth
+
+Benchmarks that touch the database create a throwaway test database, so
+they need the same ``POSTGRES_*`` settings as the test suite.
+"""
+import contextlib
+import os
+import statistics
+
+import django
+
+
+def setup():
+    os.environ.setdefault(
+        "DJANGO_SETTINGS_MODULE", "airport_api_service.settings"
+    )
+    django.setup()
+
+
+@contextlib.contextmanager
+def test_database(verbosity=0):
+    from django.db import connection
+    from django.test.utils import (
+        setup_test_environment,
+        teardown_test_environment,
+    )
+
+    # Like the test runner, so DEBUG-only middleware stays out of the way
+    setup_test_environment(debug=False)
+    old_name = connection.settings_dict["NAME"]
+    connection.creation.create_test_db(verbosity=verbosity, autoclobber=True)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=verbosity)
+        teardown_test_environment()
+
+
+@contextlib.contextmanager
+def throttling_disabled():
+    """Benchmarks issue far more requests than the API rate limits allow"""
+    from unittest import mock
+
+    from rest_framework.views import APIView
+
+    with mock.patch.object(APIView, "check_throttles", lambda self, r: None):
+        yield
+
+
+def percentiles(samples):
+    """Return p50/p95/p99 of a list of durations, in milliseconds"""
+    ordered = sorted(samples)
+    cuts = statistics.quantiles(ordered, n=100) if len(ordered) > 1 else []
+
+    def pick(p):
+        return round((cuts[p - 1] if cuts else ordered[0]) * 1000, 3)
+
+    return {"p50": pick(50), "p95": pick(95), "p99": pick(99)}
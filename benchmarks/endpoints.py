@@ -0,0 +1,215 @@
+"""
+Latency and query counts of every endpoint of the airport router.
+
+Seeds a throwaway database with seed_perf_data, then requests the list,
+detail and GET extra actions of each viewset registered in airport.urls,
+as a staff user with orders, and reports p50/p95/p99 latency and the
+number of queries of each endpoint. --output saves the results as JSON;
+--baseline compares them with saved results and exits with status 1 when
+an endpoint runs more queries, or its p95 grew by more than --tolerance
+and --min-delta::
+
+    python -m benchmarks.endpoints \
+        --baseline benchmarks/baselines/endpoints.json
+
+Latencies depend on the machine, so refresh the baseline (--output) on
+the machine that compares against it; query counts don't.
+"""
+import argparse
+import json
+import sys
+import time
+
+from benchmarks import percentiles, setup, test_database, throttling_disabled
+
+# seed_perf_data options per --scale
+SCALES = {
+    "small": {
+        "airports": 20,
+        "routes": 100,
+        "airplane_types": 5,
+        "airplanes": 20,
+        "crew": 50,
+        "flights": 500,
+        "users": 50,
+        "orders": 1000,
+    },
+    "medium": {},
+    "large": {
+        "airports": 500,
+        "routes": 5000,
+        "airplanes": 500,
+        "crew": 2000,
+        "flights": 100_000,
+        "users": 10_000,
+        "orders": 200_000,
+    },
+}
+
+# Query strings of endpoints that need one
+QUERY_STRINGS = {
+    "airport-autocomplete": "q=lon",
+    "crew-autocomplete": "q=an",
+}
+
+
+def middle_pk(queryset):
+    pks = queryset.order_by("pk").values_list("pk", flat=True)
+    return pks[pks.count() // 2]
+
+
+def endpoints():
+    """Yield (name, path) of the GET endpoints of the airport router"""
+    from django.urls import reverse
+
+    from airport.urls import router
+
+    for _, viewset, basename in router.registry:
+        pk = None
+        if hasattr(viewset, "retrieve"):
+            pk = middle_pk(viewset.queryset)
+            yield f"{basename}-detail", reverse(
+                f"airport:{basename}-detail", args=[pk]
+            )
+        if hasattr(viewset, "list"):
+            yield f"{basename}-list", reverse(f"airport:{basename}-list")
+        for action in viewset.get_extra_actions():
+            if "get" not in action.mapping or (action.detail and pk is None):
+                continue
+            name = f"{basename}-{action.url_name}"
+            path = reverse(
+                f"airport:{name}", args=[pk] if action.detail else []
+            )
+            if name in QUERY_STRINGS:
+                path = f"{path}?{QUERY_STRINGS[name]}"
+            yield name, path
+
+
+def measure(client, path, requests) -> dict:
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    for _ in range(5):
+        client.get(path)
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(path)
+    # Read now, every request resets the query log
+    query_count = len(queries)
+
+    samples = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        client.get(path)
+        samples.append(time.perf_counter() - start)
+    return {
+        "path": path,
+        "status": response.status_code,
+        "queries": query_count,
+        **percentiles(samples),
+    }
+
+
+def run(scale, requests) -> dict:
+    from django.contrib.auth import get_user_model
+    from django.core.cache import cache
+    from django.core.management import call_command
+    from django.db.models import Count
+    from rest_framework.test import APIClient
+
+    from airport.models import Order
+
+    started = time.perf_counter()
+    call_command("seed_perf_data", **SCALES[scale])
+    print(f"seeded in {time.perf_counter() - started:.1f}s")
+
+    busiest = (
+        Order.objects.values("user")
+        .annotate(orders=Count("id"))
+        .order_by("-orders", "user")
+        .first()
+    )
+    user = get_user_model().objects.get(pk=busiest["user"])
+    user.is_staff = True
+    user.save()
+    client = APIClient()
+    client.force_authenticate(user)
+    cache.clear()
+
+    results = {}
+    for name, path in endpoints():
+        results[name] = measure(client, path, requests)
+        print(f"{name:<28}", json.dumps(results[name]))
+    return {"scale": scale, "requests": requests, "endpoints": results}
+
+
+def compare(results, baseline, tolerance, min_delta) -> list:
+    """Print the change of each endpoint; return the regressed ones"""
+    if baseline["scale"] != results["scale"]:
+        print(f"warning: the baseline was taken at {baseline['scale']} scale")
+
+    regressions = []
+    print(f"{'endpoint':<28} {'queries':>9} {'p95 ms':>19} {'change':>8}")
+    for name, now in results["endpoints"].items():
+        before = baseline["endpoints"].get(name)
+        if before is None:
+            print(f"{name:<28} {'new':>9}")
+            continue
+        delta = now["p95"] - before["p95"]
+        change = delta / before["p95"]
+        regressed = now["queries"] > before["queries"] or (
+            change > tolerance and delta > min_delta
+        )
+        if regressed:
+            regressions.append(name)
+        print(
+            f"{name:<28} {before['queries']:>4}→{now['queries']:<4} "
+            f"{before['p95']:>9}→{now['p95']:<9} {change:>+8.1%}"
+            + ("  REGRESSION" if regressed else "")
+        )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument("--scale", choices=SCALES, default="medium")
+    parser.add_argument(
+        "--requests", type=int, default=200, help="Requests per endpoint"
+    )
+    parser.add_argument("--output", help="Write the results to this file")
+    parser.add_argument("--baseline", help="Compare with results saved here")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="Allowed relative p95 growth over the baseline",
+    )
+    parser.add_argument(
+        "--min-delta",
+        type=float,
+        default=2.0,
+        help="p95 growth in ms below which sub-millisecond noise is ignored",
+    )
+    args = parser.parse_args()
+
+    setup()
+    with test_database(), throttling_disabled():
+        results = run(args.scale, args.requests)
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2, sort_keys=True)
+            file.write("\n")
+    if args.baseline:
+        with open(args.baseline) as file:
+            regressions = compare(
+                results, json.load(file), args.tolerance, args.min_delta
+            )
+        if regressions:
+            print(f"regressed: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Compare JWT authentication with and without the user cache.
+
+Prints per-request latency percentiles and the number of queries each
+authentication class issues.
+"""
+import argparse
+import time
+
+from benchmarks import percentiles, setup, test_database
+
+
+def run(iterations):
+    from django.contrib.auth import get_user_model
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+    from rest_framework.request import Request
+    from rest_framework.test import APIRequestFactory
+    from rest_framework_simplejwt.authentication import JWTAuthentication
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    from user.authentication import CachedJWTAuthentication
+
+    user = get_user_model().objects.create_user(
+        email="bench@example.com", password="bench-password"
+    )
+    header = f"Bearer {AccessToken.for_user(user)}"
+    factory = APIRequestFactory()
+
+    for authentication_class in (JWTAuthentication, CachedJWTAuthentication):
+        authentication = authentication_class()
+        samples = []
+        with CaptureQueriesContext(connection) as queries:
+            for _ in range(iterations):
+                request = Request(
+                    factory.get("/", HTTP_AUTHORIZATION=header)
+                )
+                start = time.perf_counter()
+                authentication.authenticate(request)
+                samples.append(time.perf_counter() - start)
+
+        print(
+            f"{authentication_class.__name__:<26}"
+            f" queries/request={len(queries) / iterations:.3f}",
+            percentiles(samples),
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    setup()
+    with test_database():
+        run(args.iterations)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Login throughput at different password hashing work factors.
+
+Runs `--concurrency` threads that log in repeatedly through
+django.contrib.auth.authenticate (the path TokenObtainPairView takes) and
+reports logins per second and latency percentiles for each iteration count.
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks import percentiles, setup, test_database
+
+PASSWORD = "bench-password"
+
+
+def run(iterations_list, logins, concurrency):
+    from django.contrib.auth import authenticate, get_user_model
+    from django.db import connection
+    from django.test.utils import override_settings
+
+    from user.hashers import get_hashing_pool
+
+    get_hashing_pool()  # start the pool outside the measurement
+    for iterations in iterations_list:
+        with override_settings(PASSWORD_HASH_ITERATIONS=iterations):
+            email = f"bench-{iterations}@example.com"
+            get_user_model().objects.create_user(
+                email=email, password=PASSWORD
+            )
+
+            def login(_):
+                start = time.perf_counter()
+                try:
+                    assert authenticate(username=email, password=PASSWORD)
+                    return time.perf_counter() - start
+                finally:
+                    connection.close()
+
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                samples = list(executor.map(login, range(logins)))
+            elapsed = time.perf_counter() - start
+
+        print(
+            f"iterations={iterations:<8}"
+            f" logins/s={logins / elapsed:8.1f}",
+            percentiles(samples),
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--iterations",
+        type=int,
+        nargs="+",
+        default=[600_000, 260_000, 100_000],
+    )
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+
+    setup()
+    with test_database():
+        run(args.iterations, args.logins, args.concurrency)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Overhead of PerformanceMiddleware.
+
+Requests the airplane and flight lists with and without the middleware
+and prints the mean latency of both and the relative overhead.
+"""
+import argparse
+import time
+
+from benchmarks import percentiles, setup, test_database, throttling_disabled
+
+METRICS_MIDDLEWARE = "airport_api_service.metrics.PerformanceMiddleware"
+
+
+def measure(client, urls, requests):
+    samples = []
+    for i in range(requests):
+        start = time.perf_counter()
+        client.get(urls[i % len(urls)])
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def run(requests):
+    from django.conf import settings
+    from django.contrib.auth import get_user_model
+    from django.test.utils import override_settings
+    from rest_framework.test import APIClient
+
+    from airport.tests.factories import sample_airplane
+
+    user = get_user_model().objects.create_user(
+        email="bench@example.com", password="bench-password"
+    )
+    sample_airplane()
+    urls = ["/api/v1/airport/airplanes/", "/api/v1/airport/flights/"]
+
+    without = [m for m in settings.MIDDLEWARE if m != METRICS_MIDDLEWARE]
+    clients = {}
+    for label, middleware in (
+        ("without", without),
+        ("with", settings.MIDDLEWARE),
+    ):
+        with override_settings(MIDDLEWARE=middleware):
+            clients[label] = APIClient()
+            clients[label].force_authenticate(user)
+            measure(clients[label], urls, 50)  # warm up, loads middleware
+
+    # Alternate short rounds so drift affects both variants equally
+    results = {label: [] for label in clients}
+    for _ in range(0, requests, 100):
+        for label, client in clients.items():
+            results[label] += measure(client, urls, 100)
+    for label, samples in results.items():
+        print(f"{label:<8}", percentiles(samples))
+
+    mean = {label: sum(s) / len(s) for label, s in results.items()}
+    overhead = (mean["with"] - mean["without"]) / mean["without"] * 100
+    print(f"mean overhead: {overhead:.2f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    setup()
+    with test_database(), throttling_disabled():
+        run(args.requests)
+
+
+if __name__ == "__main__":
+    main()
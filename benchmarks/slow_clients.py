@@ -0,0 +1,216 @@
+"""
+Slow clients: sync viewsets under WSGI against async views under ASGI.
+
+Simulates --clients clients arriving over --ramp seconds, each reading its
+response so slowly that delivering it takes --delay seconds. The WSGI
+handler runs in a pool of --threads worker threads (like gunicorn gthread),
+so a thread is busy for the whole delivery. The ASGI handler runs the async
+views on one event loop, where delivery only awaits. Prints latency
+percentiles, throughput and the peak number of threads of both.
+
+The defaults keep the arrival rate below what one process can compute
+but above what 32 threads can deliver at 2 seconds per client. With
+--delay 0 the comparison shows the raw overhead of the async path instead.
+"""
+import argparse
+import asyncio
+import io
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks import percentiles, setup, test_database, throttling_disabled
+
+SYNC_URLS = (
+    "/api/v1/airport/flights/",
+    "/api/v1/airport/flights/{flight}/",
+    "/api/v1/airport/routes/",
+)
+ASYNC_URLS = tuple(
+    url.replace("/airport/", "/airport/async/") for url in SYNC_URLS
+)
+
+
+class ThreadSampler:
+    def __init__(self):
+        self.peak = threading.active_count()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+
+    def _sample(self):
+        while not self._stop.wait(0.01):
+            self.peak = max(self.peak, threading.active_count())
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+
+
+def run_wsgi(paths, token, clients, delay, ramp, threads):
+    from django.core.handlers.wsgi import WSGIHandler
+
+    application = WSGIHandler()
+
+    def serve(path, arrival):
+        status = []
+        environ = {
+            "REQUEST_METHOD": "GET",
+            "PATH_INFO": path,
+            "QUERY_STRING": "",
+            "SERVER_NAME": "testserver",
+            "SERVER_PORT": "80",
+            "HTTP_AUTHORIZATION": f"Bearer {token}",
+            "wsgi.input": io.BytesIO(),
+            "wsgi.url_scheme": "http",
+        }
+        body = application(environ, lambda s, headers: status.append(s))
+        try:
+            for _ in body:
+                time.sleep(delay)  # the client drains the socket slowly
+        finally:
+            body.close()
+        assert status[0].startswith("200"), status
+        return time.perf_counter() - arrival
+
+    start = time.perf_counter()
+    with ThreadSampler() as sampler, ThreadPoolExecutor(threads) as pool:
+        futures = []
+        for i in range(clients):
+            arrival = start + ramp * i / clients
+            time.sleep(max(arrival - time.perf_counter(), 0))
+            futures.append(
+                pool.submit(serve, paths[i % len(paths)], arrival)
+            )
+        samples = [future.result() for future in futures]
+    return samples, time.perf_counter() - start, sampler.peak
+
+
+def run_asgi(paths, token, clients, delay, ramp):
+    from django.core.handlers.asgi import ASGIHandler
+
+    application = ASGIHandler()
+
+    async def serve(path, arrival):
+        await asyncio.sleep(max(arrival - time.perf_counter(), 0))
+        status = []
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": path,
+            "query_string": b"",
+            "headers": [
+                (b"host", b"testserver"),
+                (b"authorization", f"Bearer {token}".encode()),
+            ],
+            "server": ("testserver", 80),
+        }
+
+        async def receive():
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                status.append(message["status"])
+            elif message["type"] == "http.response.body":
+                await asyncio.sleep(delay)
+
+        await application(scope, receive, send)
+        assert status[0] == 200, status
+        return time.perf_counter() - arrival
+
+    async def main():
+        start = time.perf_counter()
+        samples = await asyncio.gather(
+            *(
+                serve(paths[i % len(paths)], start + ramp * i / clients)
+                for i in range(clients)
+            )
+        )
+        return samples, time.perf_counter() - start
+
+    with ThreadSampler() as sampler:
+        samples, wall = asyncio.run(main())
+    return samples, wall, sampler.peak
+
+
+def seed():
+    from django.contrib.auth import get_user_model
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    from airport.models import Airport, Crew, Flight, Route
+    from airport.tests.factories import sample_airplane
+
+    user = get_user_model().objects.create_user(
+        email="bench@example.com", password="bench-password"
+    )
+    airplane = sample_airplane()
+    route = Route.objects.create(
+        source=Airport.objects.create(name="Source", closest_big_city="A"),
+        destination=Airport.objects.create(
+            name="Destination", closest_big_city="B"
+        ),
+        distance=100,
+    )
+    crew = Crew.objects.create(first_name="John", last_name="Doe")
+    for day in range(1, 4):
+        flight = Flight.objects.create(
+            route=route,
+            airplane=airplane,
+            departure_time=f"2024-06-{day:02d}T12:00:00Z",
+            arrival_time=f"2024-06-{day:02d}T14:00:00Z",
+        )
+        flight.crew.add(crew)
+    return str(AccessToken.for_user(user)), flight.id
+
+
+def report(label, samples, wall, peak_threads):
+    print(
+        f"{label:<5}",
+        percentiles(samples),
+        f"throughput={len(samples) / wall:.1f} req/s",
+        f"peak_threads={peak_threads}",
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--clients", type=int, default=1000)
+    parser.add_argument("--delay", type=float, default=2.0)
+    parser.add_argument("--ramp", type=float, default=30.0)
+    parser.add_argument("--threads", type=int, default=32)
+    args = parser.parse_args()
+
+    setup()
+    with test_database(), throttling_disabled():
+        token, flight = seed()
+        sync_paths = [url.format(flight=flight) for url in SYNC_URLS]
+        async_paths = [url.format(flight=flight) for url in ASYNC_URLS]
+
+        report(
+            "wsgi",
+            *run_wsgi(
+                sync_paths,
+                token,
+                args.clients,
+                args.delay,
+                args.ramp,
+                args.threads,
+            ),
+        )
+        report(
+            "asgi",
+            *run_asgi(
+                async_paths, token, args.clients, args.delay, args.ramp
+            ),
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Cold start of a worker under each settings profile.
+
+Starts `--runs` fresh interpreters per profile. Each one loads the
+project (django.setup()), imports the URLconf and serves one request to
+--path through the WSGI handler, and reports how long each step took and
+how many modules it imported. Time to first request is measured by this
+process, from spawning the interpreter to the response, so it includes
+interpreter startup. The default path answers 401 without touching the
+database, which keeps the numbers about loading code::
+
+    python -m benchmarks.startup --runs 20
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+PROFILES = {
+    "full": "airport_api_service.settings",
+    "api": "airport_api_service.settings_api",
+}
+
+WORKER = """
+import json, sys, time
+start = time.perf_counter()
+import django
+django.setup()
+setup = time.perf_counter()
+from django.urls import get_resolver
+get_resolver().url_patterns
+urls = time.perf_counter()
+from wsgiref.util import setup_testing_defaults
+from django.core.handlers.wsgi import WSGIHandler
+environ = {"PATH_INFO": sys.argv[1], "HTTP_ACCEPT": "application/json"}
+setup_testing_defaults(environ)
+response = WSGIHandler()(environ, lambda status, headers: None)
+b"".join(response)
+response.close()
+end = time.perf_counter()
+print(json.dumps({
+    "setup_ms": (setup - start) * 1000,
+    "urls_ms": (urls - setup) * 1000,
+    "request_ms": (end - urls) * 1000,
+    "status": response.status_code,
+    "modules": len(sys.modules),
+}))
+"""
+
+
+def start_worker(settings_module, path) -> dict:
+    env = {**os.environ, "DJANGO_SETTINGS_MODULE": settings_module}
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-c", WORKER, path],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    elapsed = time.perf_counter() - start
+    return {
+        **json.loads(result.stdout.splitlines()[-1]),
+        "first_request_ms": elapsed * 1000,
+    }
+
+
+def run(profiles, path, runs) -> dict:
+    # Interleaved, so drifting machine load affects every profile alike
+    samples = {name: [] for name in profiles}
+    for _ in range(runs):
+        for name in profiles:
+            samples[name].append(start_worker(PROFILES[name], path))
+
+    results = {}
+    for name, runs_of_profile in samples.items():
+        results[name] = {
+            key: round(statistics.median(s[key] for s in runs_of_profile), 1)
+            for key in (
+                "setup_ms",
+                "urls_ms",
+                "request_ms",
+                "first_request_ms",
+                "modules",
+            )
+        }
+        results[name]["status"] = runs_of_profile[0]["status"]
+        print(f"{name:<6}", json.dumps(results[name]))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument(
+        "--profiles", nargs="+", choices=PROFILES, default=list(PROFILES)
+    )
+    parser.add_argument("--path", default="/api/v1/airport/routes/")
+    parser.add_argument(
+        "--runs", type=int, default=10, help="Interpreters per profile"
+    )
+    args = parser.parse_args()
+
+    results = run(args.profiles, args.path, args.runs)
+    if {"full", "api"} <= set(results):
+        full, api = results["full"], results["api"]
+        change = api["first_request_ms"] / full["first_request_ms"] - 1
+        print(
+            f"api profile: {change:+.1%} time to first request, "
+            f"{api['modules'] - full['modules']:+.0f} modules"
+        )
+
+
+if __name__ == "__main__":
+    main()
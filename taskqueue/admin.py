@@ -0,0 +1,9 @@
+from django.contrib import admin
+
+from .models import Task
+
+
+@admin.register(Task)
+class TaskAdmin(admin.ModelAdmin):
+    list_display = ("name", "queue", "status", "attempts", "run_after")
+    list_filter = ("queue", "status", "name")
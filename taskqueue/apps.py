@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+from django.utils.module_loading import autodiscover_modules
+
+
+class TaskqueueConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "taskqueue"
+
+    def ready(self):
+        # Register the @task functions defined in each app's tasks.py
+        autodiscover_modules("tasks")
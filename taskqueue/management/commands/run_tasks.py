@@ -0,0 +1,53 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from taskqueue.worker import POOLS, Worker
+
+
+class Command(BaseCommand):
+    help = "Run background tasks from the database queue"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--queue",
+            action="append",
+            dest="queues",
+            help="Queue to process, repeatable (default: all configured)",
+        )
+        parser.add_argument("--pool", choices=POOLS, default="thread")
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=100,
+            help="Most runs of a batch task handled by one job",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=1.0,
+            help="Seconds to wait for new tasks when idle",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Exit once no task is due instead of polling forever",
+        )
+
+    def handle(self, *args, **options):
+        configured = settings.TASKQUEUE_QUEUES
+        names = options["queues"] or list(configured)
+        unknown = set(names) - set(configured)
+        if unknown:
+            raise CommandError(f"Unknown queues: {', '.join(sorted(unknown))}")
+
+        queues = {name: configured[name]["CONCURRENCY"] for name in names}
+        self.stdout.write(
+            f"Processing {', '.join(names)} with a {options['pool']} pool"
+        )
+        worker = Worker(
+            queues, pool=options["pool"], batch_size=options["batch_size"]
+        )
+        try:
+            worker.run(once=options["once"], interval=options["interval"])
+        except KeyboardInterrupt:
+            self.stdout.write("Stopping, waiting for running tasks...")
@@ -0,0 +1,38 @@
+from django.db import models
+from django.utils import timezone
+
+
+class Task(models.Model):
+    QUEUED = "queued"
+    RUNNING = "running"
+    FAILED = "failed"
+    STATUS_CHOICES = (
+        (QUEUED, "Queued"),
+        (RUNNING, "Running"),
+        (FAILED, "Failed"),
+    )
+
+    queue = models.CharField(max_length=64, default="default")
+    name = models.CharField(max_length=255)
+    payload = models.JSONField(default=dict)
+    status = models.CharField(
+        max_length=16, choices=STATUS_CHOICES, default=QUEUED
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_until = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ("run_after", "id")
+        indexes = [
+            models.Index(
+                fields=["queue", "status", "run_after"],
+                name="taskqueue_task_pending_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.status})"
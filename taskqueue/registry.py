@@ -0,0 +1,54 @@
+from django.utils import timezone
+
+from taskqueue.models import Task
+
+registry = {}
+
+
+class TaskDefinition:
+    def __init__(self, fn, name, queue, max_attempts, batch):
+        self.fn = fn
+        self.name = name
+        self.queue = queue
+        self.max_attempts = max_attempts
+        self.batch = batch
+
+    def __call__(self, *args, **kwargs):
+        return self.fn(*args, **kwargs)
+
+    def enqueue(self, run_after=None, **payload) -> Task:
+        """
+        Queue a run with the given JSON-serializable keyword arguments.
+
+        The task row is part of the current transaction, so work enqueued by
+        a request that rolls back never runs.
+        """
+        return Task.objects.create(
+            queue=self.queue,
+            name=self.name,
+            payload=payload,
+            max_attempts=self.max_attempts,
+            run_after=run_after or timezone.now(),
+        )
+
+
+def task(name=None, queue="default", max_attempts=5, batch=False):
+    """
+    Register a function as a background task.
+
+    Batch tasks are called once with a list of payloads gathered from all
+    queued runs of the same task, instead of once per run.
+    """
+
+    def decorator(fn):
+        definition = TaskDefinition(
+            fn,
+            name=name or f"{fn.__module__}.{fn.__name__}",
+            queue=queue,
+            max_attempts=max_attempts,
+            batch=batch,
+        )
+        registry[definition.name] = definition
+        return definition
+
+    return decorator
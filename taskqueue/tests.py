@@ -0,0 +1,106 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from taskqueue.models import Task
+from taskqueue.registry import task
+from taskqueue.worker import Worker, claim
+
+calls = []
+
+
+@task(name="tests.record", queue="tests")
+def record(value):
+    calls.append(value)
+
+
+@task(name="tests.record_batch", queue="tests", batch=True)
+def record_batch(payloads):
+    calls.append([payload["value"] for payload in payloads])
+
+
+@task(name="tests.explode", queue="tests", max_attempts=2)
+def explode():
+    raise RuntimeError("boom")
+
+
+@override_settings(TASKQUEUE_RETRY_BACKOFF=(5, 60))
+class WorkerTests(TestCase):
+
+    def setUp(self):
+        calls.clear()
+        # The test transaction would look like a broken connection
+        patcher = mock.patch("taskqueue.worker.close_old_connections")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.worker = Worker({"tests": 2}, pool="inline")
+
+    def test_task_runs_and_is_deleted(self):
+        record.enqueue(value=1)
+
+        self.worker.run(once=True)
+
+        self.assertEqual(calls, [1])
+        self.assertFalse(Task.objects.exists())
+
+    def test_delayed_task_waits(self):
+        record.enqueue(run_after=timezone.now() + timedelta(minutes=1), value=1)
+
+        self.worker.run(once=True)
+
+        self.assertEqual(calls, [])
+
+    def test_batch_task_runs_once_per_batch(self):
+        for value in range(5):
+            record_batch.enqueue(value=value)
+
+        Worker({"tests": 1}, pool="inline", batch_size=3).run(once=True)
+
+        self.assertEqual(calls, [[0, 1, 2], [3, 4]])
+
+    def test_failed_task_is_retried_with_backoff(self):
+        explode.enqueue()
+
+        self.worker.run(once=True)
+
+        task_row = Task.objects.get()
+        self.assertEqual(task_row.status, Task.QUEUED)
+        self.assertEqual(task_row.attempts, 1)
+        self.assertIn("RuntimeError: boom", task_row.last_error)
+        self.assertGreater(
+            task_row.run_after, timezone.now() + timedelta(seconds=4)
+        )
+
+    def test_task_fails_after_max_attempts(self):
+        explode.enqueue()
+
+        for _ in range(2):
+            Task.objects.update(run_after=timezone.now())
+            self.worker.run(once=True)
+
+        self.assertEqual(Task.objects.get().status, Task.FAILED)
+
+    def test_claim_respects_queue_concurrency(self):
+        for value in range(5):
+            record.enqueue(value=value)
+
+        with mock.patch(
+            "taskqueue.worker.claim", wraps=claim
+        ) as claim_mock:
+            self.worker.dispatch()
+
+        claim_mock.assert_called_once_with("tests", 2)
+        self.assertEqual(calls, [0, 1])
+
+    def test_expired_lease_is_claimed_again(self):
+        record.enqueue(value=1)
+        Task.objects.update(
+            status=Task.RUNNING,
+            locked_until=timezone.now() - timedelta(seconds=1),
+        )
+
+        self.worker.run(once=True)
+
+        self.assertEqual(calls, [1])
@@ -0,0 +1,211 @@
+"""
+Task worker.
+
+The worker claims due tasks with SELECT ... FOR UPDATE SKIP LOCKED, so any
+number of workers can share a queue. Claimed tasks are leased for
+TASKQUEUE_LEASE_SECONDS; a task whose worker died is claimed again once the
+lease expires, so delivery is at least once and tasks should be idempotent.
+
+Each queue runs at most its configured concurrency of jobs at a time. A job
+is a single task, or for batch tasks up to `batch_size` queued runs of the
+same task. Jobs run in a thread pool, a process pool or inline in the
+worker's own thread. Successful tasks are deleted; failed ones are retried
+with exponential backoff until they reach max_attempts and are then kept
+with status "failed" for inspection.
+"""
+import multiprocessing
+import random
+import time
+import traceback
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from datetime import timedelta
+
+import django
+from django.conf import settings
+from django.db import close_old_connections, connections, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from taskqueue.models import Task
+from taskqueue.registry import registry
+
+POOLS = ("thread", "process", "inline")
+
+
+def backoff(attempts: int) -> timedelta:
+    """Exponential delay before retry number `attempts`, with jitter"""
+    base, cap = settings.TASKQUEUE_RETRY_BACKOFF
+    delay = min(base * 2 ** (attempts - 1), cap)
+    return timedelta(seconds=delay * random.uniform(1.0, 1.1))
+
+
+def claim(queue: str, limit: int, name: str = None) -> list:
+    """Lease up to `limit` due tasks of a queue, optionally of one task"""
+    now = timezone.now()
+    due = Q(status=Task.QUEUED, run_after__lte=now) | Q(
+        status=Task.RUNNING, locked_until__lt=now
+    )
+    with transaction.atomic():
+        tasks = Task.objects.select_for_update(skip_locked=True).filter(
+            due, queue=queue
+        )
+        if name is not None:
+            tasks = tasks.filter(name=name)
+        tasks = list(tasks.order_by("run_after", "id")[:limit])
+        Task.objects.filter(id__in=[task.id for task in tasks]).update(
+            status=Task.RUNNING,
+            attempts=F("attempts") + 1,
+            locked_until=now
+            + timedelta(seconds=settings.TASKQUEUE_LEASE_SECONDS),
+        )
+
+    for task in tasks:
+        task.attempts += 1
+    return tasks
+
+
+def execute(name: str, payloads: list) -> None:
+    definition = registry[name]
+    if definition.batch:
+        definition(payloads)
+    else:
+        for payload in payloads:
+            definition(**payload)
+
+
+def _run_job(name: str, payloads: list) -> None:
+    try:
+        execute(name, payloads)
+    finally:
+        # Pool threads and processes own their connections
+        connections.close_all()
+
+
+def complete(tasks: list) -> None:
+    Task.objects.filter(id__in=[task.id for task in tasks]).delete()
+
+
+def fail(tasks: list, error: BaseException) -> None:
+    message = "".join(traceback.format_exception(error))
+    now = timezone.now()
+    for task in tasks:
+        task.last_error = message
+        task.locked_until = None
+        if task.attempts >= task.max_attempts:
+            task.status = Task.FAILED
+        else:
+            task.status = Task.QUEUED
+            task.run_after = now + backoff(task.attempts)
+        task.save(
+            update_fields=("status", "run_after", "locked_until", "last_error")
+        )
+
+
+class Worker:
+    def __init__(self, queues: dict, pool="thread", batch_size=100):
+        if pool not in POOLS:
+            raise ValueError(f"Unknown pool {pool!r}, expected one of {POOLS}")
+        self.queues = queues
+        self.pool = pool
+        self.batch_size = batch_size
+        self.in_flight = {queue: {} for queue in queues}
+        self.executors = {}
+
+    def _executor(self, queue):
+        if queue not in self.executors:
+            workers = self.queues[queue]
+            if self.pool == "process":
+                self.executors[queue] = ProcessPoolExecutor(
+                    max_workers=workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=django.setup,
+                )
+            else:
+                self.executors[queue] = ThreadPoolExecutor(
+                    max_workers=workers,
+                    thread_name_prefix=f"taskqueue-{queue}",
+                )
+        return self.executors[queue]
+
+    def claim_jobs(self, queue: str, slots: int) -> list:
+        """Claim work for up to `slots` jobs, grouping batch tasks"""
+        jobs = []
+        batches = {}
+        for task in claim(queue, slots):
+            definition = registry.get(task.name)
+            if definition is None:
+                fail([task], LookupError(f"Unknown task {task.name!r}"))
+            elif definition.batch:
+                batches.setdefault(task.name, []).append(task)
+            else:
+                jobs.append((task.name, [task]))
+
+        for name, tasks in batches.items():
+            tasks += claim(queue, self.batch_size - len(tasks), name=name)
+            jobs.append((name, tasks))
+        return jobs
+
+    def _finish(self, tasks: list, error=None) -> None:
+        if error is None:
+            complete(tasks)
+        else:
+            fail(tasks, error)
+
+    def dispatch(self) -> int:
+        """Start jobs on every queue with free slots, return how many"""
+        started = 0
+        for queue, concurrency in self.queues.items():
+            slots = concurrency - len(self.in_flight[queue])
+            if slots <= 0:
+                continue
+            for name, tasks in self.claim_jobs(queue, slots):
+                started += 1
+                payloads = [task.payload for task in tasks]
+                if self.pool == "inline":
+                    try:
+                        execute(name, payloads)
+                    except Exception as error:
+                        self._finish(tasks, error)
+                    else:
+                        self._finish(tasks)
+                    continue
+                future = self._executor(queue).submit(
+                    _run_job, name, payloads
+                )
+                self.in_flight[queue][future] = tasks
+        return started
+
+    def collect(self, timeout: float) -> None:
+        """Wait up to `timeout` for running jobs and record their outcome"""
+        futures = [
+            future
+            for in_flight in self.in_flight.values()
+            for future in in_flight
+        ]
+        if not futures:
+            time.sleep(timeout)
+            return
+
+        done, _ = wait(futures, timeout=timeout, return_when=FIRST_COMPLETED)
+        for in_flight in self.in_flight.values():
+            for future in done & in_flight.keys():
+                self._finish(in_flight.pop(future), future.exception())
+
+    def run(self, once=False, interval=1.0) -> None:
+        """Process tasks forever, or until the queues are drained"""
+        try:
+            while True:
+                close_old_connections()
+                started = self.dispatch()
+                busy = any(self.in_flight.values())
+                if once and not started and not busy:
+                    return
+                self.collect(0 if started and not busy else interval)
+        finally:
+            for executor in self.executors.values():
+                executor.shutdown(wait=True)
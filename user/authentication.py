@@ -0,0 +1,112 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.utils.translation import gettext as _
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+
+class UserCache:
+    """Thread-safe, size-bounded LRU of user objects with a per-entry TTL"""
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            expires_at, user = entry
+            if expires_at < time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return user
+
+    def set(self, user_id, user):
+        with self._lock:
+            self._entries[user_id] = (time.monotonic() + self.ttl, user)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+user_cache = UserCache(
+    max_size=settings.JWT_USER_CACHE["MAX_SIZE"],
+    ttl=settings.JWT_USER_CACHE["TTL"],
+)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that keeps recently seen users in a process-local LRU,
+    so authenticated requests skip the user SELECT.
+
+    Entries are dropped when a user is saved or deleted in this process and
+    expire after a short TTL, which bounds staleness in other workers.
+    """
+
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if user_id is None:
+            return super().get_user(validated_token)
+
+        user = user_cache.get(user_id)
+        if user is None:
+            user = super().get_user(validated_token)
+            user_cache.set(user_id, user)
+        elif api_settings.CHECK_REVOKE_TOKEN and validated_token.get(
+            api_settings.REVOKE_TOKEN_CLAIM
+        ) != get_md5_hash_password(user.password):
+            raise AuthenticationFailed(
+                _("The user's password has been changed."),
+                code="password_changed",
+            )
+
+        # Hand out a copy so per-request changes never leak into the cache
+        return copy.copy(user)
+
+
+class StreamToken(AccessToken):
+    """
+    Access token for event streams, passed in the URL where EventSource
+    can't send headers. Its own token type keeps regular access tokens out
+    of URLs (and so out of access logs), and STREAM_TOKEN_LIFETIME keeps
+    one found in a log short-lived.
+    """
+
+    token_type = "stream"
+    lifetime = settings.STREAM_TOKEN_LIFETIME
+
+
+class QueryTokenAuthentication(CachedJWTAuthentication):
+    """Authenticates with a StreamToken in the `token` query parameter"""
+
+    def authenticate(self, request):
+        raw_token = request.query_params.get("token")
+        if raw_token is None:
+            return None
+        try:
+            validated_token = StreamToken(raw_token)
+        except TokenError as e:
+            raise InvalidToken(e.args[0])
+        return self.get_user(validated_token), validated_token
@@ -0,0 +1,49 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+
+from user.hashers import PoolSaturated, hash_password, verify_password
+
+UserModel = get_user_model()
+
+
+class PooledModelBackend(ModelBackend):
+    """
+    ModelBackend that runs password hashing in the bounded hashing pool.
+
+    Database access stays on the request thread; outdated hashes (different
+    hasher or work factor) are upgraded transparently after a successful
+    login. When the pool is saturated the request is marked with
+    `hashing_pool_saturated`, as authenticate() reports a failed login
+    either way.
+    """
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        try:
+            return self._authenticate(request, username, password, **kwargs)
+        except PoolSaturated:
+            if request is not None:
+                request.hashing_pool_saturated = True
+            raise
+
+    def _authenticate(self, request, username, password, **kwargs):
+        if username is None:
+            username = kwargs.get(UserModel.USERNAME_FIELD)
+        if username is None or password is None:
+            return
+        try:
+            user = UserModel._default_manager.get_by_natural_key(username)
+        except UserModel.DoesNotExist:
+            # Run the default password hasher once to reduce the timing
+            # difference between an existing and a nonexistent user.
+            hash_password(password)
+            return
+
+        is_correct, must_update = verify_password(password, user.password)
+        if not is_correct or not self.user_can_authenticate(user):
+            return
+
+        if must_update:
+            user.password = hash_password(password)
+            user.save(update_fields=["password"])
+
+        return user
@@ -0,0 +1,84 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+from django.conf import settings
+from django.contrib.auth.hashers import (
+    PBKDF2PasswordHasher,
+    check_password,
+    make_password,
+)
+from django.core.exceptions import PermissionDenied
+
+
+class PoolSaturated(PermissionDenied):
+    """No hashing slot freed up in time"""
+
+
+class ConfigurablePBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """
+    PBKDF2-SHA256 with the work factor taken from
+    settings.PASSWORD_HASH_ITERATIONS.
+
+    Hashes made with a different iteration count are re-encoded on the
+    next successful login.
+    """
+
+    @property
+    def iterations(self):
+        return settings.PASSWORD_HASH_ITERATIONS
+
+
+class HashingPool:
+    """
+    Bounded thread pool for password hashing.
+
+    At most `workers` hashes run at once and at most `queue_size` more wait
+    for a slot; anything beyond that raises PoolSaturated instead of piling
+    up CPU work behind a login burst. authenticate() turns it into a failed
+    login; the token view answers 429 instead. PBKDF2 releases the GIL, so
+    the workers hash in parallel.
+
+    The pool caps concurrent hashing, it does not free the request worker:
+    the calling thread still waits for its hash to finish.
+    """
+
+    def __init__(self, workers: int, queue_size: int, timeout: float):
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="password-hashing"
+        )
+        self._slots = threading.BoundedSemaphore(workers + queue_size)
+
+    def run(self, fn, *args):
+        if not self._slots.acquire(timeout=self.timeout):
+            raise PoolSaturated("Too many concurrent logins")
+        try:
+            return self._executor.submit(fn, *args).result()
+        finally:
+            self._slots.release()
+
+
+@lru_cache(maxsize=None)
+def get_hashing_pool() -> HashingPool:
+    return HashingPool(
+        workers=settings.PASSWORD_HASHING_POOL["WORKERS"],
+        queue_size=settings.PASSWORD_HASHING_POOL["QUEUE_SIZE"],
+        timeout=settings.PASSWORD_HASHING_POOL["TIMEOUT"],
+    )
+
+
+def _verify(password, encoded):
+    must_update = []
+    is_correct = check_password(password, encoded, setter=must_update.append)
+    return is_correct, bool(must_update)
+
+
+def verify_password(password: str, encoded: str) -> tuple:
+    """Return (is_correct, must_update) for a raw password, in the pool"""
+    return get_hashing_pool().run(_verify, password, encoded)
+
+
+def hash_password(password: str) -> str:
+    """Encode a raw password with the preferred hasher, in the pool"""
+    return get_hashing_pool().run(make_password, password)
@@ -0,0 +1,22 @@
+"""
+OpenAPI descriptions of the authentication classes, for drf-spectacular.
+"""
+from drf_spectacular.contrib.rest_framework_simplejwt import SimpleJWTScheme
+from drf_spectacular.extensions import OpenApiAuthenticationExtension
+
+
+class CachedJWTScheme(SimpleJWTScheme):
+    target_class = "user.authentication.CachedJWTAuthentication"
+
+
+class QueryTokenScheme(OpenApiAuthenticationExtension):
+    target_class = "user.authentication.QueryTokenAuthentication"
+    name = "streamToken"
+
+    def get_security_definition(self, auto_schema):
+        return {
+            "type": "apiKey",
+            "in": "query",
+            "name": "token",
+            "description": "Stream token from /api/v1/user/token/stream/",
+        }
@@ -1,6 +1,5 @@
-from django.contrib.auth import get_user_model, authenticate
+from django.contrib.auth import get_user_model
 from rest_framework import serializers
-from django.utils.translation import gettext as _
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -31,32 +30,6 @@ class UserSerializer(serializers.ModelSerializer):
         return user
 
 
-class AuthTokenSerializer(serializers.Serializer):
-    email = serializers.CharField(label=_("Email"), write_only=True)
-    password = serializers.CharField(
-        label=_("Password"),
-        style={"input_type": "password"},
-        trim_whitespace=False,
-        write_only=True,
-    )
-    token = serializers.CharField(label=_("Token"), read_only=True)
-
-    def validate(self, attrs):
-        email = attrs.get("email")
-        password = attrs.get("password")
-
-        if email and password:
-            user = authenticate(
-                request=self.context.get("request"),
-                username=email,
-                password=password,
-            )
-            if not user:
-                msg = _("Unable to authenticate with provided credentials")
-                raise serializers.ValidationError(msg, code="authorization")
-        else:
-            msg = _("Must include 'email' and 'password'")
-            raise serializers.ValidationError(msg, code="authorization")
-
-        attrs["user"] = user
-        return attrs
+
+class StreamTokenSerializer(serializers.Serializer):
+    token = serializers.CharField(read_only=True)
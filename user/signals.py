@@ -0,0 +1,11 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from user.authentication import user_cache
+from user.models import User
+
+
+@receiver((post_save, post_delete), sender=User)
+def invalidate_cached_user(sender, instance, **kwargs):
+    """Drop the user from the authentication cache"""
+    user_cache.invalidate(instance.pk)
@@ -1,3 +1,217 @@
-from django.test import TestCase
+import threading
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import authenticate, get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from user.authentication import CachedJWTAuthentication, user_cache
+from user.hashers import (
+    ConfigurablePBKDF2PasswordHasher,
+    HashingPool,
+    PoolSaturated,
+)
+from user.serializers import UserSerializer
+
+
+class CachedJWTAuthenticationTests(TestCase):
+
+    def setUp(self):
+        user_cache.clear()
+        self.user = get_user_model().objects.create_user(
+            email="testuser@gmail.com", password="testuser123"
+        )
+        self.token = str(AccessToken.for_user(self.user))
+        self.authentication = CachedJWTAuthentication()
+
+    def authenticate(self):
+        request = APIRequestFactory().get(
+            "/", HTTP_AUTHORIZATION=f"Bearer {self.token}"
+        )
+        user, _ = self.authentication.authenticate(Request(request))
+        return user
+
+    def test_repeated_authentication_skips_user_query(self):
+        with self.assertNumQueries(1):
+            self.authenticate()
+        with self.assertNumQueries(0):
+            user = self.authenticate()
+
+        self.assertEqual(user, self.user)
+
+    def test_cache_invalidated_on_serializer_update(self):
+        self.authenticate()
+
+        serializer = UserSerializer(
+            self.user, data={"email": "changed@gmail.com"}, partial=True
+        )
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+
+        with self.assertNumQueries(1):
+            user = self.authenticate()
+        self.assertEqual(user.email, "changed@gmail.com")
+
+    def test_deactivated_user_is_rejected(self):
+        self.authenticate()
+
+        self.user.is_active = False
+        self.user.save()
+
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate()
+
+    def test_cached_user_is_not_shared_between_requests(self):
+        first = self.authenticate()
+        first.first_name = "Changed"
+
+        self.assertEqual(self.authenticate().first_name, "")
+
+
+class PasswordHashingTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        with override_settings(PASSWORD_HASH_ITERATIONS=1000):
+            self.user = get_user_model().objects.create_user(
+                email="testuser@gmail.com", password="testuser123"
+            )
+
+    def test_hash_uses_configured_iterations(self):
+        self.assertTrue(self.user.password.startswith("pbkdf2_sha256$1000$"))
+
+    @override_settings(PASSWORD_HASH_ITERATIONS=2000)
+    def test_login_upgrades_outdated_hash(self):
+        user = authenticate(
+            username="testuser@gmail.com", password="testuser123"
+        )
+
+        user.refresh_from_db()
+        self.assertTrue(user.password.startswith("pbkdf2_sha256$2000$"))
+        self.assertTrue(user.check_password("testuser123"))
+
+    @override_settings(PASSWORD_HASH_ITERATIONS=1000)
+    def test_wrong_password_is_rejected_without_upgrade(self):
+        encoded = self.user.password
+
+        user = authenticate(username="testuser@gmail.com", password="wrong")
+
+        self.assertIsNone(user)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.password, encoded)
+
+    def test_token_refresh_does_not_touch_password_hash(self):
+        refresh = str(RefreshToken.for_user(self.user))
+
+        with mock.patch.object(
+            ConfigurablePBKDF2PasswordHasher, "verify"
+        ) as verify, self.assertNumQueries(0):
+            res = APIClient().post(
+                reverse("user:token_refresh"), {"refresh": refresh}
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn("access", res.data)
+        verify.assert_not_called()
+
+    def test_saturated_pool_rejects_logins(self):
+        pool = HashingPool(workers=1, queue_size=0, timeout=0)
+        started, release = threading.Event(), threading.Event()
+
+        def hold_slot():
+            started.set()
+            release.wait()
+
+        worker = threading.Thread(target=pool.run, args=(hold_slot,))
+        worker.start()
+        started.wait()
+
+        try:
+            with self.assertRaises(PoolSaturated):
+                pool.run(lambda: None)
+        finally:
+            release.set()
+            worker.join()
+
+    def test_saturated_pool_fails_login_outside_drf(self):
+        self.user.is_staff = True
+        self.user.save()
+
+        with mock.patch(
+            "user.backends.verify_password", side_effect=PoolSaturated
+        ):
+            res = self.client.post(
+                reverse("admin:login"),
+                {"username": self.user.email, "password": "testuser123"},
+            )
+            user = authenticate(
+                username=self.user.email, password="testuser123"
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertFalse(res.context["user"].is_authenticated)
+        self.assertIsNone(user)
+
+    @override_settings(PASSWORD_HASHING_POOL={"TIMEOUT": 5})
+    def test_saturated_pool_throttles_token_requests(self):
+        with mock.patch(
+            "user.backends.verify_password", side_effect=PoolSaturated
+        ):
+            res = APIClient().post(
+                reverse("user:token_obtain_pair"),
+                {"email": self.user.email, "password": "testuser123"},
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(res["Retry-After"], "5")
+
+    def test_wrong_password_still_answers_401(self):
+        res = APIClient().post(
+            reverse("user:token_obtain_pair"),
+            {"email": self.user.email, "password": "wrong"},
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class ManageUserViewTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        user_cache.clear()
+        self.user = get_user_model().objects.create_user(
+            email="testuser@gmail.com", password="testuser123"
+        )
+        self.client = APIClient()
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.user)}"
+        )
+
+    def test_me_uses_jwt_authentication(self):
+        res = self.client.get(reverse("user:manage"))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["email"], "testuser@gmail.com")
+
+    def test_me_runs_no_queries(self):
+        self.client.get(reverse("user:manage"))
+
+        # The user comes from the authentication cache
+        with self.assertNumQueries(0):
+            res = self.client.get(reverse("user:manage"))
+
+        self.assertEqual(res.data["email"], "testuser@gmail.com")
+
+    def test_me_reflects_update(self):
+        self.client.get(reverse("user:manage"))
+
+        self.client.patch(reverse("user:manage"), {"email": "new@gmail.com"})
+        res = self.client.get(reverse("user:manage"))
+
+        self.assertEqual(res.data["email"], "new@gmail.com")
@@ -1,10 +1,11 @@
 from django.urls import path
-from user.views import CreateUserView, ManageUserView
-from rest_framework_simplejwt.views import (
+from user.views import (
+    CreateUserView,
+    ManageUserView,
+    StreamTokenView,
     TokenObtainPairView,
-    TokenRefreshView,
-    TokenVerifyView,
 )
+from rest_framework_simplejwt.views import TokenRefreshView, TokenVerifyView
 
 app_name = "user"
 
@@ -14,4 +15,5 @@ urlpatterns = [
     path("token/", TokenObtainPairView.as_view(), name="token_obtain_pair"),
     path("token/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
     path("token/verify/", TokenVerifyView.as_view(), name="token_verify"),
+    path("token/stream/", StreamTokenView.as_view(), name="token_stream"),
 ]
@@ -1,10 +1,14 @@
+from django.conf import settings
+from drf_spectacular.utils import extend_schema
 from rest_framework import generics
-from rest_framework.authentication import TokenAuthentication
+from rest_framework.exceptions import AuthenticationFailed, Throttled
 from rest_framework.permissions import IsAuthenticated
-from rest_framework.authtoken.views import ObtainAuthToken
-from rest_framework.settings import api_settings
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from rest_framework_simplejwt import views as jwt_views
 
-from user.serializers import UserSerializer, AuthTokenSerializer
+from user.authentication import StreamToken
+from user.serializers import StreamTokenSerializer, UserSerializer
 
 
 class CreateUserView(generics.CreateAPIView):
@@ -12,15 +16,35 @@ class CreateUserView(generics.CreateAPIView):
     permission_classes = ()
 
 
-class CreateTokenView(ObtainAuthToken):
-    renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES
-    serializer_class = AuthTokenSerializer
-
-
 class ManageUserView(generics.RetrieveUpdateAPIView):
     serializer_class = UserSerializer
-    authentication_classes = (TokenAuthentication,)
     permission_classes = (IsAuthenticated,)
 
     def get_object(self):
         return self.request.user
+
+
+class StreamTokenView(APIView):
+    """Issue a short-lived token for the event streams"""
+
+    permission_classes = (IsAuthenticated,)
+
+    @extend_schema(request=None, responses=StreamTokenSerializer)
+    def post(self, request):
+        token = StreamToken.for_user(request.user)
+        return Response(StreamTokenSerializer({"token": str(token)}).data)
+
+
+class TokenObtainPairView(jwt_views.TokenObtainPairView):
+    """Obtain a token pair; 429 while the password hashing pool is full"""
+
+    def post(self, request, *args, **kwargs):
+        try:
+            return super().post(request, *args, **kwargs)
+        except AuthenticationFailed:
+            # Set by PooledModelBackend: the password was never checked
+            if getattr(request, "hashing_pool_saturated", False):
+                raise Throttled(
+                    wait=settings.PASSWORD_HASHING_POOL["TIMEOUT"]
+                )
+            raise